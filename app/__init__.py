@@ -1,4 +1,19 @@
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.utils.serializer import dumps
+
+
+class SerializerJSONProvider(DefaultJSONProvider):
+    """
+    Fournisseur JSON de Flask qui sérialise les réponses (jsonify) avec app.utils.serializer.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
 
 
 def create_app():
@@ -6,6 +21,7 @@ def create_app():
     Initialise l'application Flask.
     """
     app = Flask(__name__)
+    app.json = SerializerJSONProvider(app)
 
     from .routes import main_bp
 
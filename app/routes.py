@@ -1,8 +1,35 @@
-from flask import Blueprint, jsonify
-from app.utils.csv_parser import parse_customers, parse_purchases
-from app.utils.json_formatter import format_customers_for_api
-from app.utils.api_client import send_data_to_api
+from datetime import datetime
+from itertools import chain
+from flask import (
+    Blueprint,
+    Response,
+    jsonify,
+    request,
+    stream_with_context,
+)
+from app.utils.cache import file_cache
+from app.utils.csv_parser import (
+    iter_customers,
+    iter_purchases,
+    parse_customers,
+    parse_purchases,
+)
+from app.utils.json_formatter import (
+    format_customers_for_api,
+    iter_json_array,
+    iter_ndjson,
+)
+from app.utils.api_client import configure_session, get_session, send_data_to_api
 from app.utils.logger import logger
+from app.utils.payload import PayloadEncoder
+from app.utils.record_index import RecordIndex
+from app.utils.serializer import dumps
+from app.utils.staging_store import (
+    StagedIndex,
+    StagingStore,
+    parse_customers_staged,
+    parse_purchases_staged,
+)
 from config import Config
 
 main_bp = Blueprint("main", __name__)
@@ -10,20 +37,261 @@ main_bp = Blueprint("main", __name__)
 CUSTOMERS_FILE = "static/customers.csv"
 PURCHASES_FILE = "static/purchases.csv"
 
+CUSTOMER_FILTERS = ("customer_id", "city", "postal_code")
+PURCHASE_FILTERS = ("customer_id", "currency")
+PAGINATION_ARGS = ("limit", "offset", "date_from", "date_to")
+
+
+def load_customers():
+    """
+    Returns the parsed customers, re-parsing the CSV file only when it changed.
+
+    When Config.STAGING_DB is set, the customers are read from the staging
+    store instead, which only re-imports the CSV file when it changed.
+
+    Returns:
+        list: The customers, as returned by parse_customers.
+    """
+    parse = parse_customers_staged if Config.STAGING_DB else parse_customers
+    return file_cache.get(CUSTOMERS_FILE, "customers", parse)
+
+
+def load_purchases():
+    """
+    Returns the parsed purchases, re-parsing the CSV file only when it changed.
+
+    When Config.STAGING_DB is set, the purchases are read from the staging store instead.
+
+    Returns:
+        dict: The purchases grouped by customer ID, as returned by parse_purchases.
+    """
+    parse = parse_purchases_staged if Config.STAGING_DB else parse_purchases
+    return file_cache.get(PURCHASES_FILE, "purchases", parse)
+
+
+def _staged_index(kind, fields, range_field=None):
+    """
+    Builds an index querying a staging table, importing its CSV file first if it changed.
+    """
+
+    def build(path):
+        store = StagingStore()
+        store.refresh(kind, path)
+        return StagedIndex(store, kind, fields, range_field)
+
+    return build
+
+
+def load_customer_index():
+    """
+    Returns the index used to serve filtered pages of customers.
+
+    Returns:
+        RecordIndex: The customers indexed on CUSTOMER_FILTERS, cached until the file changes
+            (a StagedIndex querying the staging store when Config.STAGING_DB is set).
+    """
+    if Config.STAGING_DB:
+        return file_cache.get(
+            CUSTOMERS_FILE,
+            "customers.staged_index",
+            _staged_index("customers", CUSTOMER_FILTERS),
+        )
+    return file_cache.get(
+        CUSTOMERS_FILE,
+        "customers.index",
+        lambda _: RecordIndex(load_customers(), CUSTOMER_FILTERS),
+    )
+
+
+def load_purchase_index():
+    """
+    Returns the index used to serve filtered pages of purchases.
+
+    Purchases are flattened into rows carrying their "customer_id".
+
+    Returns:
+        RecordIndex: The purchases indexed on PURCHASE_FILTERS and by date, cached until the file changes
+            (a StagedIndex querying the staging store when Config.STAGING_DB is set).
+    """
+    if Config.STAGING_DB:
+        return file_cache.get(
+            PURCHASES_FILE,
+            "purchases.staged_index",
+            _staged_index("purchases", PURCHASE_FILTERS, "purchased_at"),
+        )
+
+    def build(_):
+        rows = [
+            {"customer_id": customer_id, **purchase}
+            for customer_id, purchases in load_purchases().items()
+            for purchase in purchases
+        ]
+        return RecordIndex(rows, PURCHASE_FILTERS, range_field="purchased_at")
+
+    return file_cache.get(PURCHASES_FILE, "purchases.index", build)
+
+
+def _wants_page(filters):
+    """
+    Tells whether the request asks for a page rather than the whole dataset.
+
+    Decided from the query string alone, so that the index is only loaded for pages.
+
+    Args:
+        filters (tuple): The fields the records can be filtered on.
+    """
+    return any(arg in request.args for arg in PAGINATION_ARGS + filters)
+
+
+def _int_arg(name, default):
+    """
+    Reads a non-negative integer query parameter.
+
+    Raises:
+        ValueError: If the parameter is not a non-negative integer.
+    """
+    value = request.args.get(name)
+    if value is None:
+        return default
+    if not value.isdigit():
+        raise ValueError(f"'{name}' must be a non-negative integer.")
+    return int(value)
+
+
+def _date_arg(name):
+    """
+    Reads a YYYY-MM-DD query parameter.
+
+    Raises:
+        ValueError: If the parameter is not a valid date.
+    """
+    value = request.args.get(name)
+    if value is not None:
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError(f"'{name}' must be a date formatted as YYYY-MM-DD.")
+    return value
+
+
+def _page_response(index):
+    """
+    Serves a page of the indexed records selected by the query string.
+
+    Supported parameters are `limit` (defaults to Config.API_PAGE_SIZE, at most
+    Config.API_MAX_PAGE_SIZE), `offset`, an equality filter per indexed field and,
+    when the index supports it, the inclusive `date_from` / `date_to` range.
+
+    Args:
+        index (RecordIndex): The index of the records.
+
+    Returns:
+        tuple: A JSON response with the keys "items", "total", "offset", "limit" and
+            "next_offset" (None on the last or an empty page), and the HTTP status code, 400 on
+            invalid parameters.
+    """
+    try:
+        limit = min(_int_arg("limit", Config.API_PAGE_SIZE), Config.API_MAX_PAGE_SIZE)
+        offset = _int_arg("offset", 0)
+        filters = {
+            field: request.args[field]
+            for field in index.fields
+            if field in request.args
+        }
+        items, total = index.query(
+            filters, _date_arg("date_from"), _date_arg("date_to"), offset, limit
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    next_offset = offset + len(items)
+    return (
+        jsonify(
+            {
+                "items": items,
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+                "next_offset": (next_offset if items and next_offset < total else None),
+            }
+        ),
+        200,
+    )
+
+
+def _wants_stream():
+    """
+    Tells whether the request asks for a streamed response.
+    """
+    return (
+        request.args.get("stream", "").lower() in ("1", "true", "yes")
+        or request.args.get("format") == "ndjson"
+    )
+
+
+def _streamed_response(records):
+    """
+    Streams records straight from the CSV iterator, as a JSON array or as NDJSON.
+
+    The body is produced incrementally with chunked transfer encoding, so the
+    time to first byte and the memory usage do not depend on the file size. The
+    first chunk is computed before the response starts, so that errors such as
+    a missing file are still reported with a 500 status code.
+
+    Args:
+        records (iterable): The records to stream.
+
+    Returns:
+        Response: The streamed response, NDJSON when the `format` query parameter is "ndjson".
+    """
+    if request.args.get("format") == "ndjson":
+        body, mimetype = iter_ndjson(records), "application/x-ndjson"
+    else:
+        body, mimetype = iter_json_array(records), "application/json"
+    first_chunk = next(body, b"")
+    return Response(
+        stream_with_context(chain([first_chunk], body)), status=200, mimetype=mimetype
+    )
+
+
+def _cached_json_response(path, name, load):
+    """
+    Builds a JSON response whose body is cached until the source file changes.
+
+    Args:
+        path (str): The source CSV file.
+        name (str): The name of the cached value derived from the file.
+        load (callable): A function returning the data to serialize.
+
+    Returns:
+        Response: The JSON response.
+    """
+    body = file_cache.get(path, f"{name}.json", lambda _: dumps(load()))
+    return Response(body, status=200, mimetype="application/json")
+
 
 @main_bp.route("/api/customers", methods=["GET"])
 def get_customers():
     """
     Retrieves a list of customers from a file and returns it as a JSON response.
 
+    The parsed customers and their JSON serialization are cached in process and
+    reused until the customers file is modified. With `limit`, `offset`,
+    `customer_id`, `city` or `postal_code` query parameters, a filtered page is
+    returned instead (see _page_response). With `stream=1` or `format=ndjson`,
+    the customers are streamed from the CSV file (see _streamed_response).
+
     Returns:
         tuple: A tuple containing the JSON response and the HTTP status code.
                On success, returns a JSON list of customers and status code 200.
                On failure, returns a JSON error message and status code 500.
     """
     try:
-        customers = parse_customers(CUSTOMERS_FILE)
-        return jsonify(customers), 200
+        if _wants_stream():
+            return _streamed_response(iter_customers(CUSTOMERS_FILE))
+        if _wants_page(CUSTOMER_FILTERS):
+            return _page_response(load_customer_index())
+        return _cached_json_response(CUSTOMERS_FILE, "customers", load_customers)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -36,13 +304,26 @@ def get_purchases():
     This function attempts to parse the purchases from a predefined file and
     return them in JSON format with a 200 status code. If an error occurs during
     parsing, it returns an error message in JSON format with a 500 status code.
+    The parsed purchases and their JSON serialization are cached in process and
+    reused until the purchases file is modified. With `limit`, `offset`,
+    `customer_id`, `currency`, `date_from` or `date_to` query parameters, a
+    filtered page of purchase rows (including their "customer_id") is returned
+    instead (see _page_response). With `stream=1` or `format=ndjson`, the
+    purchase rows (including their "customer_id") are streamed from the CSV
+    file (see _streamed_response).
 
     Returns:
         tuple: A tuple containing a JSON response and an HTTP status code.
     """
     try:
-        purchases = parse_purchases(PURCHASES_FILE)
-        return jsonify(purchases), 200
+        if _wants_stream():
+            return _streamed_response(
+                {"customer_id": customer_id, **purchase}
+                for customer_id, purchase in iter_purchases(PURCHASES_FILE)
+            )
+        if _wants_page(PURCHASE_FILTERS):
+            return _page_response(load_purchase_index())
+        return _cached_json_response(PURCHASES_FILE, "purchases", load_purchases)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -53,22 +334,54 @@ def send_data():
     Endpoint to send customer and purchase data to an external API.
 
     This function handles POST requests to the '/api/send' route. It performs the following steps:
-    1. Parses customer data from a specified file.
-    2. Parses purchase data from a specified file.
+    1. Parses customer data from a specified file (or reuses the cached result).
+    2. Parses purchase data from a specified file (or reuses the cached result).
     3. Formats the parsed data for the API.
-    4. Sends the formatted data to an external API.
+    4. Sends the formatted data to an external API, in batches when the `batch_size` or
+       `max_batch_bytes` query parameters (or their Config defaults) are set, with up to
+       `concurrency` batches in flight (at most Config.API_MAX_CONCURRENCY; the shared
+       session's connection pool is enlarged to match). The `format` query parameter ("json" or "ndjson")
+       selects the encoding of the request bodies and the `compress` query parameter
+       ("gzip" or "zstd", defaults to Config.API_COMPRESSION) their compression.
     5. Returns the status code and response text from the API.
 
     Returns:
         Response: A JSON response containing the status code and response text from the API,
                 or an error message with a 500 status code if an exception occurs.
     """
+    send_options = {
+        "batch_size": request.args.get("batch_size", Config.API_BATCH_SIZE, type=int),
+        "max_batch_bytes": request.args.get(
+            "max_batch_bytes", Config.API_MAX_BATCH_BYTES, type=int
+        ),
+        "concurrency": min(
+            request.args.get("concurrency", Config.API_CONCURRENCY, type=int),
+            Config.API_MAX_CONCURRENCY,
+        ),
+    }
+    if send_options["concurrency"] < 1:
+        return jsonify({"error": "'concurrency' must be at least 1."}), 400
+    compression = request.args.get("compress", Config.API_COMPRESSION)
+    if "format" in request.args or compression:
+        try:
+            send_options["payload"] = PayloadEncoder(
+                request.args.get("format", "json"),
+                compression=compression,
+                compression_level=Config.API_COMPRESSION_LEVEL,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
     try:
-        customers = parse_customers(CUSTOMERS_FILE)
-        purchases = parse_purchases(PURCHASES_FILE)
+        if send_options["concurrency"] > get_session().pool_size:
+            configure_session(pool_size=send_options["concurrency"])
+        customers = load_customers()
+        purchases = load_purchases()
         formatted_data = format_customers_for_api(customers, purchases)
         logger.info("Lancer l'envoi des données formatées à l'API.")
-        status_code, response_text = send_data_to_api(Config.API_URL, formatted_data)
+        status_code, response_text = send_data_to_api(
+            Config.API_URL, formatted_data, **send_options
+        )
         return jsonify({"status": status_code, "response": response_text}), status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,28 +1,478 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import requests
+from requests.adapters import HTTPAdapter
 from app.utils.logger import logger
+from app.utils.payload import PayloadEncoder
+from app.utils.serializer import encode_record
+from app.utils.retry import RetryPolicy
+from config import Config
 
+_session = None
+_session_lock = threading.Lock()
 
-def send_data_to_api(api_url, data):
+
+class ApiSession(requests.Session):
     """
-    Sends data to the specified API URL using an HTTP PUT request.
+    A requests.Session tuned for repeated uploads to the same API.
+
+    Connections are kept alive and pooled by a mounted HTTPAdapter, so that
+    consecutive (or batched) requests reuse the same TCP/TLS connection, and every
+    request gets a default timeout unless one is given explicitly.
 
     Args:
-        api_url (str): The URL of the API endpoint to send data to.
-        data (dict): The data to be sent to the API in JSON format.
+        pool_size (int, optional): The number of connections kept per host. Defaults to Config.API_POOL_SIZE.
+        timeout (float | tuple, optional): The default (connect, read) timeout in seconds.
+            Defaults to (Config.API_CONNECT_TIMEOUT, Config.API_READ_TIMEOUT).
+    """
+
+    def __init__(self, pool_size=None, timeout=None):
+        super().__init__()
+        self.pool_size = pool_size or Config.API_POOL_SIZE
+        self.timeout = timeout or (Config.API_CONNECT_TIMEOUT, Config.API_READ_TIMEOUT)
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size, pool_maxsize=self.pool_size
+        )
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.headers["Connection"] = "keep-alive"
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def get_session():
+    """
+    Returns the API session shared by the CLI, the Flask routes and send_data_to_api.
 
     Returns:
-        tuple: A tuple containing the HTTP status code and the response text.
+        ApiSession: The shared session, created on first use.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = ApiSession()
+        return _session
+
+
+def configure_session(pool_size=None, timeout=None):
+    """
+    Replaces the shared API session with one using the given settings.
+
+    Args:
+        pool_size (int, optional): The number of connections kept per host.
+        timeout (float | tuple, optional): The default (connect, read) timeout in seconds.
+
+    Returns:
+        ApiSession: The new shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = ApiSession(pool_size=pool_size, timeout=timeout)
+        return _session
+
+
+class BatchBuilder:
+    """
+    Accumulates records into batches bounded by record count and serialized size.
+
+    Each record is serialized exactly once; the batches carry the encoded
+    records so they can be sent without serializing them again. A record that
+    is larger than `max_batch_bytes` on its own ends up in a batch of its own.
+
+    Args:
+        batch_size (int, optional): The maximum number of records per batch.
+        max_batch_bytes (int, optional): The maximum size in bytes of a batch once encoded as a JSON array.
+    """
+
+    def __init__(self, batch_size=None, max_batch_bytes=None):
+        self.batch_size = batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.batch = []
+        self.batch_bytes = 2  # The enclosing brackets of the JSON array.
+
+    def add(self, record):
+        """
+        Adds a record to the current batch.
+
+        Args:
+            record: The JSON-serializable record, or an already serialized Fragment.
+
+        Returns:
+            list | None: The previous batch when the record did not fit in it, otherwise None.
+        """
+        encoded = encode_record(record)
+        completed = None
+        if self.batch and (
+            (self.batch_size and len(self.batch) >= self.batch_size)
+            or (
+                self.max_batch_bytes
+                and self.batch_bytes + 1 + len(encoded) > self.max_batch_bytes
+            )
+        ):
+            completed = self.flush()
+        if self.max_batch_bytes and 2 + len(encoded) > self.max_batch_bytes:
+            logger.warning(
+                f"Enregistrement de {len(encoded)} octets plus grand que la taille maximale d'un lot."
+            )
+        self.batch_bytes += len(encoded) + (1 if self.batch else 0)
+        self.batch.append(encoded)
+        return completed
+
+    def flush(self):
+        """
+        Closes the current batch and starts a new one.
+
+        Returns:
+            list: The UTF-8 encoded JSON records of the closed batch (possibly empty).
+        """
+        batch = self.batch
+        self.batch = []
+        self.batch_bytes = 2
+        return batch
+
+
+def iter_batches(records, batch_size=None, max_batch_bytes=None):
+    """
+    Groups records into batches bounded by record count and serialized size.
+
+    Args:
+        records (iterable): The records to group, e.g. formatted customers.
+        batch_size (int, optional): The maximum number of records per batch.
+        max_batch_bytes (int, optional): The maximum size in bytes of a batch once encoded as a JSON array.
+
+    Yields:
+        list: The UTF-8 encoded JSON records of a batch (see BatchBuilder).
+    """
+    builder = BatchBuilder(batch_size, max_batch_bytes)
+    for record in records:
+        batch = builder.add(record)
+        if batch:
+            yield batch
+    batch = builder.flush()
+    if batch:
+        yield batch
+
+
+def _put_once(session, api_url, **kwargs):
+    """
+    Sends a single HTTP PUT request and maps failures to a status code.
+
+    Connection errors are reported as 503 and timeouts as 504.
+
+    Args:
+        session (requests.Session): The session used to send the request.
+        api_url (str): The URL of the API endpoint.
+        **kwargs: The keyword arguments passed to session.put.
+
+    Returns:
+        tuple: The HTTP status code, the response JSON (or None) and the Retry-After header (or None).
     """
     try:
-        response = requests.put(api_url, json=data)
+        response = session.put(api_url, **kwargs)
         response.raise_for_status()
-        return response.status_code, response.json()
+        return response.status_code, response.json(), None
     except requests.exceptions.ConnectionError as e:
         logger.error(f"Erreur de connexion : {e}")
-        return 503, None
+        return 503, None, None
+    except requests.exceptions.Timeout as e:
+        logger.error(f"Délai d'attente dépassé : {e}")
+        return 504, None, None
     except requests.exceptions.RequestException as e:
         logger.error(f"Erreur lors de la requête : {e}")
-        return response.status_code if "response" in locals() else 500, None
+        if "response" not in locals():
+            return 500, None, None
+        return response.status_code, None, response.headers.get("Retry-After")
     except ValueError:
         logger.error("Erreur lors de la récupération des données JSON.")
-        return response.status_code, None
+        return response.status_code, None, None
+
+
+def _put(session, api_url, retry_policy=None, **kwargs):
+    """
+    Sends an HTTP PUT request, retrying transient failures according to a retry policy.
+
+    Args:
+        session (requests.Session): The session used to send the request.
+        api_url (str): The URL of the API endpoint.
+        retry_policy (RetryPolicy, optional): The retry policy. Defaults to RetryPolicy().
+        **kwargs: The keyword arguments passed to session.put. The body must be
+            replayable (bytes or a JSON object) for the request to be retried.
+
+    Returns:
+        tuple: The HTTP status code, the response JSON (or None) and the number of attempts made.
+    """
+    retry_policy = retry_policy or RetryPolicy()
+    attempt = 1
+    while True:
+        status_code, response, retry_after = _put_once(session, api_url, **kwargs)
+        if not retry_policy.should_retry(attempt, status_code):
+            return status_code, response, attempt
+        delay = retry_policy.get_delay(attempt, retry_after)
+        logger.warning(
+            f"Tentative {attempt}/{retry_policy.max_attempts} échouée (HTTP {status_code}), "
+            f"nouvel essai dans {delay:.2f}s."
+        )
+        time.sleep(delay)
+        attempt += 1
+
+
+def _send_batch(
+    session, api_url, index, batch, retry_policy=None, checkpoint=None, payload=None
+):
+    """
+    Sends a single batch, retrying it on transient failures, and describes the outcome.
+
+    Args:
+        session (requests.Session): The session used to send the request.
+        api_url (str): The URL of the API endpoint.
+        index (int): The position of the batch in the upload.
+        batch (list): The UTF-8 encoded JSON records of the batch.
+        retry_policy (RetryPolicy, optional): The retry policy applied to this batch.
+        checkpoint (Checkpoint, optional): The checkpoint used to skip batches already
+            acknowledged by a previous run and to record this one once acknowledged.
+        payload (PayloadEncoder, optional): The encoding of the body. Defaults to a JSON array.
+
+    Returns:
+        dict: The batch result (see send_batches_to_api).
+    """
+    payload = payload or PayloadEncoder()
+    body = payload.encode_batch(batch)
+    if checkpoint is not None:
+        batch_key = checkpoint.batch_key(index, body)
+        if batch_key in checkpoint:
+            logger.info(f"Lot {index} déjà envoyé, ignoré.")
+            return {
+                "batch": index,
+                "records": len(batch),
+                "bytes": len(body),
+                "status": 200,
+                "attempts": 0,
+                "skipped": True,
+                "response": None,
+            }
+
+    status_code, response, attempts = _put(
+        session,
+        api_url,
+        retry_policy,
+        data=body,
+        headers=payload.headers,
+    )
+    logger.info(f"Lot {index} envoyé ({len(batch)} enregistrements) : {status_code}")
+    if checkpoint is not None and 200 <= status_code < 300:
+        checkpoint.mark_done(batch_key, len(batch))
+    return {
+        "batch": index,
+        "records": len(batch),
+        "bytes": len(body),
+        "status": status_code,
+        "attempts": attempts,
+        "response": response,
+    }
+
+
+def _send_batches_concurrently(
+    session,
+    api_url,
+    batches,
+    concurrency,
+    retry_policy=None,
+    checkpoint=None,
+    payload=None,
+):
+    """
+    Sends batches from a thread pool with at most `concurrency` requests in flight.
+
+    The next batch is only pulled from `batches` once a slot is free, so the
+    producer (parser and formatter) never runs more than `concurrency` batches
+    ahead of the upload.
+
+    Args:
+        session (requests.Session): The session shared by the worker threads.
+        api_url (str): The URL of the API endpoint.
+        batches (iterable): (index, batch) pairs.
+        concurrency (int): The maximum number of batches in flight.
+        retry_policy (RetryPolicy, optional): The retry policy applied to each batch.
+        checkpoint (Checkpoint, optional): The checkpoint of acknowledged batches.
+        payload (PayloadEncoder, optional): The encoding of the batch bodies.
+
+    Returns:
+        list: The batch results, ordered by batch index.
+    """
+    results = []
+    pending = set()
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="api-upload"
+    ) as executor:
+        for index, batch in batches:
+            if len(pending) >= concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results.extend(future.result() for future in done)
+            pending.add(
+                executor.submit(
+                    _send_batch,
+                    session,
+                    api_url,
+                    index,
+                    batch,
+                    retry_policy,
+                    checkpoint,
+                    payload,
+                )
+            )
+        done, _ = wait(pending)
+        results.extend(future.result() for future in done)
+    results.sort(key=lambda result: result["batch"])
+    return results
+
+
+def send_batches_to_api(
+    api_url,
+    records,
+    batch_size=None,
+    max_batch_bytes=None,
+    session=None,
+    concurrency=1,
+    retry_policy=None,
+    checkpoint=None,
+    payload=None,
+):
+    """
+    Sends records to the API in several PUT requests, one per batch.
+
+    All the batches go through the same session so that they reuse pooled connections.
+    Transient failures are retried per batch, so they only cost a resend of that batch.
+
+    Args:
+        api_url (str): The URL of the API endpoint to send data to.
+        records (iterable): The records to send; they are consumed lazily.
+        batch_size (int, optional): The maximum number of records per batch.
+        max_batch_bytes (int, optional): The maximum size in bytes of a batch body.
+        session (requests.Session, optional): The session to use. Defaults to the shared session.
+        concurrency (int): The maximum number of batches sent in parallel. Defaults to 1 (serial).
+        retry_policy (RetryPolicy, optional): The retry policy applied to each batch. Defaults to RetryPolicy().
+        checkpoint (Checkpoint, optional): When given, batches it already records are skipped
+            and every acknowledged batch is recorded in it.
+        payload (PayloadEncoder, optional): The encoding of the batch bodies. Defaults to JSON arrays.
+
+    Returns:
+        tuple: A tuple containing the overall HTTP status code and a report dictionary with the keys:
+            - "batches" (list): For each batch, its "batch" index, "records" count, body "bytes" (once compressed),
+              final HTTP "status", number of "attempts" and API "response", in batch order.
+              Batches skipped thanks to the checkpoint also have "skipped" set to True.
+            - "records" (int): The total number of records.
+            - "sent" (int): The number of successful batches.
+            - "failed" (int): The number of failed batches.
+            - "skipped" (int): The number of batches skipped because already acknowledged.
+            The overall status code is 200 when every batch succeeded, otherwise the status
+            code of the first failed batch.
+    """
+    session = session or get_session()
+    batches = enumerate(iter_batches(records, batch_size, max_batch_bytes))
+    if concurrency > 1:
+        results = _send_batches_concurrently(
+            session, api_url, batches, concurrency, retry_policy, checkpoint, payload
+        )
+    else:
+        results = [
+            _send_batch(
+                session, api_url, index, batch, retry_policy, checkpoint, payload
+            )
+            for index, batch in batches
+        ]
+    return summarize_batches(results)
+
+
+def summarize_batches(results):
+    """
+    Aggregates per-batch results into an overall status code and report.
+
+    Args:
+        results (list): The per-batch result dictionaries, in batch order.
+
+    Returns:
+        tuple: The overall HTTP status code and the report (see send_batches_to_api).
+    """
+    failed = [result for result in results if not 200 <= result["status"] < 300]
+    report = {
+        "batches": results,
+        "records": sum(result["records"] for result in results),
+        "sent": len(results) - len(failed),
+        "failed": len(failed),
+        "skipped": sum(1 for result in results if result.get("skipped")),
+    }
+    return (failed[0]["status"] if failed else 200), report
+
+
+def send_data_to_api(
+    api_url,
+    data,
+    batch_size=None,
+    max_batch_bytes=None,
+    session=None,
+    concurrency=1,
+    retry_policy=None,
+    checkpoint=None,
+    payload=None,
+):
+    """
+    Sends data to the specified API URL using an HTTP PUT request.
+
+    Args:
+        api_url (str): The URL of the API endpoint to send data to.
+        data (dict | list | iterable): The data to be sent to the API in JSON format.
+            Lists and dictionaries are sent as-is. Any other iterable (e.g. the
+            generator returned by iter_formatted_customers) is streamed as a JSON
+            array using chunked transfer encoding, without being materialized.
+        batch_size (int, optional): When set, split the records into batches of at most this many records.
+        max_batch_bytes (int, optional): When set, split the records into batches of at most this many bytes.
+        session (requests.Session, optional): The session to use. Defaults to the shared session returned by get_session.
+        concurrency (int): In batching mode, the maximum number of batches sent in parallel.
+        retry_policy (RetryPolicy, optional): The retry policy. Defaults to RetryPolicy(). A streamed
+            body cannot be replayed, so streamed uploads are never retried.
+        checkpoint (Checkpoint, optional): In batching mode, the checkpoint of acknowledged batches.
+        payload (PayloadEncoder, optional): The encoding of the request bodies, e.g.
+            PayloadEncoder("ndjson") to send newline-delimited JSON or
+            PayloadEncoder(compression="gzip") to compress them. Defaults to
+            uncompressed JSON. Streamed bodies are compressed incrementally.
+
+    Returns:
+        tuple: A tuple containing the HTTP status code and the response text.
+            In batching mode, the response is the report built by send_batches_to_api.
+    """
+    session = session or get_session()
+    if batch_size or max_batch_bytes:
+        return send_batches_to_api(
+            api_url,
+            data,
+            batch_size,
+            max_batch_bytes,
+            session=session,
+            concurrency=concurrency,
+            retry_policy=retry_policy,
+            checkpoint=checkpoint,
+            payload=payload,
+        )
+    payload = payload or PayloadEncoder()
+    if isinstance(data, (list, dict)):
+        status_code, response, _ = _put(
+            session,
+            api_url,
+            retry_policy,
+            data=payload.encode(data),
+            headers=payload.headers,
+        )
+    else:
+        status_code, response, _ = _put(
+            session,
+            api_url,
+            RetryPolicy(max_attempts=1),
+            data=payload.stream(data),
+            headers=payload.headers,
+        )
+    return status_code, response
@@ -0,0 +1,260 @@
+import asyncio
+import time
+from app.utils.api_client import BatchBuilder, summarize_batches
+from app.utils.logger import logger
+from app.utils.payload import PayloadEncoder
+from app.utils.retry import RetryPolicy
+from config import Config
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - aiohttp is only needed by the async engine
+    aiohttp = None
+
+
+async def aiter_records(records):
+    """
+    Adapts a synchronous iterable of records to an async generator.
+
+    Args:
+        records (iterable): The records, e.g. the generator returned by iter_formatted_customers.
+
+    Yields:
+        The records, one at a time.
+    """
+    for record in records:
+        yield record
+
+
+async def aiter_batches(records, batch_size=None, max_batch_bytes=None):
+    """
+    Groups the records of an async iterable into batches.
+
+    Args:
+        records (async iterable): The records to group.
+        batch_size (int, optional): The maximum number of records per batch.
+        max_batch_bytes (int, optional): The maximum size in bytes of a batch once encoded as a JSON array.
+
+    Yields:
+        list: The UTF-8 encoded JSON records of a batch (see BatchBuilder).
+    """
+    builder = BatchBuilder(batch_size, max_batch_bytes)
+    async for record in records:
+        batch = builder.add(record)
+        if batch:
+            yield batch
+    batch = builder.flush()
+    if batch:
+        yield batch
+
+
+async def _put_once(session, api_url, body, headers):
+    """
+    Sends a single HTTP PUT request and maps failures to a status code.
+
+    Args:
+        session (aiohttp.ClientSession): The session used to send the request.
+        api_url (str): The URL of the API endpoint.
+        body (bytes): The request body.
+        headers (dict): The request headers.
+
+    Returns:
+        tuple: The HTTP status code, the response JSON (or None) and the Retry-After header (or None).
+    """
+    try:
+        async with session.put(api_url, data=body, headers=headers) as response:
+            if response.status >= 400:
+                logger.error(f"Erreur lors de la requête : HTTP {response.status}")
+                return response.status, None, response.headers.get("Retry-After")
+            try:
+                return response.status, await response.json(content_type=None), None
+            except ValueError:
+                logger.error("Erreur lors de la récupération des données JSON.")
+                return response.status, None, None
+    except asyncio.TimeoutError:
+        # Before ClientConnectionError: aiohttp's ServerTimeoutError derives from both.
+        logger.error("Délai d'attente dépassé.")
+        return 504, None, None
+    except aiohttp.ClientConnectionError as e:
+        logger.error(f"Erreur de connexion : {e}")
+        return 503, None, None
+    except aiohttp.ClientError as e:
+        logger.error(f"Erreur lors de la requête : {e!r}")
+        return 500, None, None
+
+
+async def _send_batch(
+    session,
+    api_url,
+    index,
+    batch,
+    semaphore,
+    retry_policy,
+    checkpoint=None,
+    payload=None,
+):
+    """
+    Sends a single batch, retrying it on transient failures, and releases its concurrency slot once done.
+
+    Args:
+        session (aiohttp.ClientSession): The session used to send the request.
+        api_url (str): The URL of the API endpoint.
+        index (int): The position of the batch in the upload.
+        batch (list): The UTF-8 encoded JSON records of the batch.
+        semaphore (asyncio.Semaphore): The semaphore limiting the requests in flight.
+        retry_policy (RetryPolicy): The retry policy applied to this batch.
+        checkpoint (Checkpoint, optional): The checkpoint of acknowledged batches.
+        payload (PayloadEncoder, optional): The encoding of the body. Defaults to a JSON array.
+
+    Returns:
+        dict: The batch result (see send_batches_to_api).
+    """
+    payload = payload or PayloadEncoder()
+    body = payload.encode_batch(batch)
+    if checkpoint is not None:
+        batch_key = checkpoint.batch_key(index, body)
+        if batch_key in checkpoint:
+            semaphore.release()
+            logger.info(f"Lot {index} déjà envoyé, ignoré.")
+            return {
+                "batch": index,
+                "records": len(batch),
+                "bytes": len(body),
+                "status": 200,
+                "attempts": 0,
+                "skipped": True,
+                "response": None,
+            }
+
+    attempt = 1
+    try:
+        while True:
+            status_code, response, retry_after = await _put_once(
+                session, api_url, body, payload.headers
+            )
+            if not retry_policy.should_retry(attempt, status_code):
+                break
+            delay = retry_policy.get_delay(attempt, retry_after)
+            logger.warning(
+                f"Tentative {attempt}/{retry_policy.max_attempts} échouée (HTTP {status_code}), "
+                f"nouvel essai dans {delay:.2f}s."
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+    finally:
+        semaphore.release()
+
+    logger.info(f"Lot {index} envoyé ({len(batch)} enregistrements) : {status_code}")
+    if checkpoint is not None and 200 <= status_code < 300:
+        checkpoint.mark_done(batch_key, len(batch))
+    return {
+        "batch": index,
+        "records": len(batch),
+        "bytes": len(body),
+        "status": status_code,
+        "attempts": attempt,
+        "response": response,
+    }
+
+
+async def async_send_batches(
+    api_url,
+    records,
+    batch_size=None,
+    max_batch_bytes=None,
+    concurrency=None,
+    session=None,
+    retry_policy=None,
+    checkpoint=None,
+    payload=None,
+    timeout=None,
+):
+    """
+    Asynchronously sends records to the API in batches over a single event loop.
+
+    Batches are pulled from `records` only when one of the `concurrency` slots is
+    free, so the producer never runs more than `concurrency` batches ahead of the
+    requests in flight. Without `batch_size` and `max_batch_bytes` everything is
+    sent as a single batch.
+
+    Args:
+        api_url (str): The URL of the API endpoint to send data to.
+        records (async iterable | iterable): The records to send, e.g. from aiter_records.
+        batch_size (int, optional): The maximum number of records per batch.
+        max_batch_bytes (int, optional): The maximum size in bytes of a batch body.
+        concurrency (int, optional): The maximum number of requests in flight.
+            Defaults to Config.API_CONCURRENCY.
+        session (aiohttp.ClientSession, optional): The session to use. By default a
+            session with a connection pool of `concurrency` connections is created
+            and closed when the upload is over.
+        retry_policy (RetryPolicy, optional): The retry policy applied to each batch. Defaults to RetryPolicy().
+        checkpoint (Checkpoint, optional): When given, batches it already records are skipped
+            and every acknowledged batch is recorded in it.
+        payload (PayloadEncoder, optional): The encoding of the batch bodies. Defaults to JSON arrays.
+        timeout (float, optional): The read timeout in seconds of each request of the
+            session created by default. Defaults to Config.API_READ_TIMEOUT.
+
+    Returns:
+        tuple: The overall HTTP status code and the report built by send_batches_to_api,
+            extended with the throughput keys "elapsed_seconds", "records_per_second"
+            and "bytes_per_second".
+    """
+    if aiohttp is None:
+        raise RuntimeError("The async engine requires aiohttp (pip install aiohttp).")
+    if not hasattr(records, "__aiter__"):
+        records = aiter_records(records)
+    concurrency = concurrency or Config.API_CONCURRENCY
+    retry_policy = retry_policy or RetryPolicy()
+
+    owns_session = session is None
+    if owns_session:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=concurrency),
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=Config.API_CONNECT_TIMEOUT,
+                sock_read=timeout or Config.API_READ_TIMEOUT,
+            ),
+        )
+
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = []
+    started = time.perf_counter()
+    try:
+        index = 0
+        async for batch in aiter_batches(records, batch_size, max_batch_bytes):
+            await semaphore.acquire()
+            tasks.append(
+                asyncio.create_task(
+                    _send_batch(
+                        session,
+                        api_url,
+                        index,
+                        batch,
+                        semaphore,
+                        retry_policy,
+                        checkpoint,
+                        payload,
+                    )
+                )
+            )
+            index += 1
+        results = list(await asyncio.gather(*tasks))
+    finally:
+        for task in tasks:
+            task.cancel()
+        if owns_session:
+            await session.close()
+    elapsed = time.perf_counter() - started
+
+    status_code, report = summarize_batches(results)
+    total_bytes = sum(result["bytes"] for result in results)
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["records_per_second"] = (
+        round(report["records"] / elapsed, 1) if elapsed else 0
+    )
+    report["bytes_per_second"] = round(total_bytes / elapsed, 1) if elapsed else 0
+    logger.info(
+        f"Envoi asynchrone terminé : {report['records']} enregistrements en {elapsed:.2f}s "
+        f"({report['records_per_second']} enregistrements/s)."
+    )
+    return status_code, report
@@ -0,0 +1,67 @@
+import os
+import threading
+from app.utils.logger import logger
+
+
+class FileCache:
+    """
+    In-process cache of values derived from files, invalidated when a file changes.
+
+    Entries are keyed on the absolute path of the file and a name (so several
+    values, e.g. the parsed rows and their JSON serialization, can be derived from
+    the same file), and are only reused while the file keeps the same
+    modification time and size.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(path):
+        """
+        Returns what identifies the current version of a file.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            tuple: The modification time in nanoseconds and the size of the file.
+        """
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path, name, loader):
+        """
+        Returns the cached value derived from a file, loading it if needed.
+
+        Args:
+            path (str): The path of the file.
+            name (str): The name of the derived value.
+            loader (callable): A function called with `path` to compute the value on a cache miss.
+
+        Returns:
+            The cached or freshly loaded value.
+        """
+        key = (os.path.abspath(path), name)
+        signature = self.signature(path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        logger.info(f"Cache manquant pour {path} ({name}), rechargement.")
+        value = loader(path)
+        with self._lock:
+            self._entries[key] = (signature, value)
+        return value
+
+    def clear(self):
+        """
+        Drops every cached value.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+file_cache = FileCache()
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import threading
+from app.utils.logger import logger
+
+
+class Checkpoint:
+    """
+    Records the batches acknowledged by the API so that an interrupted upload can be resumed.
+
+    A batch is identified by its position in the upload and the SHA-256 of its
+    body, so it is only skipped on resume if the same records end up in the same
+    batch, i.e. when the input files and the batching options did not change.
+    Entries are appended as JSON lines and flushed to disk as soon as the API
+    acknowledges a batch, so the file survives a crash of the process.
+
+    Args:
+        path (str): The path of the checkpoint file.
+        resume (bool): If True, load the batches recorded by a previous run and keep
+            appending to the file; otherwise start a new, empty checkpoint.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.acknowledged = set()
+        self._lock = threading.Lock()
+        complete = True
+        if resume and os.path.exists(path):
+            with open(path, mode="r", encoding="utf-8") as file:
+                for line in file:
+                    complete = line.endswith("\n")
+                    try:
+                        self.acknowledged.add(json.loads(line)["key"])
+                    except (ValueError, KeyError):
+                        logger.warning(f"Ligne de checkpoint ignorée : {line!r}")
+            logger.info(
+                f"Reprise depuis {path} : {len(self.acknowledged)} lots déjà envoyés."
+            )
+        self._file = open(path, mode="a" if resume else "w", encoding="utf-8")
+        if not complete:
+            # A crash during a write left a truncated line: end it, so the next
+            # entry is not appended to it and lost on the following resume.
+            self._file.write("\n")
+
+    @staticmethod
+    def batch_key(index, body):
+        """
+        Builds the identifier of a batch.
+
+        Args:
+            index (int): The position of the batch in the upload.
+            body (bytes): The request body of the batch.
+
+        Returns:
+            str: The batch key.
+        """
+        return f"{index}:{hashlib.sha256(body).hexdigest()}"
+
+    def __contains__(self, key):
+        return key in self.acknowledged
+
+    def mark_done(self, key, records):
+        """
+        Records a batch as acknowledged by the API and syncs the file to disk.
+
+        Args:
+            key (str): The batch key returned by batch_key.
+            records (int): The number of records of the batch.
+        """
+        with self._lock:
+            self.acknowledged.add(key)
+            self._file.write(json.dumps({"key": key, "records": records}) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """
+        Closes the checkpoint file.
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
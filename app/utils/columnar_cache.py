@@ -0,0 +1,218 @@
+import os
+from operator import itemgetter
+from app.utils.logger import logger
+from app.utils.records import Customer, Purchase, row_values
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is only needed by the columnar cache
+    np = pa = feather = None
+
+# Bump when the normalization of the parsers changes, so older cache files are re-parsed.
+COLUMNAR_VERSION = "1"
+EXTENSION = ".feather"
+CUSTOMER_COLUMNS = Customer.__slots__
+PURCHASE_COLUMNS = ("customer_id",) + Purchase.__slots__
+# Low-cardinality columns, dictionary-encoded in the file and shared once loaded (like StringPool).
+DICTIONARY_COLUMNS = frozenset(
+    {"title", "postal_code", "city", "currency", "purchased_at"}
+)
+
+
+def cache_path(file_path):
+    """
+    Returns the path of the columnar cache file of a CSV file, next to it.
+
+    Args:
+        file_path (str): The path of the CSV file.
+
+    Returns:
+        str: The path of the cache file.
+    """
+    return f"{file_path}{EXTENSION}"
+
+
+def columnar_source(file_path):
+    """
+    Describes the version of a CSV file a cache file is valid for.
+
+    Take it before parsing the file, so a file modified during the parse is
+    parsed again on the next call.
+
+    Args:
+        file_path (str): The path of the CSV file.
+
+    Returns:
+        dict: The source path, size, modification time and parser version, as
+            stored in the metadata of the cache file.
+    """
+    stat = os.stat(file_path)
+    return {
+        b"source": os.path.abspath(file_path).encode("utf-8"),
+        b"size": str(stat.st_size).encode("ascii"),
+        b"mtime_ns": str(stat.st_mtime_ns).encode("ascii"),
+        b"version": COLUMNAR_VERSION.encode("ascii"),
+    }
+
+
+def _require_pyarrow():
+    """
+    Fails with an explicit message when pyarrow is not installed.
+    """
+    if pa is None:
+        raise RuntimeError("The columnar cache requires pyarrow (pip install pyarrow).")
+
+
+def _read_table(file_path, source):
+    """
+    Reads the cache file of a CSV file through a memory map, if it matches the current source.
+
+    Returns:
+        pyarrow.Table | None: The cached table, or None if it is missing, stale or unreadable.
+    """
+    _require_pyarrow()
+    path = cache_path(file_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        if reader.schema.metadata != source:
+            logger.info(f"Cache colonnaire périmé, nouvelle analyse : {path}")
+            return None
+        return reader.read_all()
+    except (OSError, pa.ArrowException) as e:
+        logger.warning(f"Cache colonnaire illisible ignoré ({path}) : {e}")
+        return None
+
+
+def _column(table, name):
+    """
+    Converts a column of the cached table to a list of Python values.
+
+    The values of a dictionary-encoded column are created once and shared by
+    every row, like the parsers do with a StringPool.
+    """
+    column = table.column(name)
+    if name not in DICTIONARY_COLUMNS:
+        return column.to_numpy().tolist()
+    column = column.combine_chunks()
+    indices = column.indices.to_numpy().tolist()
+    if not indices:
+        return []
+    values = column.dictionary.to_pylist()
+    if len(indices) == 1:
+        return [values[indices[0]]]
+    return list(itemgetter(*indices)(values))
+
+
+def _write_table(file_path, columns, rows, source):
+    """
+    Writes rows (tuples of values) to the cache file of a CSV file, next to it.
+
+    The file is an uncompressed Arrow IPC (feather) file in a single record
+    batch, so that reads can map its buffers without copying them. It is
+    written next to the previous one and renamed over it; a failure (e.g. a
+    read-only directory) is logged and only costs a parse on the next call.
+    """
+    _require_pyarrow()
+    path = cache_path(file_path)
+    values = list(zip(*rows)) or [()] * len(columns)
+    arrays = []
+    for name, column in zip(columns, values):
+        array = pa.array(column, type=pa.string() if not column else None)
+        if name in DICTIONARY_COLUMNS:
+            array = array.dictionary_encode()
+        arrays.append(array)
+    table = pa.table(arrays, names=list(columns)).replace_schema_metadata(source)
+    temporary_path = f"{path}.tmp"
+    try:
+        feather.write_feather(
+            table,
+            temporary_path,
+            compression="uncompressed",
+            chunksize=max(len(table), 1),
+        )
+        os.replace(temporary_path, path)
+    except OSError as e:
+        logger.warning(f"Impossible d'écrire le cache colonnaire {path} : {e}")
+
+
+def read_customers_cache(file_path, source):
+    """
+    Loads the customers of a CSV file from its columnar cache.
+
+    Args:
+        file_path (str): The path of the customers CSV file.
+        source (dict): The current version of the file (see columnar_source).
+
+    Returns:
+        list | None: The same customers as csv_parser.parse_customers, or None on a cache miss.
+    """
+    table = _read_table(file_path, source)
+    if table is None:
+        return None
+    return list(map(Customer, *(_column(table, name) for name in CUSTOMER_COLUMNS)))
+
+
+def write_customers_cache(file_path, customers, source):
+    """
+    Writes parsed customers to the columnar cache of their CSV file.
+
+    Args:
+        file_path (str): The path of the customers CSV file.
+        customers (list): The customers returned by parse_customers.
+        source (dict): The version of the file they were parsed from (see columnar_source).
+    """
+    _write_table(file_path, CUSTOMER_COLUMNS, map(row_values, customers), source)
+
+
+def read_purchases_cache(file_path, source):
+    """
+    Loads the purchases of a CSV file from its columnar cache.
+
+    The purchases are stored grouped by customer, in the order of the
+    dictionary returned by parse_purchases, so each group is a slice of the
+    columns whose bounds are found with a vectorized comparison.
+
+    Args:
+        file_path (str): The path of the purchases CSV file.
+        source (dict): The current version of the file (see columnar_source).
+
+    Returns:
+        dict | None: The same purchases grouped by customer ID as
+            csv_parser.parse_purchases, or None on a cache miss.
+    """
+    table = _read_table(file_path, source)
+    if table is None:
+        return None
+    if not table.num_rows:
+        return {}
+    customer_ids = table.column("customer_id").to_numpy()
+    purchases = list(
+        map(Purchase, *(_column(table, name) for name in Purchase.__slots__))
+    )
+    boundaries = (np.flatnonzero(customer_ids[1:] != customer_ids[:-1]) + 1).tolist()
+    starts = [0] + boundaries
+    ends = boundaries + [len(purchases)]
+    return {
+        customer_ids[start]: purchases[start:end] for start, end in zip(starts, ends)
+    }
+
+
+def write_purchases_cache(file_path, purchases, source):
+    """
+    Writes parsed purchases to the columnar cache of their CSV file.
+
+    Args:
+        file_path (str): The path of the purchases CSV file.
+        purchases (dict): The purchases returned by parse_purchases.
+        source (dict): The version of the file they were parsed from (see columnar_source).
+    """
+    rows = (
+        (customer_id,) + row_values(purchase)
+        for customer_id, customer_purchases in purchases.items()
+        for purchase in customer_purchases
+    )
+    _write_table(file_path, PURCHASE_COLUMNS, rows, source)
@@ -0,0 +1,131 @@
+import gzip
+import io
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is only needed for zstd
+    zstandard = None
+
+COMPRESSIONS = ("gzip", "zstd")
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+EXTENSIONS = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+MAGIC_BYTES = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+
+
+def _compressobj(compression, level=None):
+    """
+    Creates an incremental compressor.
+
+    Args:
+        compression (str): "gzip" or "zstd".
+        level (int, optional): The compression level. Defaults to DEFAULT_LEVELS.
+
+    Returns:
+        An object with `compress(data)` and `flush()` methods.
+
+    Raises:
+        ValueError: If the compression is not supported.
+        RuntimeError: If zstd is requested and zstandard is not installed.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    level = level if level is not None else DEFAULT_LEVELS[compression]
+    if compression == "gzip":
+        # wbits = 16 + MAX_WBITS writes a gzip header and trailer around the deflate stream.
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if zstandard is None:
+        raise RuntimeError(
+            "zstd compression requires zstandard (pip install zstandard)."
+        )
+    return zstandard.ZstdCompressor(level=level).compressobj()
+
+
+def iter_compressed(chunks, compression, level=None):
+    """
+    Incrementally compresses a stream of byte chunks.
+
+    Only the compressor state and the current chunk are held in memory, so a
+    streamed request body stays streamed once compressed.
+
+    Args:
+        chunks (iterable): The chunks of bytes to compress.
+        compression (str): "gzip" or "zstd".
+        level (int, optional): The compression level. Defaults to DEFAULT_LEVELS.
+
+    Yields:
+        bytes: The non-empty chunks of the compressed stream.
+    """
+    compressor = _compressobj(compression, level)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def compress(data, compression, level=None):
+    """
+    Compresses a complete body.
+
+    Args:
+        data (bytes): The bytes to compress.
+        compression (str): "gzip" or "zstd".
+        level (int, optional): The compression level. Defaults to DEFAULT_LEVELS.
+
+    Returns:
+        bytes: The compressed bytes.
+    """
+    return b"".join(iter_compressed([data], compression, level))
+
+
+def detect_compression(file_path):
+    """
+    Detects the compression of a file from its extension, then from its magic bytes.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        str | None: "gzip", "zstd" or None for an uncompressed file.
+    """
+    for extension, compression in EXTENSIONS.items():
+        if str(file_path).lower().endswith(extension):
+            return compression
+    with open(file_path, mode="rb") as file:
+        header = file.read(4)
+    for magic, compression in MAGIC_BYTES.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def open_text(file_path, encoding="utf-8"):
+    """
+    Opens a text file for reading, decompressing it on the fly if needed.
+
+    gzip and zstd files are decompressed as they are read, without writing an
+    intermediate file, so they can be used wherever a plain text file is.
+
+    Args:
+        file_path (str): The path of the file, plain, gzip or zstd compressed.
+        encoding (str): The text encoding.
+
+    Returns:
+        A text file object, to be used as a context manager.
+
+    Raises:
+        RuntimeError: If the file is zstd compressed and zstandard is not installed.
+    """
+    compression = detect_compression(file_path)
+    if compression == "gzip":
+        return gzip.open(file_path, mode="rt", encoding=encoding)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError(
+                "Reading zstd files requires zstandard (pip install zstandard)."
+            )
+        raw = open(file_path, mode="rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding=encoding)
+    return open(file_path, mode="r", encoding=encoding)
@@ -1,57 +1,209 @@
 import csv
 from datetime import datetime
+from app.utils.columnar_cache import (
+    columnar_source,
+    read_customers_cache,
+    read_purchases_cache,
+    write_customers_cache,
+    write_purchases_cache,
+)
+from app.utils.compression import open_text
 from app.utils.logger import logger
+from app.utils.mmap_reader import (
+    is_mappable,
+    iter_customers_mmap,
+    iter_purchases_mmap,
+)
+from app.utils.pandas_parser import (
+    parse_customers_columnar,
+    parse_purchases_columnar,
+)
+from app.utils.records import Customer, Purchase, StringPool
+from config import Config
 
+PARSER_ENGINES = ("csv", "pandas", "mmap")
+PURCHASE_REQUIRED_FIELDS = frozenset(
+    {"customer_id", "product_id", "quantity", "price", "currency", "date"}
+)
 
-def parse_customers(file_path):
+
+def _normalize_customer(row, pool):
     """
-    Parses a CSV file containing customer information and returns a list of customer dictionaries.
+    Builds a normalized customer record from a raw CSV row.
 
     Args:
-        file_path (str): The path to the CSV file to be parsed.
+        row (dict): A row read by csv.DictReader from the customers file.
+        pool (StringPool): The pool sharing the values of the low-cardinality columns.
 
     Returns:
-        list: A list of dictionaries, each containing customer information with the following keys:
-            - customer_id (str): The ID of the customer.
-            - title (str): The title of the customer, either "Female" or "Male".
-            - last_name (str): The last name of the customer.
-            - first_name (str): The first name of the customer.
-            - email (str): The email address of the customer.
+        Customer: The normalized customer (see parse_customers for the keys).
+    """
+    return Customer(
+        row["customer_id"],
+        "Female" if row.get("title") == "1" else "Male",
+        row.get("lastname", "").strip(),
+        row.get("firstname", "").strip(),
+        pool(row.get("postal_code", "").strip()),
+        pool(row.get("city", "").strip()),
+        row["email"].strip(),
+    )
+
+
+def _normalize_purchase(row, pool):
+    """
+    Builds a normalized purchase record from a raw CSV row.
+
+    Args:
+        row (dict): A row read by csv.DictReader from the purchases file.
+        pool (StringPool): The pool sharing the values of the low-cardinality columns.
+
+    Returns:
+        Purchase: The normalized purchase (see parse_purchases for the keys).
+    """
+    return Purchase(
+        row["product_id"],
+        int(row["quantity"]),
+        float(row["price"]),
+        pool(row["currency"].strip('"')),
+        pool(row["date"]),
+    )
+
+
+def iter_customers(file_path):
+    """
+    Lazily parses a CSV file containing customer information, one customer at a time.
+
+    Only the current row is held in memory, which makes this suitable for files
+    that do not fit in RAM. Invalid rows are logged and skipped exactly like in
+    parse_customers. gzip (.csv.gz) and zstd (.csv.zst) files are decompressed
+    on the fly.
+
+    Args:
+        file_path (str): The path to the CSV file to be parsed, optionally compressed.
+
+    Yields:
+        dict: A customer dictionary with the same keys as the ones returned by parse_customers.
     """
-    customers = []
     try:
-        with open(file_path, mode="r", encoding="utf-8") as file:
+        pool = StringPool()
+        with open_text(file_path) as file:
             reader = csv.DictReader(file, delimiter=";")
             for row in reader:
                 if not row.get("customer_id") or not row.get("email"):
                     logger.warning(f"Ligne invalide dans le fichier clients : {row}")
                     continue
 
-                customers.append(
-                    {
-                        "customer_id": row["customer_id"],
-                        "title": "Female" if row["title"] == "1" else "Male",
-                        "last_name": row.get("lastname", "").strip(),
-                        "first_name": row.get("firstname", "").strip(),
-                        "postal_code": row.get("postal_code", "").strip(),
-                        "city": row.get("city", "").strip(),
-                        "email": row["email"].strip(),
-                    }
-                )
+                yield _normalize_customer(row, pool)
 
         logger.info(f"Successfully parsed customers from {file_path}.")
     except Exception as e:
         logger.error(f"Error parsing customers file: {e}")
         raise
+
+
+def iter_valid_purchases(rows):
+    """
+    Validates and normalizes raw purchase rows, skipping and logging the invalid ones.
+
+    Args:
+        rows (iterable): The rows read by csv.DictReader from a purchases file.
+
+    Yields:
+        tuple: A (customer_id, purchase) pair (see iter_purchases).
+    """
+    pool = StringPool()
+    for row in rows:
+        if not PURCHASE_REQUIRED_FIELDS.issubset(row.keys()) or not all(
+            row.get(field) for field in PURCHASE_REQUIRED_FIELDS
+        ):
+            logger.warning(f"Ligne invalide dans le fichier achats : {row}")
+            continue
+
+        yield row["customer_id"], _normalize_purchase(row, pool)
+
+
+def iter_purchases(file_path):
+    """
+    Lazily parses a CSV file containing purchase data, one purchase at a time.
+
+    Only the current row is held in memory. Invalid rows are logged and skipped
+    exactly like in parse_purchases. gzip (.csv.gz) and zstd (.csv.zst) files
+    are decompressed on the fly.
+
+    Args:
+        file_path (str): The path to the CSV file containing purchase data, optionally compressed.
+
+    Yields:
+        tuple: A (customer_id, purchase) pair where purchase is a dictionary with
+               the same keys as the ones returned by parse_purchases.
+    """
+    try:
+        with open_text(file_path) as file:
+            yield from iter_valid_purchases(csv.DictReader(file, delimiter=";"))
+
+        logger.info(f"Successfully parsed purchases from {file_path}.")
+    except Exception as e:
+        logger.error(f"Error parsing purchases file: {e}")
+        raise
+
+
+def parse_customers(file_path, engine="csv", cache=None):
+    """
+    Parses a CSV file containing customer information and returns a list of customer dictionaries.
+
+    Args:
+        file_path (str): The path to the CSV file to be parsed.
+        engine (str): "csv" to parse the rows one by one with csv.DictReader, "pandas"
+            to parse, validate and convert whole columns at once (see pandas_parser), or
+            "mmap" to split the rows of a memory-mapped file into raw fields and decode
+            only the kept ones (see mmap_reader; compressed files fall back to "csv").
+        cache (bool, optional): Whether to load the customers from the columnar cache
+            file written next to the CSV file by a previous parse of the same version
+            of the file, and to write it after parsing (see columnar_cache). Defaults
+            to Config.COLUMNAR_CACHE.
+
+    Returns:
+        list: A list of dictionaries, each containing customer information with the following keys:
+            - customer_id (str): The ID of the customer.
+            - title (str): The title of the customer, either "Female" or "Male".
+            - last_name (str): The last name of the customer.
+            - first_name (str): The first name of the customer.
+            - email (str): The email address of the customer.
+    """
+    if cache is None:
+        cache = Config.COLUMNAR_CACHE
+    if cache:
+        source = columnar_source(file_path)
+        customers = read_customers_cache(file_path, source)
+        if customers is not None:
+            logger.info(f"Customers loaded from the columnar cache of {file_path}.")
+            return customers
+
+    if engine == "pandas":
+        customers = parse_customers_columnar(file_path)
+    elif engine == "mmap" and is_mappable(file_path):
+        customers = list(iter_customers_mmap(file_path))
+    else:
+        customers = list(iter_customers(file_path))
+    if cache:
+        write_customers_cache(file_path, customers, source)
     return customers
 
 
-def parse_purchases(file_path):
+def parse_purchases(file_path, engine="csv", cache=None):
     """
     Parses a CSV file containing purchase data and returns a dictionary of purchases grouped by customer ID.
 
     Args:
         file_path (str): The path to the CSV file containing purchase data.
+        engine (str): "csv" to parse the rows one by one with csv.DictReader, "pandas"
+            to parse, validate and convert whole columns at once (see pandas_parser), or
+            "mmap" to split the rows of a memory-mapped file into raw fields and decode
+            only the kept ones (see mmap_reader; compressed files fall back to "csv").
+        cache (bool, optional): Whether to load the purchases from the columnar cache
+            file written next to the CSV file by a previous parse of the same version
+            of the file, and to write it after parsing (see columnar_cache). Defaults
+            to Config.COLUMNAR_CACHE.
 
     Returns:
         dict: A dictionary where the keys are customer IDs and the values are lists of purchase details.
@@ -62,44 +214,30 @@ def parse_purchases(file_path):
               - "quantity" (int): The quantity of the purchased product.
               - "purchased_at" (str): The timestamp of the purchase.
     """
-    purchases = {}
-    try:
-        with open(file_path, mode="r", encoding="utf-8") as file:
-            reader = csv.DictReader(file, delimiter=";")
-
-            for row in reader:
-                required_fields = {
-                    "customer_id",
-                    "product_id",
-                    "quantity",
-                    "price",
-                    "currency",
-                    "date",
-                }
-                if not required_fields.issubset(row.keys()) or not all(
-                    row.get(field) for field in required_fields
-                ):
-                    logger.warning(f"Ligne invalide dans le fichier achats : {row}")
-                    continue
-
-                customer_id = row["customer_id"]
-                if customer_id not in purchases:
-                    purchases[customer_id] = []
+    if cache is None:
+        cache = Config.COLUMNAR_CACHE
+    if cache:
+        source = columnar_source(file_path)
+        purchases = read_purchases_cache(file_path, source)
+        if purchases is not None:
+            logger.info(f"Purchases loaded from the columnar cache of {file_path}.")
+            return purchases
 
-                purchases[customer_id].append(
-                    {
-                        "product_id": row["product_id"],
-                        "quantity": int(row["quantity"]),
-                        "price": float(row["price"]),
-                        "currency": row["currency"].strip('"'),
-                        "purchased_at": row["date"],
-                    }
-                )
+    if engine == "pandas":
+        purchases = parse_purchases_columnar(file_path)
+    else:
+        if engine == "mmap" and is_mappable(file_path):
+            pairs = iter_purchases_mmap(file_path)
+        else:
+            pairs = iter_purchases(file_path)
+        purchases = {}
+        for customer_id, purchase in pairs:
+            if customer_id not in purchases:
+                purchases[customer_id] = []
 
-        logger.info(f"Successfully parsed purchases from {file_path}.")
-    except Exception as e:
-        logger.error(f"Error parsing purchases file: {e}")
-        raise
+            purchases[customer_id].append(purchase)
+    if cache:
+        write_purchases_cache(file_path, purchases, source)
     return purchases
 
 
@@ -0,0 +1,114 @@
+import json
+import os
+from app.utils.fragment_cache import fragment_key
+from app.utils.json_formatter import format_customer
+from app.utils.logger import logger
+from app.utils.serializer import dumps
+
+
+class DeltaState:
+    """
+    Fingerprints of the customers uploaded by the last successful run, for delta uploads.
+
+    The fingerprint of a customer is the content hash of their customer row and
+    purchase rows (see fragment_cache.fragment_key). A run compares each
+    customer with the fingerprint stored for their customer ID and only sends
+    the new or changed customers; the customer IDs stored by the previous run
+    but absent from the input files are the deleted customers.
+
+    The fingerprints of the current run are only written by save, which the
+    caller invokes once the upload succeeded: after a failed run the state is
+    left untouched and the next run sends the same delta again.
+
+    Args:
+        path (str): The path of the JSON state file. A missing file means a first,
+            full upload.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.previous = {}
+        self.current = {}
+        self.changed = 0
+        self.unchanged = 0
+        if os.path.exists(path):
+            try:
+                with open(path, mode="r", encoding="utf-8") as file:
+                    self.previous = json.load(file)
+            except ValueError as e:
+                logger.warning(
+                    f"État de synchronisation illisible ignoré ({path}) : {e}"
+                )
+            logger.info(
+                f"État de synchronisation chargé depuis {path} : "
+                f"{len(self.previous)} clients."
+            )
+
+    def is_changed(self, customer, customer_purchases):
+        """
+        Records the fingerprint of a customer and tells whether they must be sent.
+
+        Args:
+            customer (dict): The customer information.
+            customer_purchases (list): The purchase details of this customer.
+
+        Returns:
+            bool: True if the customer is new or changed since the last successful run.
+        """
+        customer_id = customer["customer_id"]
+        fingerprint = fragment_key(customer, customer_purchases).hex()
+        self.current[customer_id] = fingerprint
+        if self.previous.get(customer_id) == fingerprint:
+            self.unchanged += 1
+            return False
+        self.changed += 1
+        return True
+
+    def deleted(self):
+        """
+        Returns the customers of the last successful run that are no longer in the input files.
+
+        Only meaningful once every customer of the run went through is_changed.
+
+        Returns:
+            list: The customer IDs of the deleted customers.
+        """
+        return [
+            customer_id
+            for customer_id in self.previous
+            if customer_id not in self.current
+        ]
+
+    def save(self):
+        """
+        Replaces the stored fingerprints with those of the current run.
+
+        The file is written next to the previous one and renamed over it, so an
+        interrupted save leaves the previous state intact.
+        """
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, mode="wb") as file:
+            file.write(dumps(self.current))
+        os.replace(temporary_path, self.path)
+        logger.info(
+            f"État de synchronisation enregistré dans {self.path} : "
+            f"{self.changed} clients envoyés, {self.unchanged} inchangés."
+        )
+
+
+def iter_changed_customers(customers, purchases, state):
+    """
+    Lazily formats the customers that changed since the last successful run.
+
+    Args:
+        customers (iterable): Any iterable of customer dictionaries, e.g. the generator returned by iter_customers.
+        purchases (dict): A dictionary where keys are customer IDs and values are lists of purchase details.
+        state (DeltaState): The fingerprints of the last successful run.
+
+    Yields:
+        dict: The formatted new or changed customers (see json_formatter.format_customer).
+    """
+    for customer in customers:
+        customer_purchases = purchases.get(customer["customer_id"], [])
+        if state.is_changed(customer, customer_purchases):
+            yield format_customer(customer, customer_purchases)
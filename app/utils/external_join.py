@@ -0,0 +1,204 @@
+import heapq
+import json
+import os
+import tempfile
+from app.utils.json_formatter import format_customer
+from app.utils.logger import logger
+from app.utils.records import json_default
+from config import Config
+
+MAX_MERGE_FAN_IN = 128
+
+
+def _sort_key(entry):
+    """
+    Returns the ordering key of a spilled entry: its join key, then its input position.
+    """
+    return entry[0], entry[1]
+
+
+def _load_item(line):
+    """
+    Deserializes the item stored in a spilled entry.
+    """
+    return json.loads(line.split("\t", 2)[2])
+
+
+def _write_run(lines, directory, index):
+    """
+    Writes already serialized entries to a new run file.
+
+    Args:
+        lines (iterable): The serialized entries, in sorted order.
+        directory (str): The directory holding the run files.
+        index (int): The sequence number of the run, used to name the file.
+
+    Returns:
+        str: The path of the written run file.
+    """
+    path = os.path.join(directory, f"run_{index:06d}.jsonl")
+    with open(path, mode="w", encoding="utf-8") as run:
+        for line in lines:
+            run.write(line)
+            run.write("\n")
+    return path
+
+
+def _read_run(path):
+    """
+    Reads back the entries of a run file.
+
+    Args:
+        path (str): The path of the run file.
+
+    Yields:
+        tuple: (key, sequence, serialized entry) triples, in the order of the file.
+    """
+    with open(path, mode="r", encoding="utf-8") as run:
+        for line in run:
+            line = line.rstrip("\n")
+            key, sequence, _ = line.split("\t", 2)
+            yield json.loads(key), int(sequence), line
+
+
+def _merge_runs(paths):
+    """
+    Merges sorted run files into a single sorted stream.
+
+    Args:
+        paths (list): The paths of the run files to merge.
+
+    Returns:
+        iterator: The (key, sequence, serialized entry) triples in sorted order.
+    """
+    return heapq.merge(*(_read_run(path) for path in paths), key=_sort_key)
+
+
+def external_sort(items, key, memory_budget=None, tmp_dir=None):
+    """
+    Sorts an iterable that may not fit in memory, spilling sorted runs to temporary files.
+
+    Items are buffered until their serialized size reaches `memory_budget`, then
+    the buffer is sorted and written to a run file. The runs are finally merged
+    with a k-way merge. The sort is stable: items sharing the same key come out in
+    their input order. When everything fits in the budget nothing touches the disk.
+
+    Args:
+        items (iterable): JSON-serializable items to sort. Tuples come back as lists.
+        key (callable): A function returning the sort key (a str) of an item.
+        memory_budget (int, optional): Approximate number of bytes to buffer before
+            spilling a run. Defaults to Config.JOIN_MEMORY_BUDGET.
+        tmp_dir (str, optional): The directory in which the temporary runs are created.
+
+    Yields:
+        The items sorted by key.
+    """
+    if memory_budget is None:
+        memory_budget = Config.JOIN_MEMORY_BUDGET
+
+    with tempfile.TemporaryDirectory(prefix="external_sort_", dir=tmp_dir) as directory:
+        runs = []
+        buffer = []
+        buffered_bytes = 0
+        for sequence, item in enumerate(items):
+            item_key = key(item)
+            # JSON never contains a raw tab, which makes it a safe field separator.
+            line = f"{json.dumps(item_key)}\t{sequence}\t{json.dumps(item, default=json_default)}"
+            buffer.append((item_key, sequence, line))
+            buffered_bytes += len(line)
+            if buffered_bytes >= memory_budget:
+                buffer.sort(key=_sort_key)
+                runs.append(
+                    _write_run((entry[2] for entry in buffer), directory, len(runs))
+                )
+                buffer = []
+                buffered_bytes = 0
+
+        buffer.sort(key=_sort_key)
+        if not runs:
+            for _, _, line in buffer:
+                yield _load_item(line)
+            return
+
+        if buffer:
+            runs.append(
+                _write_run((entry[2] for entry in buffer), directory, len(runs))
+            )
+            buffer = []
+        logger.info(f"External sort spilled {len(runs)} runs to {directory}.")
+
+        run_count = len(runs)
+        while len(runs) > MAX_MERGE_FAN_IN:
+            merged = []
+            for start in range(0, len(runs), MAX_MERGE_FAN_IN):
+                group = runs[start : start + MAX_MERGE_FAN_IN]
+                merged.append(
+                    _write_run(
+                        (entry[2] for entry in _merge_runs(group)), directory, run_count
+                    )
+                )
+                run_count += 1
+                for path in group:
+                    os.remove(path)
+            runs = merged
+
+        for _, _, line in _merge_runs(runs):
+            yield _load_item(line)
+
+
+def merge_join(customers, purchase_pairs):
+    """
+    Joins a customer stream with a purchase stream, both sorted by customer ID.
+
+    Purchases whose customer ID does not appear in the customers stream are dropped.
+    Customers sharing the same ID all receive the same purchases.
+
+    Args:
+        customers (iterable): Customer dictionaries sorted by "customer_id".
+        purchase_pairs (iterable): (customer_id, purchase) pairs sorted by customer_id.
+
+    Yields:
+        tuple: A (customer, purchases) pair where purchases is the list of the customer's purchases.
+    """
+    purchase_pairs = iter(purchase_pairs)
+    pending = next(purchase_pairs, None)
+    current_id, current_purchases = None, []
+    for customer in customers:
+        customer_id = customer["customer_id"]
+        if customer_id != current_id:
+            current_id, current_purchases = customer_id, []
+            while pending is not None and pending[0] < customer_id:
+                pending = next(purchase_pairs, None)
+            while pending is not None and pending[0] == customer_id:
+                current_purchases.append(pending[1])
+                pending = next(purchase_pairs, None)
+        yield customer, current_purchases
+
+
+def iter_external_join(customers, purchase_pairs, memory_budget=None, tmp_dir=None):
+    """
+    Formats customer data for API consumption with a disk-backed sort-merge join.
+
+    This is the counterpart of iter_formatted_customers for purchase files that do
+    not fit in memory: both inputs are externally sorted by customer ID and then
+    merge-joined, so memory usage is bounded by `memory_budget` for each side.
+    Customers are emitted in customer ID order rather than in file order.
+
+    Args:
+        customers (iterable): Customer dictionaries, e.g. from iter_customers.
+        purchase_pairs (iterable): (customer_id, purchase) pairs, e.g. from iter_purchases.
+        memory_budget (int, optional): Approximate number of bytes buffered per sort
+            before spilling. Defaults to Config.JOIN_MEMORY_BUDGET.
+        tmp_dir (str, optional): The directory in which the temporary runs are created.
+
+    Yields:
+        dict: The formatted customer information including their purchases.
+    """
+    sorted_customers = external_sort(
+        customers, lambda customer: customer["customer_id"], memory_budget, tmp_dir
+    )
+    sorted_purchases = external_sort(
+        purchase_pairs, lambda pair: pair[0], memory_budget, tmp_dir
+    )
+    for customer, customer_purchases in merge_join(sorted_customers, sorted_purchases):
+        yield format_customer(customer, customer_purchases)
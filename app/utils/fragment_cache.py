@@ -0,0 +1,138 @@
+import hashlib
+import io
+import os
+import pickle
+from app.utils.json_formatter import format_customer
+from app.utils.logger import logger
+from app.utils.records import row_values
+from app.utils.serializer import Fragment, dumps
+
+# Bump when format_customer changes, so fragments cached by older versions are not reused.
+FRAGMENT_VERSION = 2
+
+
+def fragment_key(customer, customer_purchases):
+    """
+    Builds the content hash of a customer and their purchases.
+
+    Every field of the customer row and of the purchase rows is hashed, so any
+    change in the input files gives a new key. The values are pickled rather
+    than formatted as text, which is much cheaper than serializing them (no
+    number formatting). The pickler runs without its memo, so the pickle only
+    depends on the values and not on which strings are shared: the same rows
+    parsed by any engine get the same key.
+
+    Args:
+        customer (dict): The customer information.
+        customer_purchases (list): The purchase details of this customer.
+
+    Returns:
+        bytes: The 16-byte BLAKE2b digest.
+    """
+    values = row_values(customer), tuple(map(row_values, customer_purchases))
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.fast = True
+    pickler.dump(values)
+    return hashlib.blake2b(buffer.getbuffer(), digest_size=16).digest()
+
+
+class FragmentCache:
+    """
+    Caches the serialized JSON of each formatted customer between runs.
+
+    Most customers do not change from one run to the next. The fragment of a
+    customer (format_customer serialized by serializer.dumps) is stored under
+    the content hash of its input rows (see fragment_key); on the next run the
+    rows are hashed again, which is cheaper than serializing them, the cached
+    bytes are reused when the hash matches, and only the new or changed
+    customers are serialized.
+
+    The cache file is a pickle of the digests and fragments. save writes only
+    the fragments used by the run, so customers that disappeared or changed do
+    not accumulate. The file is only meant to be read back by this class: never
+    load a cache file from an untrusted source.
+
+    Args:
+        path (str, optional): The path of the cache file. Without a path the
+            cache only lives in memory.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.fragments = {}
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, mode="rb") as file:
+                    version, fragments = pickle.load(file)
+            except Exception as e:
+                logger.warning(f"Cache de fragments illisible ignoré ({path}) : {e}")
+                return
+            if version != FRAGMENT_VERSION:
+                logger.info(f"Cache de fragments d'une autre version ignoré : {path}")
+                return
+            self.fragments = fragments
+            logger.info(
+                f"Cache de fragments chargé depuis {path} : {len(fragments)} clients."
+            )
+
+    def encode(self, customer, customer_purchases):
+        """
+        Returns the serialized formatted customer, from the cache when the rows did not change.
+
+        Args:
+            customer (dict): The customer information.
+            customer_purchases (list): The purchase details of this customer.
+
+        Returns:
+            Fragment: The JSON of format_customer(customer, customer_purchases).
+        """
+        key = fragment_key(customer, customer_purchases)
+        encoded = self.fragments.get(key)
+        if encoded is None:
+            encoded = dumps(format_customer(customer, customer_purchases))
+            self.fragments[key] = encoded
+            self.misses += 1
+        else:
+            self.hits += 1
+        self.used[key] = encoded
+        return Fragment(encoded)
+
+    def save(self):
+        """
+        Writes the fragments used since the cache was loaded to the cache file.
+
+        The file is written next to the previous one and renamed over it, so an
+        interrupted save leaves the previous cache intact.
+        """
+        if not self.path:
+            return
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, mode="wb") as file:
+            pickle.dump(
+                (FRAGMENT_VERSION, self.used), file, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(temporary_path, self.path)
+        logger.info(
+            f"Cache de fragments : {self.hits} réutilisés, {self.misses} encodés, "
+            f"enregistré dans {self.path}."
+        )
+
+
+def iter_cached_customers(customers, purchases, cache):
+    """
+    Lazily formats and serializes customers, reusing the cached fragments.
+
+    Args:
+        customers (iterable): Any iterable of customer dictionaries, e.g. the generator returned by iter_customers.
+        purchases (dict): A dictionary where keys are customer IDs and values are lists of purchase details.
+        cache (FragmentCache): The cache of serialized customers.
+
+    Yields:
+        Fragment: The serialized formatted customer, ready to be spliced in a payload.
+    """
+    for customer in customers:
+        yield cache.encode(customer, purchases.get(customer["customer_id"], []))
@@ -1,3 +1,44 @@
+import json
+from app.utils.serializer import encode_record
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def format_customer(customer, customer_purchases):
+    """
+    Formats a single customer and attaches their purchases.
+
+    Args:
+        customer (dict): The customer information.
+        customer_purchases (list): The purchase details of this customer.
+
+    Returns:
+        dict: The formatted customer information including their purchases.
+    """
+    return {
+        "salutation": customer["title"],
+        "last_name": customer["last_name"],
+        "first_name": customer["first_name"],
+        "email": customer["email"],
+        "purchases": customer_purchases,
+    }
+
+
+def iter_formatted_customers(customers, purchases):
+    """
+    Lazily formats customer data for API consumption, one customer at a time.
+
+    Args:
+        customers (iterable): Any iterable of customer dictionaries, e.g. the generator returned by iter_customers.
+        purchases (dict): A dictionary where keys are customer IDs and values are lists of purchase details.
+
+    Yields:
+        dict: The formatted customer information including their purchases.
+    """
+    for customer in customers:
+        yield format_customer(customer, purchases.get(customer["customer_id"], []))
+
+
 def format_customers_for_api(customers, purchases):
     """
     Formats customer data for API consumption.
@@ -9,17 +50,106 @@ def format_customers_for_api(customers, purchases):
     Returns:
         list: A list of dictionaries, where each dictionary contains formatted customer information including their purchases.
     """
-    formatted_data = []
-    for customer in customers:
-        customer_id = customer["customer_id"]
-        customer_purchases = purchases.get(customer_id, [])
-        formatted_data.append(
-            {
-                "salutation": customer["title"],
-                "last_name": customer["last_name"],
-                "first_name": customer["first_name"],
-                "email": customer["email"],
-                "purchases": customer_purchases,
-            }
-        )
-    return formatted_data
+    return list(iter_formatted_customers(customers, purchases))
+
+
+def iter_json_array(records, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Incrementally encodes an iterable of records as a JSON array.
+
+    The records are encoded one by one and emitted in chunks of roughly
+    `chunk_size` bytes, so the whole document is never held in memory.
+
+    Args:
+        records (iterable): The records to encode; Fragment records are spliced as-is.
+        chunk_size (int): The approximate size in bytes of the emitted chunks.
+
+    Yields:
+        bytes: Consecutive chunks of the UTF-8 encoded JSON array.
+    """
+    buffer = [b"["]
+    size = 1
+    separator = b""
+    for record in records:
+        encoded = separator + encode_record(record)
+        buffer.append(encoded)
+        size += len(encoded)
+        separator = b","
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    buffer.append(b"]")
+    yield b"".join(buffer)
+
+
+def iter_ndjson(records, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Incrementally encodes an iterable of records as newline-delimited JSON (NDJSON).
+
+    Args:
+        records (iterable): The records to encode.
+        chunk_size (int): The approximate size in bytes of the emitted chunks.
+
+    Yields:
+        bytes: Consecutive chunks of UTF-8 encoded JSON lines.
+    """
+    buffer = []
+    size = 0
+    for record in records:
+        encoded = encode_record(record) + b"\n"
+        buffer.append(encoded)
+        size += len(encoded)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def write_ndjson(records, file_path):
+    """
+    Writes records to a newline-delimited JSON (NDJSON) file.
+
+    Args:
+        records (iterable): The records to write; they are consumed lazily.
+        file_path (str): The path of the file to write.
+
+    Returns:
+        int: The number of records written.
+    """
+    count = 0
+    with open(file_path, mode="wb") as file:
+        for record in records:
+            file.write(encode_record(record) + b"\n")
+            count += 1
+    return count
+
+
+def read_ndjson(file_path):
+    """
+    Reads the records of a newline-delimited JSON (NDJSON) file, one at a time.
+
+    Blank lines are ignored, so files written by write_ndjson or streamed by the
+    `format=ndjson` routes can be replayed as-is.
+
+    Args:
+        file_path (str): The path of the file to read.
+
+    Yields:
+        The decoded records.
+
+    Raises:
+        ValueError: If a line is not valid JSON.
+    """
+    with open(file_path, mode="r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(
+                    f"Invalid JSON on line {line_number} of {file_path}: {e}"
+                ) from e
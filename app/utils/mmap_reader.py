@@ -0,0 +1,243 @@
+import csv
+import io
+import mmap
+import os
+import re
+from app.utils.compression import detect_compression
+from app.utils.logger import logger
+from app.utils.records import Customer, Purchase, StringPool
+
+DELIMITER = b";"
+SIMPLE_QUOTED_LINE = re.compile(
+    rb'(?:"[^";\n]*"|[^";\n]*)(?:;(?:"[^";\n]*"|[^";\n]*))*\r?'
+)
+
+
+def is_mappable(file_path):
+    """
+    Tells whether a file can be read through a memory map.
+
+    Compressed files must be decompressed as a stream and empty files cannot be mapped.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        bool: True if the file is a non-empty, uncompressed file.
+    """
+    return os.path.getsize(file_path) > 0 and not detect_compression(file_path)
+
+
+def _decode_row(header, fields):
+    """
+    Builds the dictionary csv.DictReader would have returned for a row, for logging.
+    """
+    values = [field.decode("utf-8", "replace") for field in fields]
+    row = dict(zip(header, values))
+    if len(values) > len(header):
+        row[None] = values[len(header) :]
+    for name in header[len(values) :]:
+        row[name] = None
+    return row
+
+
+def _field(fields, position):
+    """
+    Returns a raw field of a row, or None if the row is too short or the column does not exist.
+    """
+    if position is None or position >= len(fields):
+        return None
+    return fields[position]
+
+
+def _text(field):
+    """
+    Decodes a raw field, mapping a missing field to an empty string.
+    """
+    return field.decode("utf-8") if field is not None else ""
+
+
+def _split_quoted(line):
+    """
+    Splits a line whose quoted fields are simple ("EUR"), or returns None.
+
+    A field is simple when it is wrapped in quotes and contains no other quote
+    nor delimiter, which rules out escaped quotes and quoted delimiters or
+    newlines; lines with such fields are left to the csv module.
+    """
+    if not SIMPLE_QUOTED_LINE.fullmatch(line):
+        return None
+    return line.replace(b'"', b"").split(DELIMITER)
+
+
+def iter_mmap_rows(file_path):
+    """
+    Reads the rows of a semicolon-separated file through a read-only memory map.
+
+    Lines are read straight from the mapping and split into raw byte fields, so
+    nothing is decoded until a field is actually kept. Simple quoted fields
+    ("EUR") are unquoted in place; other lines containing a quote character are
+    handed to the csv module (joined with the following lines while a quoted
+    field is open) to keep its quoting rules. Blank lines are
+    skipped, like csv.DictReader does. Mapping the file (instead of reading it)
+    lets every process reading the same file share its pages in the OS page cache.
+
+    Args:
+        file_path (str): The path of an uncompressed, non-empty file.
+
+    Returns:
+        tuple: The field names of the header and an iterator of rows, each row
+            being a list of raw (bytes) fields.
+    """
+    file = open(file_path, mode="rb")
+    try:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        file.close()
+    header = next(
+        csv.reader([mapping.readline().decode("utf-8").rstrip("\r\n")], delimiter=";")
+    )
+
+    def rows():
+        with mapping:
+            for line in iter(mapping.readline, b""):
+                if b'"' in line:
+                    fields = _split_quoted(line.rstrip(b"\r\n"))
+                    if fields is not None:
+                        yield fields
+                        continue
+                    while line.count(b'"') % 2:
+                        next_line = mapping.readline()
+                        if not next_line:
+                            break
+                        line += next_line
+                    text = io.StringIO(line.decode("utf-8"), newline="")
+                    for values in csv.reader(text, delimiter=";"):
+                        if values:
+                            yield [value.encode("utf-8") for value in values]
+                    continue
+                line = line.rstrip(b"\r\n")
+                if line:
+                    yield line.split(DELIMITER)
+
+    return header, rows()
+
+
+def iter_customers_mmap(file_path):
+    """
+    Lazily parses a customers CSV file through a memory map.
+
+    Args:
+        file_path (str): The path to the CSV file to be parsed (uncompressed).
+
+    Yields:
+        dict: The same customer dictionaries as csv_parser.iter_customers.
+    """
+    try:
+        header, rows = iter_mmap_rows(file_path)
+        pool = StringPool()
+        positions = {name: position for position, name in enumerate(header)}
+        customer_id_at = positions.get("customer_id")
+        email_at = positions.get("email")
+        title_at = positions.get("title")
+        last_name_at = positions.get("lastname")
+        first_name_at = positions.get("firstname")
+        postal_code_at = positions.get("postal_code")
+        city_at = positions.get("city")
+
+        for fields in rows:
+            customer_id = _field(fields, customer_id_at)
+            email = _field(fields, email_at)
+            if not customer_id or not email:
+                row = _decode_row(header, fields)
+                logger.warning(f"Ligne invalide dans le fichier clients : {row}")
+                continue
+
+            yield Customer(
+                customer_id.decode("utf-8"),
+                "Female" if _field(fields, title_at) == b"1" else "Male",
+                _text(_field(fields, last_name_at)).strip(),
+                _text(_field(fields, first_name_at)).strip(),
+                pool(_text(_field(fields, postal_code_at)).strip()),
+                pool(_text(_field(fields, city_at)).strip()),
+                email.decode("utf-8").strip(),
+            )
+
+        logger.info(f"Successfully parsed customers from {file_path}.")
+    except Exception as e:
+        logger.error(f"Error parsing customers file: {e}")
+        raise
+
+
+def iter_purchases_mmap(file_path):
+    """
+    Lazily parses a purchases CSV file through a memory map.
+
+    Args:
+        file_path (str): The path to the CSV file containing purchase data (uncompressed).
+
+    Yields:
+        tuple: The same (customer_id, purchase) pairs as csv_parser.iter_purchases.
+    """
+    required_fields = (
+        "customer_id",
+        "product_id",
+        "quantity",
+        "price",
+        "currency",
+        "date",
+    )
+    try:
+        header, rows = iter_mmap_rows(file_path)
+        pool = StringPool()
+        positions = {name: position for position, name in enumerate(header)}
+        customer_id_at, product_id_at, quantity_at, price_at, currency_at, date_at = (
+            positions.get(name) for name in required_fields
+        )
+
+        # Rows with every column can be indexed directly, the others go through _field.
+        width = max(positions.values(), default=0) + 1
+        if None in (
+            customer_id_at,
+            product_id_at,
+            quantity_at,
+            price_at,
+            currency_at,
+            date_at,
+        ):
+            width = None
+
+        for fields in rows:
+            if width is not None and len(fields) >= width:
+                customer_id = fields[customer_id_at]
+                product_id = fields[product_id_at]
+                quantity = fields[quantity_at]
+                price = fields[price_at]
+                currency = fields[currency_at]
+                date = fields[date_at]
+            else:
+                customer_id = _field(fields, customer_id_at)
+                product_id = _field(fields, product_id_at)
+                quantity = _field(fields, quantity_at)
+                price = _field(fields, price_at)
+                currency = _field(fields, currency_at)
+                date = _field(fields, date_at)
+            if not (
+                customer_id and product_id and quantity and price and currency and date
+            ):
+                row = _decode_row(header, fields)
+                logger.warning(f"Ligne invalide dans le fichier achats : {row}")
+                continue
+
+            yield customer_id.decode("utf-8"), Purchase(
+                product_id.decode("utf-8"),
+                int(quantity),
+                float(price),
+                pool(currency.decode("utf-8").strip('"')),
+                pool(date.decode("utf-8")),
+            )
+
+        logger.info(f"Successfully parsed purchases from {file_path}.")
+    except Exception as e:
+        logger.error(f"Error parsing purchases file: {e}")
+        raise
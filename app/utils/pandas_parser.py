@@ -0,0 +1,240 @@
+import csv
+from app.utils.compression import open_text
+from app.utils.logger import logger
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pragma: no cover - pandas is only needed by the pandas engine
+    np = pd = None
+
+PURCHASE_COLUMNS = [
+    "customer_id",
+    "product_id",
+    "quantity",
+    "price",
+    "currency",
+    "date",
+]
+PURCHASE_FIELDS = ("product_id", "quantity", "price", "currency", "purchased_at")
+
+
+def _read_frame(file_path):
+    """
+    Reads a semicolon-separated file into a DataFrame of strings.
+
+    Every column is kept as text and missing values as empty strings, like
+    csv.DictReader does, so that the validation rules of csv_parser apply unchanged.
+    Like csv.DictReader, the fields of a row beyond the header are ignored
+    rather than failing the whole file (e.g. a trailing ";"), and an empty file
+    gives no rows.
+
+    Args:
+        file_path (str): The path of the file, optionally gzip or zstd compressed.
+
+    Returns:
+        pandas.DataFrame: The raw rows.
+    """
+    if pd is None:
+        raise RuntimeError(
+            "The pandas parser engine requires pandas (pip install pandas)."
+        )
+    with open_text(file_path) as file:
+        header = next(csv.reader(file, delimiter=";"), None)
+        if header is None:
+            return pd.DataFrame(dtype=object)
+        frame = pd.read_csv(
+            file,
+            sep=";",
+            dtype=str,
+            keep_default_na=False,
+            header=None,
+            names=header,
+            usecols=range(len(header)),
+        )
+    return frame.fillna("")
+
+
+def _column(frame, name):
+    """
+    Returns a column of the frame, or a column of empty strings if it is missing.
+    """
+    if name in frame.columns:
+        return frame[name]
+    return pd.Series("", index=frame.index, dtype=object)
+
+
+def _log_invalid_rows(frame, valid, file_name):
+    """
+    Logs the rows rejected by the validation mask, like csv_parser does.
+    """
+    for row in frame[~valid].to_dict("records"):
+        logger.warning(f"Ligne invalide dans le fichier {file_name} : {row}")
+
+
+def customers_frame(file_path):
+    """
+    Parses a customers CSV file with vectorized column operations.
+
+    Args:
+        file_path (str): The path to the CSV file to be parsed, optionally compressed.
+
+    Returns:
+        pandas.DataFrame: One row per valid customer, with the columns of the
+            dictionaries returned by csv_parser.parse_customers. The low-cardinality
+            columns are categorical, so each distinct value is stored once.
+    """
+    frame = _read_frame(file_path)
+    valid = (_column(frame, "customer_id") != "") & (_column(frame, "email") != "")
+    _log_invalid_rows(frame, valid, "clients")
+    frame = frame[valid]
+    return pd.DataFrame(
+        {
+            "customer_id": _column(frame, "customer_id"),
+            "title": (_column(frame, "title") == "1").map(
+                {True: "Female", False: "Male"}
+            ),
+            "last_name": _column(frame, "lastname").str.strip(),
+            "first_name": _column(frame, "firstname").str.strip(),
+            "postal_code": _column(frame, "postal_code").str.strip().astype("category"),
+            "city": _column(frame, "city").str.strip().astype("category"),
+            "email": _column(frame, "email").str.strip(),
+        }
+    )
+
+
+def purchases_frame(file_path):
+    """
+    Parses a purchases CSV file with vectorized column operations.
+
+    Args:
+        file_path (str): The path to the CSV file containing purchase data, optionally compressed.
+
+    Returns:
+        pandas.DataFrame: One row per valid purchase, with a "customer_id" column
+            followed by the keys of the purchases returned by csv_parser.parse_purchases.
+            "currency" and "purchased_at" are categorical.
+
+    Raises:
+        ValueError: If a quantity or a price cannot be converted to a number.
+    """
+    frame = _read_frame(file_path)
+    valid = pd.Series(True, index=frame.index)
+    for name in PURCHASE_COLUMNS:
+        valid &= _column(frame, name) != ""
+    _log_invalid_rows(frame, valid, "achats")
+    frame = frame[valid]
+    return pd.DataFrame(
+        {
+            "customer_id": _column(frame, "customer_id"),
+            "product_id": _column(frame, "product_id"),
+            "quantity": _column(frame, "quantity").astype("int64"),
+            "price": _column(frame, "price").astype("float64"),
+            "currency": _column(frame, "currency").str.strip('"').astype("category"),
+            "purchased_at": _column(frame, "date").astype("category"),
+        }
+    )
+
+
+def parse_customers_columnar(file_path):
+    """
+    Parses a customers CSV file with the pandas engine.
+
+    Args:
+        file_path (str): The path to the CSV file to be parsed, optionally compressed.
+
+    Returns:
+        list: The same customer dictionaries as csv_parser.parse_customers.
+    """
+    try:
+        customers = customers_frame(file_path).to_dict("records")
+        logger.info(f"Successfully parsed customers from {file_path}.")
+        return customers
+    except Exception as e:
+        logger.error(f"Error parsing customers file: {e}")
+        raise
+
+
+def parse_purchases_columnar(file_path):
+    """
+    Parses a purchases CSV file with the pandas engine.
+
+    Args:
+        file_path (str): The path to the CSV file containing purchase data, optionally compressed.
+
+    Returns:
+        dict: The same purchases grouped by customer ID as csv_parser.parse_purchases.
+    """
+    try:
+        frame = purchases_frame(file_path)
+        purchases = {}
+        records = frame.drop(columns="customer_id").to_dict("records")
+        for customer_id, purchase in zip(frame["customer_id"], records):
+            if customer_id not in purchases:
+                purchases[customer_id] = []
+
+            purchases[customer_id].append(purchase)
+        logger.info(f"Successfully parsed purchases from {file_path}.")
+        return purchases
+    except Exception as e:
+        logger.error(f"Error parsing purchases file: {e}")
+        raise
+
+
+def iter_formatted_customers_columnar(customers, purchases):
+    """
+    Joins customer and purchase frames and formats the customers for the API, one at a time.
+
+    The purchases are sorted by customer ID once (stable sort, so each customer
+    keeps the file order) and the bounds of every customer's group are found
+    with two vectorized binary searches. Each customer then takes a slice of
+    the purchase columns; the purchase dictionaries are only built when the
+    customer is yielded, i.e. when it is about to be serialized.
+
+    Args:
+        customers (pandas.DataFrame): The customers, as returned by customers_frame.
+        purchases (pandas.DataFrame): The purchases, as returned by purchases_frame.
+
+    Yields:
+        dict: The formatted customer, with the same keys as json_formatter.format_customer.
+    """
+    purchase_ids = purchases["customer_id"].to_numpy()
+    order = np.argsort(purchase_ids, kind="stable")
+    sorted_ids = purchase_ids[order]
+    customer_ids = customers["customer_id"].to_numpy()
+    starts = np.searchsorted(sorted_ids, customer_ids, side="left").tolist()
+    ends = np.searchsorted(sorted_ids, customer_ids, side="right").tolist()
+    columns = [purchases[field].to_numpy()[order].tolist() for field in PURCHASE_FIELDS]
+
+    for title, last_name, first_name, email, start, end in zip(
+        customers["title"].tolist(),
+        customers["last_name"].tolist(),
+        customers["first_name"].tolist(),
+        customers["email"].tolist(),
+        starts,
+        ends,
+    ):
+        yield {
+            "salutation": title,
+            "last_name": last_name,
+            "first_name": first_name,
+            "email": email,
+            "purchases": [
+                dict(zip(PURCHASE_FIELDS, row))
+                for row in zip(*(column[start:end] for column in columns))
+            ],
+        }
+
+
+def format_customers_columnar(customers, purchases):
+    """
+    Joins customer and purchase frames and formats the customers for the API.
+
+    Args:
+        customers (pandas.DataFrame): The customers, as returned by customers_frame.
+        purchases (pandas.DataFrame): The purchases, as returned by purchases_frame.
+
+    Returns:
+        list: The same formatted customers as json_formatter.format_customers_for_api.
+    """
+    return list(iter_formatted_customers_columnar(customers, purchases))
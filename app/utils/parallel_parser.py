@@ -0,0 +1,174 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from app.utils.compression import detect_compression
+from app.utils.csv_parser import iter_valid_purchases, parse_purchases
+from app.utils.logger import logger
+
+SCAN_BLOCK_SIZE = 1024 * 1024
+MIN_SHARD_BYTES = 1024 * 1024
+
+
+def _read_header(file_path):
+    """
+    Reads the header of a semicolon-separated file.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        tuple: The field names and the offset of the first byte after the header.
+    """
+    with open(file_path, mode="rb") as file:
+        line = file.readline()
+    fieldnames = next(csv.reader([line.decode("utf-8")], delimiter=";"), [])
+    return fieldnames, len(line)
+
+
+def split_byte_ranges(file_path, shards, start=0):
+    """
+    Splits a CSV file into byte ranges that start and end on record boundaries.
+
+    The file is scanned once in large blocks while tracking whether the current
+    position is inside a quoted field (an odd number of quote characters since
+    `start`), so a newline embedded in a quoted field is never used as a boundary.
+    Counting quotes is much cheaper than parsing, so the scan is I/O bound.
+
+    Args:
+        file_path (str): The path of the file.
+        shards (int): The desired number of ranges.
+        start (int): The offset of the first record, i.e. the size of the header.
+
+    Returns:
+        list: (start, end) byte offsets of at most `shards` non-empty ranges.
+    """
+    size = os.path.getsize(file_path)
+    targets = [start + (size - start) * shard // shards for shard in range(1, shards)]
+    boundaries = [start]
+    in_quotes = False
+    with open(file_path, mode="rb") as file:
+        file.seek(start)
+        position = start
+        while targets:
+            block = file.read(SCAN_BLOCK_SIZE)
+            if not block:
+                break
+            offset = 0
+            block_quotes = 0
+            while targets and offset < len(block):
+                # Only the newlines past the next target can become boundaries.
+                skip_to = max(targets[0] - position, offset)
+                if skip_to >= len(block):
+                    break
+                block_quotes += block.count(b'"', offset, skip_to)
+                newline = block.find(b"\n", skip_to)
+                if newline == -1:
+                    break
+                block_quotes += block.count(b'"', skip_to, newline)
+                offset = newline + 1
+                if in_quotes == bool(block_quotes % 2):
+                    boundaries.append(position + offset)
+                    while targets and targets[0] < position + offset:
+                        targets.pop(0)
+            in_quotes ^= bool(block.count(b'"') % 2)
+            position += len(block)
+    boundaries.append(size)
+    return [
+        (range_start, range_end)
+        for range_start, range_end in zip(boundaries, boundaries[1:])
+        if range_end > range_start
+    ]
+
+
+def _iter_range_lines(file, start, end):
+    """
+    Reads the lines of a byte range of a binary file.
+    """
+    file.seek(start)
+    position = start
+    while position < end:
+        line = file.readline()
+        if not line:
+            break
+        position += len(line)
+        yield line.decode("utf-8")
+
+
+def _parse_purchase_range(file_path, start, end, fieldnames):
+    """
+    Parses the purchases of a byte range (executed in a worker process).
+
+    Args:
+        file_path (str): The path of the purchases file.
+        start (int): The offset of the first record of the range.
+        end (int): The offset following the last record of the range.
+        fieldnames (list): The field names read from the header.
+
+    Returns:
+        dict: The purchases of the range grouped by customer ID, in file order.
+    """
+    purchases = {}
+    with open(file_path, mode="rb") as file:
+        reader = csv.DictReader(
+            _iter_range_lines(file, start, end), fieldnames=fieldnames, delimiter=";"
+        )
+        for customer_id, purchase in iter_valid_purchases(reader):
+            if customer_id not in purchases:
+                purchases[customer_id] = []
+
+            purchases[customer_id].append(purchase)
+    return purchases
+
+
+def parse_purchases_parallel(file_path, workers=None):
+    """
+    Parses a purchases CSV file in several processes.
+
+    The file is split into byte ranges aligned on record boundaries (see
+    split_byte_ranges), each range is parsed by a worker process and the
+    per-customer groups are merged in range order, so the result is identical
+    to parse_purchases. Compressed files cannot be split and small files are
+    not worth it, so both are parsed by parse_purchases in the current process.
+
+    Args:
+        file_path (str): The path to the CSV file containing purchase data.
+        workers (int, optional): The number of worker processes. Defaults to os.cpu_count().
+
+    Returns:
+        dict: The purchases grouped by customer ID (see parse_purchases).
+    """
+    workers = workers or os.cpu_count() or 1
+    if detect_compression(file_path):
+        logger.info(f"{file_path} est compressé, analyse séquentielle.")
+        return parse_purchases(file_path)
+    shards = min(workers, os.path.getsize(file_path) // MIN_SHARD_BYTES)
+    if shards <= 1:
+        return parse_purchases(file_path)
+
+    try:
+        fieldnames, header_size = _read_header(file_path)
+        ranges = split_byte_ranges(file_path, shards, start=header_size)
+        purchases = {}
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(
+                    _parse_purchase_range, file_path, start, end, fieldnames
+                )
+                for start, end in ranges
+            ]
+            for future in futures:
+                shard = future.result()
+                for customer_id, customer_purchases in shard.items():
+                    if customer_id not in purchases:
+                        purchases[customer_id] = customer_purchases
+                    else:
+                        purchases[customer_id].extend(customer_purchases)
+
+        logger.info(
+            f"Successfully parsed purchases from {file_path} "
+            f"with {len(ranges)} worker processes."
+        )
+        return purchases
+    except Exception as e:
+        logger.error(f"Error parsing purchases file: {e}")
+        raise
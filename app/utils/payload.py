@@ -0,0 +1,127 @@
+from app.utils.compression import compress, iter_compressed
+from app.utils.json_formatter import iter_json_array, iter_ndjson
+from app.utils.serializer import dumps
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def encode_batch(batch):
+    """
+    Builds the JSON array body of a batch.
+
+    Args:
+        batch (list): The UTF-8 encoded JSON records of the batch.
+
+    Returns:
+        bytes: The request body.
+    """
+    return b"[" + b",".join(batch) + b"]"
+
+
+def encode_ndjson_batch(batch):
+    """
+    Builds the NDJSON body of a batch.
+
+    The body is always one byte smaller than the JSON array of the same batch,
+    so the batch size limits computed by BatchBuilder hold for both formats.
+
+    Args:
+        batch (list): The UTF-8 encoded JSON records of the batch.
+
+    Returns:
+        bytes: The request body, one record per line.
+    """
+    return b"".join(record + b"\n" for record in batch)
+
+
+class PayloadEncoder:
+    """
+    Describes how records are encoded in the body of the API requests.
+
+    Args:
+        payload_format (str): "json" for a JSON array, "ndjson" for newline-delimited JSON.
+        compression (str, optional): "gzip" or "zstd" to compress the bodies and send
+            the matching Content-Encoding header. Defaults to no compression.
+        compression_level (int, optional): The compression level. Defaults to the codec default.
+    """
+
+    def __init__(self, payload_format="json", compression=None, compression_level=None):
+        if payload_format not in CONTENT_TYPES:
+            raise ValueError(f"Unsupported payload format: {payload_format}")
+        self.payload_format = payload_format
+        self.compression = compression
+        self.compression_level = compression_level
+        if compression:
+            # Fails early on an unknown codec or a missing optional dependency.
+            compress(b"", compression, compression_level)
+
+    @property
+    def headers(self):
+        """
+        Returns the HTTP headers describing the body.
+        """
+        headers = {"Content-Type": CONTENT_TYPES[self.payload_format]}
+        if self.compression:
+            headers["Content-Encoding"] = self.compression
+        return headers
+
+    def encode_batch(self, batch):
+        """
+        Builds the body of a batch.
+
+        Args:
+            batch (list): The UTF-8 encoded JSON records of the batch.
+
+        Returns:
+            bytes: The request body.
+        """
+        if self.payload_format == "ndjson":
+            body = encode_ndjson_batch(batch)
+        else:
+            body = encode_batch(batch)
+        if self.compression:
+            body = compress(body, self.compression, self.compression_level)
+        return body
+
+    def encode(self, data):
+        """
+        Builds a complete body that can be sent again on retry.
+
+        The body is built from the (compressed) chunks of `stream`, so no
+        uncompressed copy of the whole document is kept in memory.
+
+        Args:
+            data (list | dict): The records, or a single JSON document.
+
+        Returns:
+            bytes: The request body.
+        """
+        if isinstance(data, dict) and self.payload_format == "json":
+            chunks = [dumps(data)]
+            if self.compression:
+                chunks = iter_compressed(
+                    chunks, self.compression, self.compression_level
+                )
+            return b"".join(chunks)
+        return b"".join(self.stream([data] if isinstance(data, dict) else data))
+
+    def stream(self, records):
+        """
+        Incrementally encodes records for a streamed (chunked) request body.
+
+        Args:
+            records (iterable): The records to encode.
+
+        Returns:
+            iterator: The chunks of the request body.
+        """
+        if self.payload_format == "ndjson":
+            chunks = iter_ndjson(records)
+        else:
+            chunks = iter_json_array(records)
+        if self.compression:
+            chunks = iter_compressed(chunks, self.compression, self.compression_level)
+        return chunks
@@ -0,0 +1,144 @@
+from bisect import bisect_left, bisect_right
+
+
+class RecordIndex:
+    """
+    Secondary indexes over a list of records, used to serve filtered pages.
+
+    Every field of `fields` gets an inverted index (value -> positions, in
+    record order) and `range_field`, if given, a sorted index used to answer
+    range queries by bisection. A page therefore costs O(offset + limit) for
+    unfiltered, single-filter and range-only queries instead of a scan of every
+    record; combined filters only scan the smallest candidate set.
+
+    Args:
+        records (list): The records to index (dictionaries).
+        fields (iterable): The fields that can be filtered on by equality.
+        range_field (str, optional): The field that can be filtered on by range (e.g. a date).
+    """
+
+    def __init__(self, records, fields=(), range_field=None):
+        self.records = records
+        self.range_field = range_field
+        self._postings = {field: {} for field in fields}
+        for position, record in enumerate(records):
+            for field, postings in self._postings.items():
+                postings.setdefault(record.get(field), []).append(position)
+
+        self._range_positions = []
+        self._range_keys = []
+        if range_field:
+            self._range_positions = sorted(
+                range(len(records)), key=lambda position: records[position][range_field]
+            )
+            self._range_keys = [
+                records[position][range_field] for position in self._range_positions
+            ]
+
+    @property
+    def fields(self):
+        """
+        Returns the fields that can be filtered on by equality.
+        """
+        return tuple(self._postings)
+
+    def query(self, filters=None, lower=None, upper=None, offset=0, limit=None):
+        """
+        Returns a page of the records matching every filter.
+
+        Records are returned in their original order, except when a range is
+        requested, in which case they are ordered by `range_field`.
+
+        Args:
+            filters (dict, optional): Field -> value equality filters.
+            lower (optional): The inclusive lower bound of `range_field`.
+            upper (optional): The inclusive upper bound of `range_field`.
+            offset (int): The number of matching records to skip.
+            limit (int, optional): The maximum number of records to return.
+
+        Returns:
+            tuple: The list of records of the page and the total number of matching records.
+
+        Raises:
+            ValueError: If a filter is applied to a field that is not indexed.
+        """
+        filters = filters or {}
+        unknown = set(filters) - set(self._postings)
+        if unknown:
+            raise ValueError(f"Cannot filter on {', '.join(sorted(unknown))}.")
+        has_range = lower is not None or upper is not None
+        if has_range and not self.range_field:
+            raise ValueError("This index does not support range filters.")
+
+        candidates = [
+            self._postings[field].get(value, []) for field, value in filters.items()
+        ]
+        if has_range:
+            start = bisect_left(self._range_keys, lower) if lower is not None else 0
+            end = (
+                bisect_right(self._range_keys, upper)
+                if upper is not None
+                else len(self._range_keys)
+            )
+            # A reversed range (lower > upper) matches nothing.
+            end = max(start, end)
+            range_size = end - start
+
+        if not candidates and not has_range:
+            positions = range(len(self.records))
+        elif not candidates:
+            positions = _SliceView(self._range_positions, start, end)
+        elif len(candidates) == 1 and not has_range:
+            positions = candidates[0]
+        else:
+            smallest = min(candidates, key=len)
+            if has_range and range_size <= len(smallest):
+                scanned = _SliceView(self._range_positions, start, end)
+            else:
+                scanned = smallest
+            positions = [
+                position
+                for position in scanned
+                if self._matches(self.records[position], filters, lower, upper)
+            ]
+            if has_range and scanned is smallest:
+                positions.sort(
+                    key=lambda position: self.records[position][self.range_field]
+                )
+
+        stop = len(positions) if limit is None else offset + limit
+        page = [self.records[position] for position in positions[offset:stop]]
+        return page, len(positions)
+
+    def _matches(self, record, filters, lower, upper):
+        """
+        Tells whether a record satisfies every filter.
+        """
+        if any(record.get(field) != value for field, value in filters.items()):
+            return False
+        if lower is None and upper is None:
+            return True
+        key = record[self.range_field]
+        return (lower is None or lower <= key) and (upper is None or key <= upper)
+
+
+class _SliceView:
+    """
+    A read-only view of a slice of a list, which avoids copying the slice.
+    """
+
+    def __init__(self, items, start, end):
+        self.items = items
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __iter__(self):
+        for position in range(self.start, self.end):
+            yield self.items[position]
+
+    def __getitem__(self, index):
+        start, stop, _ = index.indices(len(self))
+        return self.items[self.start + start : self.start + stop]
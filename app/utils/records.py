@@ -0,0 +1,162 @@
+from collections.abc import Mapping
+from operator import attrgetter
+
+
+class Record(Mapping):
+    """
+    Base class of the compact, read-only records built by the parsers.
+
+    A record stores its fields in `__slots__` instead of a per-instance dict,
+    which saves most of the memory a dict costs per row, while still behaving
+    like a read-only dictionary (`record["city"]`, `record.get("city")`,
+    `dict(record)`, comparison with dicts). Records are converted to dicts only
+    when they are serialized (see json_default).
+    """
+
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._values = attrgetter(*cls.__slots__)
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def __reduce__(self):
+        return type(self), self.astuple()
+
+    def astuple(self):
+        """
+        Returns the values of the record.
+
+        Returns:
+            tuple: The fields of the record, in declaration order.
+        """
+        return self._values(self)
+
+    def to_dict(self):
+        """
+        Converts the record to a dictionary.
+
+        Returns:
+            dict: The fields of the record, in declaration order.
+        """
+        return dict(zip(self.__slots__, self._values(self)))
+
+
+class Customer(Record):
+    """
+    A customer parsed from the customers file (see csv_parser.parse_customers for the fields).
+    """
+
+    __slots__ = (
+        "customer_id",
+        "title",
+        "last_name",
+        "first_name",
+        "postal_code",
+        "city",
+        "email",
+    )
+
+    def __init__(
+        self, customer_id, title, last_name, first_name, postal_code, city, email
+    ):
+        self.customer_id = customer_id
+        self.title = title
+        self.last_name = last_name
+        self.first_name = first_name
+        self.postal_code = postal_code
+        self.city = city
+        self.email = email
+
+
+class Purchase(Record):
+    """
+    A purchase parsed from the purchases file (see csv_parser.parse_purchases for the fields).
+    """
+
+    __slots__ = ("product_id", "quantity", "price", "currency", "purchased_at")
+
+    def __init__(self, product_id, quantity, price, currency, purchased_at):
+        self.product_id = product_id
+        self.quantity = quantity
+        self.price = price
+        self.currency = currency
+        self.purchased_at = purchased_at
+
+
+class StringPool:
+    """
+    Dictionary encoding of a low-cardinality column: one shared str per distinct value.
+
+    Parsing creates a new string for every field of every row, so a column such
+    as "currency" holds millions of equal but distinct "EUR" objects. Passing
+    the values through a pool keeps only the first occurrence of each value and
+    reuses it, and equal values then compare by identity (e.g. in the dict
+    lookups of the route indexes).
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values = {}
+
+    def __call__(self, value):
+        """
+        Returns the pooled instance of a value.
+
+        Args:
+            value (str): The parsed value.
+
+        Returns:
+            str: The first string equal to `value` seen by the pool.
+        """
+        return self._values.setdefault(value, value)
+
+    def __len__(self):
+        return len(self._values)
+
+
+def row_values(row):
+    """
+    Returns the values of a parsed row, whether it is a record or a dictionary.
+
+    Args:
+        row (Record | dict): The row.
+
+    Returns:
+        tuple: The values, in field order.
+    """
+    if isinstance(row, Record):
+        return row.astuple()
+    return tuple(row.values())
+
+
+def json_default(value):
+    """
+    Serializes the records with json.dumps(..., default=json_default).
+
+    Args:
+        value: An object json does not know how to serialize.
+
+    Returns:
+        dict: The record as a dictionary.
+
+    Raises:
+        TypeError: If the object is not a record.
+    """
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,112 @@
+import math
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from config import Config
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value):
+    """
+    Parses the value of a Retry-After header.
+
+    Args:
+        value (str): Either a number of seconds or an HTTP date.
+
+    Returns:
+        float | None: The number of seconds to wait, or None if the value is missing or
+            invalid (including "nan" and "inf").
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return max(seconds, 0.0) if math.isfinite(seconds) else None
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed request is sent again.
+
+    Requests answered with a status in `retry_statuses` (which includes the 503
+    used for connection errors and the 504 used for timeouts) are retried up to
+    `max_attempts` attempts in total. The delay before attempt n+1 is drawn
+    uniformly between 0 and min(max_backoff, backoff_factor * 2 ** (n - 1))
+    ("full jitter"), unless the server asked for a specific delay with a
+    Retry-After header, in which case that delay is used up to `max_retry_after`.
+
+    Args:
+        max_attempts (int, optional): The total number of attempts, first one included.
+            Defaults to Config.API_MAX_RETRIES + 1.
+        backoff_factor (float, optional): The base delay in seconds. Defaults to Config.API_BACKOFF_FACTOR.
+        max_backoff (float, optional): The maximum computed delay in seconds. Defaults to Config.API_MAX_BACKOFF.
+        retry_statuses (iterable, optional): The status codes worth retrying.
+        max_retry_after (float, optional): The maximum delay in seconds honoured from a
+            Retry-After header. Defaults to Config.API_MAX_RETRY_AFTER.
+    """
+
+    def __init__(
+        self,
+        max_attempts=None,
+        backoff_factor=None,
+        max_backoff=None,
+        retry_statuses=RETRY_STATUSES,
+        max_retry_after=None,
+    ):
+        self.max_attempts = (
+            max_attempts if max_attempts is not None else Config.API_MAX_RETRIES + 1
+        )
+        self.backoff_factor = (
+            backoff_factor if backoff_factor is not None else Config.API_BACKOFF_FACTOR
+        )
+        self.max_backoff = (
+            max_backoff if max_backoff is not None else Config.API_MAX_BACKOFF
+        )
+        self.retry_statuses = frozenset(retry_statuses)
+        self.max_retry_after = (
+            max_retry_after
+            if max_retry_after is not None
+            else Config.API_MAX_RETRY_AFTER
+        )
+
+    def should_retry(self, attempt, status_code):
+        """
+        Tells whether a request should be sent again.
+
+        Args:
+            attempt (int): The number of the attempt that just failed, starting at 1.
+            status_code (int): The status code of that attempt.
+
+        Returns:
+            bool: True if another attempt should be made.
+        """
+        return attempt < self.max_attempts and status_code in self.retry_statuses
+
+    def get_delay(self, attempt, retry_after=None):
+        """
+        Computes how long to wait before the next attempt.
+
+        Args:
+            attempt (int): The number of the attempt that just failed, starting at 1.
+            retry_after (str, optional): The Retry-After header of the failed response.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        requested = parse_retry_after(retry_after)
+        if requested is not None:
+            return min(requested, self.max_retry_after)
+        ceiling = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
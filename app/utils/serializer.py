@@ -0,0 +1,107 @@
+import json
+from app.utils.records import json_default
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+def _dumps_json(value):
+    """
+    Serializes a value with the standard library.
+    """
+    return json.dumps(
+        value, default=json_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _dumps_orjson(value):
+    """
+    Serializes a value with orjson.
+    """
+    return orjson.dumps(value, default=json_default)
+
+
+class Fragment(bytes):
+    """
+    A JSON document that is already serialized, e.g. by the fragment cache.
+
+    encode_record returns fragments as-is, so cached bytes are spliced into the
+    request bodies and NDJSON files without being decoded and encoded again.
+    """
+
+    __slots__ = ()
+
+
+BACKENDS = {"json": _dumps_json}
+if orjson is not None:
+    BACKENDS["orjson"] = _dumps_orjson
+
+
+def resolve_backend(name=None):
+    """
+    Returns the serialization function of a backend.
+
+    Args:
+        name (str, optional): "json", "orjson" or "auto" (orjson when installed,
+            otherwise json). Defaults to Config.JSON_BACKEND.
+
+    Returns:
+        callable: A function serializing a value to UTF-8 encoded JSON bytes.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+    """
+    name = name or Config.JSON_BACKEND
+    if name == "auto":
+        name = "orjson" if "orjson" in BACKENDS else "json"
+    if name not in BACKENDS:
+        raise ValueError(f"Unavailable JSON backend: {name}")
+    return BACKENDS[name]
+
+
+_dumps = resolve_backend()
+
+
+def configure_serializer(backend=None):
+    """
+    Selects the backend used by dumps for the whole process.
+
+    Args:
+        backend (str, optional): The backend name (see resolve_backend).
+    """
+    global _dumps
+    _dumps = resolve_backend(backend)
+
+
+def dumps(value):
+    """
+    Serializes a value to compact JSON, as UTF-8 encoded bytes.
+
+    Both backends produce the same output: no whitespace, non-ASCII characters
+    left unescaped, and parser records converted with json_default.
+
+    Args:
+        value: The value to serialize.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    return _dumps(value)
+
+
+def encode_record(record):
+    """
+    Serializes a record of a payload, passing already serialized fragments through.
+
+    Args:
+        record: The record to serialize, or a Fragment.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    if isinstance(record, Fragment):
+        return record
+    return _dumps(record)
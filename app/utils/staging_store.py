@@ -0,0 +1,383 @@
+import os
+import sqlite3
+from contextlib import closing
+from app.utils.cache import FileCache
+from app.utils.csv_parser import iter_customers, iter_purchases
+from app.utils.logger import logger
+from app.utils.mmap_reader import (
+    is_mappable,
+    iter_customers_mmap,
+    iter_purchases_mmap,
+)
+from app.utils.records import Customer, Purchase, StringPool
+from config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    kind TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    postal_code TEXT NOT NULL,
+    city TEXT NOT NULL,
+    email TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS purchases (
+    customer_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL,
+    currency TEXT NOT NULL,
+    purchased_at TEXT NOT NULL,
+    customer_rank INTEGER NOT NULL
+);
+"""
+
+# "columns" are the columns read back, "order" the order of the parsed records:
+# file order for customers, grouped by customer (in order of first appearance)
+# for purchases, like the dictionary returned by parse_purchases.
+TABLES = {
+    "customers": {
+        "columns": Customer.__slots__,
+        "insert": Customer.__slots__,
+        "order": "rowid",
+        "indexes": {
+            "customers_customer_id": "customer_id",
+            "customers_email": "email",
+        },
+    },
+    "purchases": {
+        "columns": ("customer_id",) + Purchase.__slots__,
+        "insert": ("customer_id",) + Purchase.__slots__ + ("customer_rank",),
+        "order": "customer_rank, rowid",
+        "indexes": {
+            "purchases_customer_id": "customer_id",
+            "purchases_customer_rank": "customer_rank",
+            "purchases_purchased_at": "purchased_at, customer_rank",
+        },
+    },
+}
+
+
+def _iter_customer_rows(file_path):
+    """
+    Parses the customers file into rows of the customers table.
+    """
+    if is_mappable(file_path):
+        customers = iter_customers_mmap(file_path)
+    else:
+        customers = iter_customers(file_path)
+    return (customer.astuple() for customer in customers)
+
+
+def _iter_purchase_rows(file_path):
+    """
+    Parses the purchases file into rows of the purchases table.
+
+    The rank of a customer is the order of their first purchase in the file.
+    """
+    if is_mappable(file_path):
+        pairs = iter_purchases_mmap(file_path)
+    else:
+        pairs = iter_purchases(file_path)
+    ranks = {}
+    for customer_id, purchase in pairs:
+        rank = ranks.setdefault(customer_id, len(ranks))
+        yield (customer_id,) + purchase.astuple() + (rank,)
+
+
+ROW_PARSERS = {
+    "customers": _iter_customer_rows,
+    "purchases": _iter_purchase_rows,
+}
+
+
+class StagingStore:
+    """
+    A local SQLite copy of the parsed customers and purchases files.
+
+    Parsing the CSV files is the most expensive step of every CLI run and of
+    every fresh Flask worker. The store keeps the validated, normalized rows in
+    an indexed SQLite database (indexes on customer_id, email and purchase date)
+    and remembers the modification time and size of the file each table was
+    imported from. refresh re-imports a table only when its source file
+    changed, so reading unchanged data never touches the CSV files.
+
+    Each operation opens its own connection, so a store can be shared between
+    threads and processes; the database uses write-ahead logging, so readers
+    are not blocked while a table is re-imported.
+
+    Args:
+        db_path (str, optional): The path of the database. Defaults to Config.STAGING_DB.
+
+    Raises:
+        ValueError: If no database path is given nor configured.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or Config.STAGING_DB
+        if not self.db_path:
+            raise ValueError("No staging database configured (STAGING_DB).")
+        with closing(self.connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def connect(self):
+        """
+        Opens a connection in autocommit mode, transactions being explicit.
+        """
+        return sqlite3.connect(self.db_path, isolation_level=None, timeout=60)
+
+    @staticmethod
+    def _source(file_path):
+        """
+        Returns what identifies the current version of a source file.
+        """
+        return (os.path.abspath(file_path),) + FileCache.signature(file_path)
+
+    def refresh(self, kind, file_path):
+        """
+        Imports a source file into its table, unless the table already holds its current version.
+
+        The import replaces the whole table in a single transaction: readers see
+        either the previous or the new rows. The indexes are dropped during the
+        import and rebuilt once, which is much faster than updating them row by row.
+
+        Args:
+            kind (str): "customers" or "purchases".
+            file_path (str): The CSV file, optionally compressed.
+
+        Returns:
+            bool: True if the file was imported, False if the table was up to date.
+
+        Raises:
+            ValueError: If the kind is unknown.
+        """
+        if kind not in TABLES:
+            raise ValueError(f"Unknown staging table: {kind}")
+        source = self._source(file_path)
+        with closing(self.connect()) as connection:
+            query = "SELECT path, mtime_ns, size FROM sources WHERE kind = ?"
+            if connection.execute(query, (kind,)).fetchone() == source:
+                return False
+
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have imported the file while we waited for the lock.
+                if connection.execute(query, (kind,)).fetchone() == source:
+                    connection.execute("ROLLBACK")
+                    return False
+                self._import(connection, kind, file_path)
+                connection.execute(
+                    "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                    (kind,) + source,
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        logger.info(f"{file_path} importé dans la base de staging {self.db_path}.")
+        return True
+
+    @staticmethod
+    def _import(connection, kind, file_path):
+        """
+        Replaces the rows of a table with the rows parsed from a source file.
+        """
+        table = TABLES[kind]
+        for index in table["indexes"]:
+            connection.execute(f"DROP INDEX IF EXISTS {index}")
+        connection.execute(f"DELETE FROM {kind}")
+        columns = table["insert"]
+        connection.executemany(
+            f"INSERT INTO {kind} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})",
+            ROW_PARSERS[kind](file_path),
+        )
+        for index, column in table["indexes"].items():
+            connection.execute(f"CREATE INDEX {index} ON {kind} ({column})")
+
+    def iter_customers(self):
+        """
+        Reads the staged customers, in file order.
+
+        Yields:
+            Customer: The same records as csv_parser.iter_customers.
+        """
+        pool = StringPool()
+        with closing(self.connect()) as connection:
+            cursor = connection.execute(
+                f"SELECT {', '.join(Customer.__slots__)} FROM customers ORDER BY rowid"
+            )
+            for row in cursor:
+                yield Customer(
+                    row[0],
+                    pool(row[1]),
+                    row[2],
+                    row[3],
+                    pool(row[4]),
+                    pool(row[5]),
+                    row[6],
+                )
+
+    def iter_purchases(self):
+        """
+        Reads the staged purchases, in file order.
+
+        Yields:
+            tuple: The same (customer_id, purchase) pairs as csv_parser.iter_purchases.
+        """
+        pool = StringPool()
+        with closing(self.connect()) as connection:
+            cursor = connection.execute(
+                f"SELECT customer_id, {', '.join(Purchase.__slots__)} "
+                "FROM purchases ORDER BY rowid"
+            )
+            for customer_id, product_id, quantity, price, currency, date in cursor:
+                yield customer_id, Purchase(
+                    product_id, quantity, price, pool(currency), pool(date)
+                )
+
+
+class StagedIndex:
+    """
+    Serves filtered pages of a staged table, with the interface of RecordIndex.
+
+    Each page is a SQL query on the indexed table, so a worker serves pages
+    without loading and indexing every record in memory first.
+
+    Args:
+        store (StagingStore): The store holding the table.
+        kind (str): "customers" or "purchases".
+        fields (iterable): The columns that can be filtered on by equality.
+        range_field (str, optional): The column that can be filtered on by range (e.g. a date).
+    """
+
+    def __init__(self, store, kind, fields=(), range_field=None):
+        self.store = store
+        self.kind = kind
+        self.range_field = range_field
+        self._fields = tuple(fields)
+        self._columns = TABLES[kind]["columns"]
+
+    @property
+    def fields(self):
+        """
+        Returns the fields that can be filtered on by equality.
+        """
+        return self._fields
+
+    def _record(self, row):
+        """
+        Builds the record RecordIndex returns for a row: a Customer, or a purchase row dictionary.
+        """
+        if self.kind == "customers":
+            return Customer(*row)
+        return dict(zip(self._columns, row))
+
+    def query(self, filters=None, lower=None, upper=None, offset=0, limit=None):
+        """
+        Returns a page of the records matching every filter (see RecordIndex.query).
+
+        Args:
+            filters (dict, optional): Field -> value equality filters.
+            lower (optional): The inclusive lower bound of `range_field`.
+            upper (optional): The inclusive upper bound of `range_field`.
+            offset (int): The number of matching records to skip.
+            limit (int, optional): The maximum number of records to return.
+
+        Returns:
+            tuple: The list of records of the page and the total number of matching records.
+
+        Raises:
+            ValueError: If a filter is applied to a field that is not indexed.
+        """
+        filters = filters or {}
+        unknown = set(filters) - set(self._fields)
+        if unknown:
+            raise ValueError(f"Cannot filter on {', '.join(sorted(unknown))}.")
+        has_range = lower is not None or upper is not None
+        if has_range and not self.range_field:
+            raise ValueError("This index does not support range filters.")
+
+        clauses = [f"{field} = ?" for field in filters]
+        parameters = list(filters.values())
+        if lower is not None:
+            clauses.append(f"{self.range_field} >= ?")
+            parameters.append(lower)
+        if upper is not None:
+            clauses.append(f"{self.range_field} <= ?")
+            parameters.append(upper)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = TABLES[self.kind]["order"]
+        if has_range:
+            order = f"{self.range_field}, {order}"
+
+        with closing(self.store.connect()) as connection:
+            (total,) = connection.execute(
+                f"SELECT COUNT(*) FROM {self.kind}{where}", parameters
+            ).fetchone()
+            rows = connection.execute(
+                f"SELECT {', '.join(self._columns)} FROM {self.kind}{where} "
+                f"ORDER BY {order} LIMIT ? OFFSET ?",
+                parameters + [-1 if limit is None else limit, offset],
+            )
+            return [self._record(row) for row in rows], total
+
+
+def iter_customers_staged(file_path, db_path=None):
+    """
+    Lazily reads the customers of a CSV file through the staging store.
+
+    Args:
+        file_path (str): The customers CSV file, imported first if it changed.
+        db_path (str, optional): The path of the database. Defaults to Config.STAGING_DB.
+
+    Returns:
+        iterator: The same customer records as csv_parser.iter_customers.
+    """
+    store = StagingStore(db_path)
+    store.refresh("customers", file_path)
+    return store.iter_customers()
+
+
+def parse_customers_staged(file_path, db_path=None):
+    """
+    Reads the customers of a CSV file through the staging store.
+
+    Args:
+        file_path (str): The customers CSV file, imported first if it changed.
+        db_path (str, optional): The path of the database. Defaults to Config.STAGING_DB.
+
+    Returns:
+        list: The same customers as csv_parser.parse_customers.
+    """
+    return list(iter_customers_staged(file_path, db_path))
+
+
+def parse_purchases_staged(file_path, db_path=None):
+    """
+    Reads the purchases of a CSV file through the staging store.
+
+    Args:
+        file_path (str): The purchases CSV file, imported first if it changed.
+        db_path (str, optional): The path of the database. Defaults to Config.STAGING_DB.
+
+    Returns:
+        dict: The same purchases grouped by customer ID as csv_parser.parse_purchases.
+    """
+    store = StagingStore(db_path)
+    store.refresh("purchases", file_path)
+    purchases = {}
+    for customer_id, purchase in store.iter_purchases():
+        if customer_id not in purchases:
+            purchases[customer_id] = []
+
+        purchases[customer_id].append(purchase)
+    return purchases
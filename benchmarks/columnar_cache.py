@@ -0,0 +1,41 @@
+"""
+Benchmark of the columnar cache against parsing the purchases CSV file.
+
+Usage:
+    python -m benchmarks.columnar_cache --rows 1000000
+"""
+
+import os
+import tempfile
+import click
+from benchmarks.parse_purchases import timed, write_purchases
+from app.utils.csv_parser import parse_purchases
+
+
+@click.command()
+@click.option("--rows", type=int, default=1_000_000, help="Number of purchases.")
+@click.option("--customers", type=int, default=100_000, help="Number of customers.")
+def main(rows, customers):
+    """
+    Compares parsing the CSV file with loading its columnar cache.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "purchases.csv")
+        write_purchases(file_path, rows, customers)
+
+        parsed, parse_time = timed(parse_purchases, file_path, "csv", False)
+        _, write_time = timed(parse_purchases, file_path, "csv", True)
+        cached, read_time = timed(parse_purchases, file_path, "csv", True)
+        assert cached == parsed
+        size = os.path.getsize(file_path) / 1024 / 1024
+        cache_size = os.path.getsize(f"{file_path}.feather") / 1024 / 1024
+
+        click.echo(f"{rows} purchases, {size:.1f} MiB CSV, {cache_size:.1f} MiB cache")
+        click.echo(f"parse CSV:            {parse_time:.2f}s")
+        click.echo(f"parse + write cache:  {write_time:.2f}s (first run)")
+        click.echo(f"read cache:           {read_time:.2f}s")
+        click.echo(f"speedup:              {parse_time / read_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark of the fragment cache: encoding every customer vs reusing cached fragments.
+
+Usage:
+    python -m benchmarks.fragment_cache --customers 100000 --changed 0.05
+"""
+
+import os
+import random
+import tempfile
+import time
+import click
+from app.utils.fragment_cache import FragmentCache, iter_cached_customers
+from app.utils.json_formatter import iter_formatted_customers, iter_json_array
+from app.utils.records import Customer, Purchase
+from app.utils.serializer import BACKENDS, configure_serializer
+
+
+def build_rows(customers, purchases_per_customer):
+    """
+    Builds synthetic customers and purchases grouped by customer ID, like the parsers return them.
+    """
+    generator = random.Random(42)
+    customer_rows = [
+        Customer(
+            str(index), "1", "Doe", "Jane", "75000", "Paris", f"c{index}@example.com"
+        )
+        for index in range(customers)
+    ]
+    purchases = {
+        customer["customer_id"]: [
+            Purchase(
+                f"P{generator.randrange(10_000)}",
+                generator.randint(1, 9),
+                round(generator.uniform(1, 500), 2),
+                "EUR",
+                "2023-01-01",
+            )
+            for _ in range(purchases_per_customer)
+        ]
+        for customer in customer_rows
+    }
+    return customer_rows, purchases
+
+
+def timed(records):
+    """
+    Returns the time taken to encode records as a JSON array.
+    """
+    started = time.perf_counter()
+    for _ in iter_json_array(records):
+        pass
+    return time.perf_counter() - started
+
+
+@click.command()
+@click.option("--customers", type=int, default=100_000, help="Number of customers.")
+@click.option("--purchases", type=int, default=5, help="Purchases per customer.")
+@click.option(
+    "--changed",
+    type=float,
+    default=0.05,
+    help="Share of customers changed between runs.",
+)
+def main(customers, purchases, changed):
+    """
+    Encodes the same customers without cache, then with a cold and a warm fragment cache.
+
+    The warm run changes the first purchase of a share of the customers, like a daily delta.
+    """
+    customer_rows, purchase_rows = build_rows(customers, purchases)
+    generator = random.Random(7)
+    for backend in sorted(BACKENDS):
+        configure_serializer(backend)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fragments")
+            plain = timed(iter_formatted_customers(customer_rows, purchase_rows))
+
+            cache = FragmentCache(path)
+            cold = timed(iter_cached_customers(customer_rows, purchase_rows, cache))
+            cache.save()
+
+            for customer_id in generator.sample(
+                sorted(purchase_rows), int(customers * changed)
+            ):
+                purchase_rows[customer_id][0] = Purchase(
+                    "P0", 1, 1.0, "EUR", "2023-01-02"
+                )
+            started = time.perf_counter()
+            cache = FragmentCache(path)
+            load = time.perf_counter() - started
+            warm = timed(iter_cached_customers(customer_rows, purchase_rows, cache))
+            started = time.perf_counter()
+            cache.save()
+            save = time.perf_counter() - started
+        click.echo(
+            f"{backend:>7}: no cache {plain:.2f}s, cold cache {cold:.2f}s, "
+            f"warm cache {warm:.2f}s ({cache.hits} reused, {cache.misses} encoded), "
+            f"load {load:.2f}s, save {save:.2f}s"
+        )
+    configure_serializer()
+
+
+if __name__ == "__main__":
+    main()
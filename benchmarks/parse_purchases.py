@@ -0,0 +1,71 @@
+"""
+Benchmark of the sequential and multi-process purchases parsers.
+
+Usage:
+    python -m benchmarks.parse_purchases --rows 2000000 --workers 4
+"""
+
+import os
+import random
+import tempfile
+import time
+import click
+from app.utils.csv_parser import parse_purchases
+from app.utils.parallel_parser import parse_purchases_parallel
+
+
+def write_purchases(file_path, rows, customers):
+    """
+    Writes a synthetic purchases file.
+
+    Args:
+        file_path (str): The path of the file to write.
+        rows (int): The number of purchases.
+        customers (int): The number of distinct customers.
+    """
+    generator = random.Random(42)
+    with open(file_path, mode="w", encoding="utf-8") as file:
+        file.write("customer_id;product_id;quantity;price;currency;date\n")
+        for index in range(rows):
+            file.write(
+                f"{generator.randrange(customers)};P{index};{generator.randint(1, 9)};"
+                f'{generator.uniform(1, 500):.2f};"EUR";2023-01-{index % 28 + 1:02d}\n'
+            )
+
+
+def timed(function, *args):
+    """
+    Runs a function and returns its result and duration in seconds.
+    """
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+@click.command()
+@click.option("--rows", type=int, default=1_000_000, help="Number of purchases.")
+@click.option("--customers", type=int, default=100_000, help="Number of customers.")
+@click.option(
+    "--workers", type=int, default=os.cpu_count(), help="Number of worker processes."
+)
+def main(rows, customers, workers):
+    """
+    Parses the same synthetic file sequentially and in parallel and prints the speedup.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "purchases.csv")
+        write_purchases(file_path, rows, customers)
+        size = os.path.getsize(file_path) / 1024 / 1024
+
+        sequential, sequential_time = timed(parse_purchases, file_path)
+        parallel, parallel_time = timed(parse_purchases_parallel, file_path, workers)
+
+    assert parallel == sequential
+    click.echo(f"{rows} purchases, {size:.1f} MiB")
+    click.echo(f"sequential:           {sequential_time:.2f}s")
+    click.echo(f"parallel ({workers} workers): {parallel_time:.2f}s")
+    click.echo(f"speedup:              {sequential_time / parallel_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Memory used by the parsed purchases, as dicts and as slotted records.
+
+Usage:
+    python -m benchmarks.record_memory --rows 1000000 --target-rows 10000000
+"""
+
+import gc
+import os
+import tempfile
+import tracemalloc
+import click
+from app.utils.csv_parser import parse_purchases
+from benchmarks.parse_purchases import write_purchases
+
+
+def measure(function, *args):
+    """
+    Returns the number of bytes still allocated by the result of a function.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return allocated
+
+
+def parse_purchases_as_dicts(file_path):
+    """
+    Parses the purchases like before records existed, one dict per purchase.
+    """
+    return {
+        customer_id: [purchase.to_dict() for purchase in purchases]
+        for customer_id, purchases in parse_purchases(file_path).items()
+    }
+
+
+@click.command()
+@click.option("--rows", type=int, default=1_000_000, help="Number of purchases parsed.")
+@click.option("--customers", type=int, default=100_000, help="Number of customers.")
+@click.option(
+    "--target-rows",
+    type=int,
+    default=10_000_000,
+    help="Number of purchases the measure is extrapolated to.",
+)
+def main(rows, customers, target_rows):
+    """
+    Parses a synthetic purchases file and prints the memory used per purchase.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "purchases.csv")
+        write_purchases(file_path, rows, customers)
+        as_dicts = measure(parse_purchases_as_dicts, file_path)
+        as_records = measure(parse_purchases, file_path)
+
+    scale = target_rows / rows
+    click.echo(f"{rows} purchases parsed, extrapolated to {target_rows}:")
+    for name, allocated in (("dicts", as_dicts), ("records", as_records)):
+        click.echo(
+            f"{name:>8}: {allocated / rows:6.0f} B/purchase, "
+            f"{allocated * scale / 1024 ** 3:5.2f} GiB"
+        )
+    click.echo(f" savings: {1 - as_records / as_dicts:.0%}")
+
+
+if __name__ == "__main__":
+    main()
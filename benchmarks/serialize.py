@@ -0,0 +1,70 @@
+"""
+Benchmark of the JSON serialization backends on formatted customers.
+
+Usage:
+    python -m benchmarks.serialize --customers 200000
+"""
+
+import random
+import time
+import click
+from app.utils.json_formatter import format_customer, iter_json_array
+from app.utils.records import Customer, Purchase
+from app.utils.serializer import BACKENDS, configure_serializer
+
+
+def build_customers(customers, purchases_per_customer):
+    """
+    Builds synthetic formatted customers, with record purchases like the parsers produce.
+    """
+    generator = random.Random(42)
+    formatted = []
+    for index in range(customers):
+        customer = Customer(
+            str(index),
+            "Female",
+            "Doe",
+            "Jane",
+            "75000",
+            "Paris",
+            f"c{index}@example.com",
+        )
+        purchases = [
+            Purchase(
+                f"P{generator.randrange(10_000)}",
+                generator.randint(1, 9),
+                round(generator.uniform(1, 500), 2),
+                "EUR",
+                "2023-01-01",
+            )
+            for _ in range(purchases_per_customer)
+        ]
+        formatted.append(format_customer(customer, purchases))
+    return formatted
+
+
+@click.command()
+@click.option("--customers", type=int, default=100_000, help="Number of customers.")
+@click.option("--purchases", type=int, default=5, help="Purchases per customer.")
+def main(customers, purchases):
+    """
+    Serializes the same customers as a streamed JSON array with every available backend.
+    """
+    formatted = build_customers(customers, purchases)
+    timings = {}
+    for backend in sorted(BACKENDS):
+        configure_serializer(backend)
+        started = time.perf_counter()
+        size = sum(len(chunk) for chunk in iter_json_array(formatted))
+        timings[backend] = time.perf_counter() - started
+        click.echo(
+            f"{backend:>7}: {timings[backend]:.2f}s, "
+            f"{size / timings[backend] / 1024 / 1024:.0f} MiB/s"
+        )
+    configure_serializer()
+    if "orjson" in timings:
+        click.echo(f"speedup: {timings['json'] / timings['orjson']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
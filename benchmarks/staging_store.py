@@ -0,0 +1,68 @@
+"""
+Benchmark of the SQLite staging store against parsing the purchases CSV file.
+
+Usage:
+    python -m benchmarks.staging_store --rows 1000000
+"""
+
+import os
+import tempfile
+import click
+from benchmarks.parse_purchases import timed, write_purchases
+from app.utils.csv_parser import parse_purchases
+from app.utils.record_index import RecordIndex
+from app.utils.staging_store import StagedIndex, StagingStore, parse_purchases_staged
+
+FILTERS = ("customer_id", "currency")
+
+
+def first_page_from_csv(file_path):
+    """
+    What a fresh worker does without the store: parse, index, then query.
+    """
+    rows = [
+        {"customer_id": customer_id, **purchase}
+        for customer_id, purchases in parse_purchases(file_path).items()
+        for purchase in purchases
+    ]
+    index = RecordIndex(rows, FILTERS, range_field="purchased_at")
+    return index.query({"customer_id": "42"}, "2023-01-10", None, 0, 100)
+
+
+def first_page_from_store(db_path):
+    """
+    What a fresh worker does with the store: query the indexed table.
+    """
+    index = StagedIndex(StagingStore(db_path), "purchases", FILTERS, "purchased_at")
+    return index.query({"customer_id": "42"}, "2023-01-10", None, 0, 100)
+
+
+@click.command()
+@click.option("--rows", type=int, default=1_000_000, help="Number of purchases.")
+@click.option("--customers", type=int, default=100_000, help="Number of customers.")
+def main(rows, customers):
+    """
+    Compares full loads and a filtered page, with and without the staging store.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "purchases.csv")
+        db_path = os.path.join(tmp_dir, "staging.db")
+        write_purchases(file_path, rows, customers)
+
+        parsed, parse_time = timed(parse_purchases, file_path)
+        _, import_time = timed(parse_purchases_staged, file_path, db_path)
+        staged, read_time = timed(parse_purchases_staged, file_path, db_path)
+        assert staged == parsed
+        expected, csv_page_time = timed(first_page_from_csv, file_path)
+        page, staged_page_time = timed(first_page_from_store, db_path)
+        assert page == expected
+
+        click.echo(f"parse CSV:            {parse_time:.2f}s")
+        click.echo(f"import + read store:  {import_time:.2f}s (first run)")
+        click.echo(f"read store:           {read_time:.2f}s")
+        click.echo(f"first page, CSV:      {csv_page_time:.2f}s")
+        click.echo(f"first page, store:    {staged_page_time * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
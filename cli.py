@@ -1,11 +1,60 @@
+import asyncio
 import click
-from app.utils.csv_parser import parse_customers, parse_purchases
-from app.utils.json_formatter import format_customers_for_api
-from app.utils.api_client import send_data_to_api
+from app.utils.csv_parser import (
+    parse_customers,
+    parse_purchases,
+    iter_customers,
+    iter_purchases,
+)
+from app.utils.external_join import iter_external_join
+from app.utils.json_formatter import (
+    format_customers_for_api,
+    iter_formatted_customers,
+    read_ndjson,
+    write_ndjson,
+)
+from app.utils.api_client import configure_session, send_data_to_api
+from app.utils.async_client import aiter_records, async_send_batches
+from app.utils.checkpoint import Checkpoint
+from app.utils.delta_sync import DeltaState, iter_changed_customers
+from app.utils.fragment_cache import FragmentCache, iter_cached_customers
+from app.utils.pandas_parser import (
+    customers_frame,
+    format_customers_columnar,
+    purchases_frame,
+)
+from app.utils.parallel_parser import parse_purchases_parallel
+from app.utils.payload import PayloadEncoder
+from app.utils.retry import RetryPolicy
+from app.utils.staging_store import (
+    iter_customers_staged,
+    parse_customers_staged,
+    parse_purchases_staged,
+)
 from config import Config
 from app.utils.logger import logger
 
 
+def _commit_delta(delta, tombstones_file):
+    """
+    Records the fingerprints of a successful delta run and writes the deleted customers.
+
+    Args:
+        delta (DeltaState): The state of the run.
+        tombstones_file (str): NDJSON file receiving the deleted customer IDs, or None.
+    """
+    deleted = delta.deleted()
+    if tombstones_file:
+        write_ndjson(
+            ({"customer_id": customer_id} for customer_id in deleted), tombstones_file
+        )
+    delta.save()
+    click.echo(
+        f"Delta: {delta.changed} customers sent, {delta.unchanged} unchanged, "
+        f"{len(deleted)} deleted"
+    )
+
+
 @click.command()
 @click.option(
     "--customers-file",
@@ -18,7 +67,182 @@ from app.utils.logger import logger
     help="Path to purchases CSV file.",
 )
 @click.option("--api-url", default=Config.API_URL, help="API URL to send data.")
-def main(customers_file, purchases_file, api_url):
+@click.option(
+    "--stream/--no-stream",
+    default=False,
+    help="Stream customers from the CSV file to the API instead of loading them all in memory.",
+)
+@click.option(
+    "--join-mode",
+    type=click.Choice(["memory", "external"]),
+    default="memory",
+    help="Join purchases in memory or with a disk-backed sort-merge join (implies --stream).",
+)
+@click.option(
+    "--memory-budget",
+    type=int,
+    default=Config.JOIN_MEMORY_BUDGET,
+    help="Approximate number of bytes buffered by the external join before spilling to disk.",
+)
+@click.option(
+    "--parser-engine",
+    type=click.Choice(["csv", "pandas", "mmap"]),
+    default="csv",
+    help="Parse the CSV files row by row (csv), with vectorized column operations (pandas) "
+    "or from a memory map, decoding only the kept fields (mmap).",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes parsing byte ranges of the purchases file in parallel (csv engine).",
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    default=Config.API_BATCH_SIZE,
+    help="Maximum number of customers per upload batch.",
+)
+@click.option(
+    "--max-batch-bytes",
+    type=int,
+    default=Config.API_MAX_BATCH_BYTES,
+    help="Maximum size in bytes of an upload batch.",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=Config.API_CONCURRENCY,
+    help="Maximum number of upload batches sent in parallel (requires batching).",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["sync", "async"]),
+    default="sync",
+    help="Upload with requests and threads (sync) or with aiohttp on an event loop (async).",
+)
+@click.option(
+    "--max-retries",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Number of times a failed batch is sent again (defaults to API_MAX_RETRIES).",
+)
+@click.option(
+    "--checkpoint-file",
+    default=None,
+    help="File recording the batches acknowledged by the API (requires batching).",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Skip the batches already recorded in --checkpoint-file by a previous run.",
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=None,
+    help="Read timeout in seconds for each API request (defaults to API_READ_TIMEOUT).",
+)
+@click.option(
+    "--pool-size",
+    type=int,
+    default=None,
+    help="Number of pooled keep-alive connections to the API (defaults to API_POOL_SIZE).",
+)
+@click.option(
+    "--payload-format",
+    type=click.Choice(["json", "ndjson"]),
+    default=None,
+    help="Send the records as a JSON array (json) or as newline-delimited JSON (ndjson).",
+)
+@click.option(
+    "--output-file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write the formatted records to this NDJSON file instead of sending them.",
+)
+@click.option(
+    "--input-ndjson",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Send the records of an NDJSON file (e.g. from --output-file) instead of parsing the CSV files.",
+)
+@click.option(
+    "--compress",
+    type=click.Choice(["gzip", "zstd"]),
+    default=Config.API_COMPRESSION,
+    help="Compress the request bodies and send the matching Content-Encoding header.",
+)
+@click.option(
+    "--compression-level",
+    type=int,
+    default=Config.API_COMPRESSION_LEVEL,
+    help="Compression level used with --compress (defaults to 6 for gzip, 3 for zstd).",
+)
+@click.option(
+    "--fragment-cache",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="File caching the serialized customers between runs; only new or changed customers are serialized.",
+)
+@click.option(
+    "--delta-state",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="File storing a fingerprint per customer after each successful run; "
+    "only new or changed customers are sent.",
+)
+@click.option(
+    "--tombstones-file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="NDJSON file receiving the IDs of the customers deleted since the last "
+    "successful run (requires --delta-state).",
+)
+@click.option(
+    "--staging-db",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="SQLite staging database the CSV files are read from; they are only "
+    "re-imported when they change. Defaults to STAGING_DB in the modes that support it.",
+)
+@click.option(
+    "--columnar-cache/--no-columnar-cache",
+    default=None,
+    help="Keep a columnar (feather) copy of the parsed CSV files next to them "
+    "and load it while they are unchanged (requires pyarrow). Defaults to "
+    "COLUMNAR_CACHE in the modes that support it.",
+)
+def main(
+    customers_file,
+    purchases_file,
+    api_url,
+    stream,
+    join_mode,
+    memory_budget,
+    parser_engine,
+    workers,
+    batch_size,
+    max_batch_bytes,
+    concurrency,
+    engine,
+    max_retries,
+    checkpoint_file,
+    resume,
+    timeout,
+    pool_size,
+    payload_format,
+    output_file,
+    input_ndjson,
+    compress,
+    compression_level,
+    fragment_cache,
+    delta_state,
+    tombstones_file,
+    staging_db,
+    columnar_cache,
+):
     """
     Main function to process customer and purchase data, format it, and send it to an API.
 
@@ -26,22 +250,275 @@ def main(customers_file, purchases_file, api_url):
         customers_file (str): Path to the file containing customer data.
         purchases_file (str): Path to the file containing purchase data.
         api_url (str): URL of the API to send the formatted data to.
+        stream (bool): Whether to stream the customers end-to-end instead of materializing them.
+        join_mode (str): "memory" to index purchases in a dict, "external" for a sort-merge join on disk.
+        memory_budget (int): Approximate number of bytes buffered by the external join before spilling.
+        parser_engine (str): "csv", "pandas" or "mmap", the engine used to parse the CSV files outside of the external join.
+        workers (int): Number of processes parsing the purchases file in parallel.
+        batch_size (int): Maximum number of customers per upload batch, or None to send a single request.
+        max_batch_bytes (int): Maximum size in bytes of an upload batch, or None for no limit.
+        concurrency (int): Maximum number of upload batches sent in parallel.
+        engine (str): "sync" to upload with requests, "async" to upload with aiohttp on an event loop.
+        max_retries (int): Number of times a failed batch is sent again, or None for the default.
+        checkpoint_file (str): File recording the acknowledged batches, or None to disable checkpointing.
+        resume (bool): Whether to skip the batches recorded in the checkpoint file by a previous run.
+        timeout (float): Read timeout in seconds for each API request, or None for the default.
+        pool_size (int): Number of pooled connections to the API, or None for the default.
+        payload_format (str): "json" or "ndjson" to choose the encoding of the request bodies, or None for JSON.
+        output_file (str): NDJSON file to write the formatted records to instead of sending them, or None.
+        input_ndjson (str): NDJSON file whose records are sent instead of the parsed CSV files, or None.
+        compress (str): "gzip" or "zstd" to compress the request bodies, or None.
+        compression_level (int): Compression level, or None for the codec default.
+        fragment_cache (str): File caching the serialized customers between runs, or None.
+        delta_state (str): File storing the customer fingerprints of the last successful run,
+            to only send the new or changed customers, or None to send every customer.
+        tombstones_file (str): NDJSON file receiving the deleted customer IDs, or None.
+        staging_db (str): SQLite staging database the CSV files are read from, or None to
+            use Config.STAGING_DB when the mode supports it.
+        columnar_cache (bool): Whether to load the parsed CSV files from their columnar cache,
+            or None to use Config.COLUMNAR_CACHE when the mode supports it.
 
     Returns:
         None
     """
+    if concurrency > 1 and not (batch_size or max_batch_bytes):
+        raise click.UsageError(
+            "--concurrency requires --batch-size or --max-batch-bytes."
+        )
+    if resume and not checkpoint_file:
+        raise click.UsageError("--resume requires --checkpoint-file.")
+    if checkpoint_file and not (batch_size or max_batch_bytes):
+        raise click.UsageError(
+            "--checkpoint-file requires --batch-size or --max-batch-bytes."
+        )
+    if workers > 1 and (parser_engine != "csv" or join_mode == "external"):
+        raise click.UsageError(
+            "--workers requires the csv parser engine and the memory join."
+        )
+    if output_file and input_ndjson:
+        raise click.UsageError("--output-file cannot be combined with --input-ndjson.")
+    if fragment_cache and (
+        input_ndjson
+        or join_mode == "external"
+        or (parser_engine == "pandas" and not stream)
+    ):
+        raise click.UsageError(
+            "--fragment-cache requires the memory join of parsed CSV files "
+            "(use --stream with the pandas parser engine)."
+        )
+    if delta_state and (
+        input_ndjson
+        or join_mode == "external"
+        or (parser_engine == "pandas" and not stream)
+    ):
+        raise click.UsageError(
+            "--delta-state requires the memory join of parsed CSV files "
+            "(use --stream with the pandas parser engine)."
+        )
+    if delta_state and fragment_cache:
+        raise click.UsageError(
+            "--delta-state cannot be combined with --fragment-cache."
+        )
+    if tombstones_file and not delta_state:
+        raise click.UsageError("--tombstones-file requires --delta-state.")
+    staging_supported = not (
+        input_ndjson or join_mode == "external" or parser_engine != "csv" or workers > 1
+    )
+    columnar_supported = not (
+        input_ndjson
+        or join_mode == "external"
+        or (parser_engine == "pandas" and not stream)
+        or workers > 1
+    )
+    if staging_db and not staging_supported:
+        raise click.UsageError(
+            "--staging-db requires the memory join, the csv parser engine and one worker."
+        )
+    if columnar_cache and not columnar_supported:
+        raise click.UsageError(
+            "--columnar-cache requires the memory join of CSV files parsed by one "
+            "worker (use --stream with the pandas parser engine)."
+        )
+    if staging_db and columnar_cache:
+        raise click.UsageError("--columnar-cache cannot be combined with --staging-db.")
+    # The Config defaults only apply to the modes that can use them, so that
+    # settings shared with the Flask routes do not reject the other modes.
+    if staging_db is None and not columnar_cache and staging_supported:
+        staging_db = Config.STAGING_DB
+    if columnar_cache is None:
+        columnar_cache = bool(
+            Config.COLUMNAR_CACHE and columnar_supported and not staging_db
+        )
+    if concurrency > (pool_size or Config.API_POOL_SIZE):
+        pool_size = concurrency
+
+    parser_options = {"engine": parser_engine} if parser_engine != "csv" else {}
+    if columnar_cache != Config.COLUMNAR_CACHE:
+        parser_options["cache"] = columnar_cache
+
     try:
-        customers = parse_customers(customers_file)
-        logger.info(f"Customers: {customers}")
+        if timeout or pool_size:
+            configure_session(
+                pool_size=pool_size,
+                timeout=timeout and (Config.API_CONNECT_TIMEOUT, timeout),
+            )
+
+        cache = FragmentCache(fragment_cache) if fragment_cache else None
+        delta = DeltaState(delta_state) if delta_state else None
+        if input_ndjson:
+            formatted_data = read_ndjson(input_ndjson)
+            logger.info(f"Replaying formatted data from {input_ndjson}.")
+        elif join_mode == "external":
+            formatted_data = iter_external_join(
+                iter_customers(customers_file),
+                iter_purchases(purchases_file),
+                memory_budget=memory_budget,
+            )
+            logger.info("Streaming externally joined data to the API.")
+        elif stream:
+            if staging_db:
+                purchases = parse_purchases_staged(purchases_file, staging_db)
+            elif workers > 1:
+                purchases = parse_purchases_parallel(purchases_file, workers)
+            else:
+                purchases = parse_purchases(purchases_file, **parser_options)
+            logger.info(f"Purchases indexed for {len(purchases)} customers.")
+
+            if staging_db:
+                customers = iter_customers_staged(customers_file, staging_db)
+            else:
+                customers = iter_customers(customers_file)
+            if delta:
+                formatted_data = iter_changed_customers(customers, purchases, delta)
+            elif cache:
+                formatted_data = iter_cached_customers(customers, purchases, cache)
+            else:
+                formatted_data = iter_formatted_customers(customers, purchases)
+            logger.info("Streaming formatted data to the API.")
+        elif parser_engine == "pandas":
+            customers = customers_frame(customers_file)
+            logger.info(f"Customers: {len(customers)} rows")
+
+            purchases = purchases_frame(purchases_file)
+            logger.info(f"Purchases: {len(purchases)} rows")
+
+            formatted_data = format_customers_columnar(customers, purchases)
+            logger.info(f"Formatted data: {len(formatted_data)} customers")
+        else:
+            if staging_db:
+                customers = parse_customers_staged(customers_file, staging_db)
+            else:
+                customers = parse_customers(customers_file, **parser_options)
+            logger.info(f"Customers: {customers}")
+
+            if staging_db:
+                purchases = parse_purchases_staged(purchases_file, staging_db)
+            elif workers > 1:
+                purchases = parse_purchases_parallel(purchases_file, workers)
+            else:
+                purchases = parse_purchases(purchases_file, **parser_options)
+            logger.info(f"Purchases: {purchases}")
+
+            if delta:
+                formatted_data = list(
+                    iter_changed_customers(customers, purchases, delta)
+                )
+                logger.info(f"Formatted data: {len(formatted_data)} changed customers")
+            elif cache:
+                formatted_data = list(
+                    iter_cached_customers(customers, purchases, cache)
+                )
+                logger.info(f"Formatted data: {len(formatted_data)} customers")
+            else:
+                formatted_data = format_customers_for_api(customers, purchases)
+                logger.info(f"Formatted data: {formatted_data}")
+
+        if output_file:
+            count = write_ndjson(formatted_data, output_file)
+            click.echo(f"Wrote {count} records to {output_file}")
+            if cache:
+                cache.save()
+            if delta:
+                _commit_delta(delta, tombstones_file)
+            return
+
+        payload = None
+        if payload_format or compress:
+            payload = PayloadEncoder(
+                payload_format or "json",
+                compression=compress,
+                compression_level=compression_level,
+            )
+
+        retry_policy = None
+        if max_retries is not None:
+            retry_policy = RetryPolicy(max_attempts=max_retries + 1)
 
-        purchases = parse_purchases(purchases_file)
-        logger.info(f"Purchases: {purchases}")
+        checkpoint = (
+            Checkpoint(checkpoint_file, resume=resume) if checkpoint_file else None
+        )
+        try:
+            if engine == "async":
+                status_code, response = asyncio.run(
+                    async_send_batches(
+                        api_url,
+                        aiter_records(formatted_data),
+                        batch_size=batch_size,
+                        max_batch_bytes=max_batch_bytes,
+                        concurrency=concurrency,
+                        retry_policy=retry_policy,
+                        checkpoint=checkpoint,
+                        payload=payload,
+                        timeout=timeout,
+                    )
+                )
+            else:
+                send_options = {}
+                if batch_size:
+                    send_options["batch_size"] = batch_size
+                if max_batch_bytes:
+                    send_options["max_batch_bytes"] = max_batch_bytes
+                if concurrency > 1:
+                    send_options["concurrency"] = concurrency
+                if retry_policy:
+                    send_options["retry_policy"] = retry_policy
+                if checkpoint:
+                    send_options["checkpoint"] = checkpoint
+                if payload:
+                    send_options["payload"] = payload
 
-        formatted_data = format_customers_for_api(customers, purchases)
-        logger.info(f"Formatted data: {formatted_data}")
+                status_code, response = send_data_to_api(
+                    api_url, formatted_data, **send_options
+                )
+        finally:
+            if checkpoint:
+                checkpoint.close()
 
-        status_code, response = send_data_to_api(api_url, formatted_data)
+        if cache:
+            cache.save()
+            click.echo(
+                f"Fragment cache: {cache.hits} customers reused, "
+                f"{cache.misses} serialized"
+            )
         click.echo(f"Response: {status_code} - {response}")
+        if engine == "async":
+            click.echo(
+                f"Throughput: {response['records_per_second']} records/s "
+                f"in {response['elapsed_seconds']}s"
+            )
+        if checkpoint and response:
+            click.echo(
+                f"Checkpoint: {response['skipped']} batches skipped, "
+                f"progress saved to {checkpoint_file}"
+            )
+        if delta:
+            if 200 <= status_code < 300:
+                _commit_delta(delta, tombstones_file)
+            else:
+                click.echo(
+                    f"Delta state not updated, the next run will send the "
+                    f"{delta.changed} changed customers again"
+                )
 
     except FileNotFoundError as e:
         logger.error(f"File not found: {e}")
@@ -7,8 +7,46 @@ class Config:
     Attributes:
         Config.API_URL (str): The base URL for the API. Defaults to "https://myhostname.com/v1/customers" if the environment variable "API_URL" is not set.
         Config.DEBUG (bool): A flag indicating whether debugging is enabled. Defaults to True if the environment variable "DEBUG" is not set.
+        Config.API_BATCH_SIZE (int | None): The maximum number of customers per upload batch. Batching is disabled when the environment variable "API_BATCH_SIZE" is not set.
+        Config.API_MAX_BATCH_BYTES (int | None): The maximum size in bytes of an upload batch. Disabled when the environment variable "API_MAX_BATCH_BYTES" is not set.
+        Config.API_CONCURRENCY (int): The maximum number of upload batches sent in parallel. Defaults to 1.
+        Config.API_MAX_CONCURRENCY (int): The maximum `concurrency` accepted by the /api/send route. Defaults to 16.
+        Config.API_MAX_RETRIES (int): The number of times a failed batch is sent again on 429, 5xx, connection errors and timeouts. Defaults to 3.
+        Config.API_BACKOFF_FACTOR (float): The base delay in seconds of the exponential backoff between retries. Defaults to 0.5.
+        Config.API_MAX_BACKOFF (float): The maximum backoff delay in seconds between retries. Defaults to 30.
+        Config.API_MAX_RETRY_AFTER (float): The maximum delay in seconds honoured from a Retry-After header. Defaults to 300.
+        Config.API_POOL_SIZE (int): The number of pooled keep-alive connections per API host. Defaults to 10.
+        Config.API_CONNECT_TIMEOUT (float): The connection timeout in seconds for API requests. Defaults to 5.
+        Config.API_READ_TIMEOUT (float): The read timeout in seconds for API requests. Defaults to 60.
+        Config.API_PAGE_SIZE (int): The default number of records per page of the GET routes. Defaults to 100.
+        Config.API_MAX_PAGE_SIZE (int): The maximum number of records per page of the GET routes. Defaults to 1000.
+        Config.API_COMPRESSION (str | None): The compression of the upload bodies, "gzip" or "zstd". Disabled when the environment variable "API_COMPRESSION" is not set.
+        Config.API_COMPRESSION_LEVEL (int | None): The compression level of the upload bodies. Defaults to the codec default (6 for gzip, 3 for zstd).
+        Config.JSON_BACKEND (str): The JSON serializer, "orjson", "json" or "auto" (orjson when installed). Defaults to "auto".
+        Config.STAGING_DB (str | None): The SQLite staging database the routes read the parsed CSV files from. Disabled (the CSV files are parsed) when the environment variable "STAGING_DB" is not set.
+        Config.COLUMNAR_CACHE (bool): Whether parse_customers and parse_purchases keep a columnar (feather) copy of the parsed CSV files next to them and load it while the files are unchanged. Enabled by setting the environment variable "COLUMNAR_CACHE" to 1. Requires pyarrow.
+        Config.JOIN_MEMORY_BUDGET (int): Approximate number of bytes the external join may buffer before spilling a sorted run to disk. Defaults to 64 MiB.
     """
 
     # API_URL = os.getenv("API_URL", "https://myhostname.com/v1/customers")
     API_URL = os.getenv("API_URL", "https://httpbin.org/put")  # For testing
     DEBUG = os.getenv("DEBUG", True)  # For debugging
+    API_BATCH_SIZE = int(os.getenv("API_BATCH_SIZE", 0)) or None
+    API_MAX_BATCH_BYTES = int(os.getenv("API_MAX_BATCH_BYTES", 0)) or None
+    API_CONCURRENCY = int(os.getenv("API_CONCURRENCY", 1))
+    API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", 16))
+    API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", 3))
+    API_BACKOFF_FACTOR = float(os.getenv("API_BACKOFF_FACTOR", 0.5))
+    API_MAX_BACKOFF = float(os.getenv("API_MAX_BACKOFF", 30))
+    API_MAX_RETRY_AFTER = float(os.getenv("API_MAX_RETRY_AFTER", 300))
+    API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", 10))
+    API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", 5))
+    API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", 60))
+    API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", 100))
+    API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", 1000))
+    API_COMPRESSION = os.getenv("API_COMPRESSION") or None
+    API_COMPRESSION_LEVEL = int(os.getenv("API_COMPRESSION_LEVEL", 0)) or None
+    JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+    STAGING_DB = os.getenv("STAGING_DB") or None
+    COLUMNAR_CACHE = os.getenv("COLUMNAR_CACHE", "").lower() in ("1", "true", "yes")
+    JOIN_MEMORY_BUDGET = int(os.getenv("JOIN_MEMORY_BUDGET", 64 * 1024 * 1024))
@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+
+class StandInApi:
+    """
+    A local stand-in for the customers API, recording the requests it receives.
+
+    Attributes:
+        url (str): The URL to send requests to.
+        requests (list): The received requests as dictionaries with the keys "method",
+            "headers" and "body".
+        statuses (list): Status codes to answer with, consumed in order; 200 once empty.
+        delay (float): Seconds to wait before answering each request.
+        max_in_flight (int): The highest number of requests handled at the same time.
+    """
+
+    def __init__(self):
+        self.url = None
+        self.requests = []
+        self.statuses = []
+        self.delay = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+
+@pytest.fixture
+def api_server():
+    """
+    Démarrer un serveur HTTP local qui joue le rôle de l'API distante.
+    """
+    api = StandInApi()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_PUT(self):
+            with api.lock:
+                api.in_flight += 1
+                api.max_in_flight = max(api.max_in_flight, api.in_flight)
+            if "chunked" in self.headers.get("Transfer-Encoding", ""):
+                body = b""
+                while True:
+                    size = int(self.rfile.readline().strip(), 16)
+                    if not size:
+                        self.rfile.readline()
+                        break
+                    body += self.rfile.read(size)
+                    self.rfile.readline()
+            else:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(api.delay)
+            with api.lock:
+                api.requests.append(
+                    {"method": "PUT", "headers": dict(self.headers), "body": body}
+                )
+                status = api.statuses.pop(0) if api.statuses else 200
+                api.in_flight -= 1
+
+            payload = json.dumps({"received": len(body)}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    api.url = f"http://127.0.0.1:{server.server_address[1]}/v1/customers"
+    yield api
+    server.shutdown()
+    server.server_close()
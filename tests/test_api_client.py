@@ -1,11 +1,24 @@
+import gzip
+import json
+import threading
+import time
 import pytest
-from app.utils.api_client import send_data_to_api
+import requests
+from app.utils.api_client import (
+    ApiSession,
+    configure_session,
+    get_session,
+    iter_batches,
+    send_data_to_api,
+)
 from app.utils.logger import logger
+from app.utils.payload import PayloadEncoder, encode_batch
+from app.utils.retry import RetryPolicy
 
 
 def test_send_data_to_api_success(mocker):
     """
-    This test creates a mock response for the `requests.put` method to simulate
+    This test creates a mock response for the `requests.Session.put` method to simulate
     a successful API call with a status code of 200 and a JSON response containing
     a success message.
     Args:
@@ -19,7 +32,7 @@ def test_send_data_to_api_success(mocker):
     mock_response.status_code = 200
     mock_response.json.return_value = {"message": "success"}
 
-    mocker.patch("requests.put", return_value=mock_response)
+    mocker.patch("requests.Session.put", return_value=mock_response)
 
     api_url = "https://httpbin.org/put"
     data = [{"key": "value"}]
@@ -39,7 +52,7 @@ def test_send_data_to_api_failure(mocker):
     mock response object with a status code of 500 and a JSON decoding error.
     Steps:
     1. Create a mock response with a status code of 500 and a JSON decoding error.
-    2. Patch the `requests.put` method to return the mock response.
+    2. Patch the `requests.Session.put` method to return the mock response.
     3. Call the `send_data_to_api` function with a sample API URL and data.
     4. Assert that the status code returned by the function is 500.
     5. Assert that the response returned by the function is `None`.
@@ -51,7 +64,8 @@ def test_send_data_to_api_failure(mocker):
     mock_response.status_code = 500
     mock_response.json.side_effect = ValueError("No JSON object could be decoded")
 
-    mocker.patch("requests.put", return_value=mock_response)
+    mocker.patch("requests.Session.put", return_value=mock_response)
+    mocker.patch("app.utils.api_client.time.sleep")
 
     api_url = "https://httpbin.org/put"
     data = [{"key": "value"}]
@@ -62,3 +76,311 @@ def test_send_data_to_api_failure(mocker):
     logger.info("Check the results")
     assert status_code == 500
     assert response is None
+
+
+def test_send_data_to_api_streams_iterables(mocker):
+    """
+    This test checks that a non-list iterable is streamed to the API as a JSON
+    array body instead of being passed through the `json` argument.
+    Args:
+        mocker: A pytest-mock fixture used to create and manage mocks.
+    Asserts:
+        `requests.Session.put` receives a generator body and a JSON content type.
+        The streamed body decodes to the original records.
+    """
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"message": "success"}
+    mock_put = mocker.patch("requests.Session.put", return_value=mock_response)
+
+    records = ({"key": value} for value in ("a", "b"))
+    status_code, response = send_data_to_api("https://httpbin.org/put", records)
+
+    assert status_code == 200
+    assert response == {"message": "success"}
+    kwargs = mock_put.call_args.kwargs
+    assert "json" not in kwargs
+    assert kwargs["headers"] == {"Content-Type": "application/json"}
+    assert json.loads(b"".join(kwargs["data"])) == [{"key": "a"}, {"key": "b"}]
+
+
+def test_iter_batches_by_record_count():
+    """
+    This test checks that records are grouped by count and encoded once.
+    Asserts:
+        Five records with a batch size of 2 give batches of 2, 2 and 1 records.
+        Each batch body decodes to the original records.
+    """
+    records = [{"id": i} for i in range(5)]
+
+    batches = list(iter_batches(iter(records), batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert json.loads(encode_batch(batches[2])) == [{"id": 4}]
+
+
+def test_iter_batches_by_byte_size():
+    """
+    This test checks that no batch body exceeds the maximum byte size, except a
+    single record that is larger than the limit on its own.
+    """
+    records = [{"id": i, "name": "x" * 10} for i in range(10)] + [{"name": "y" * 100}]
+
+    batches = list(iter_batches(records, max_batch_bytes=60))
+
+    assert sum(len(batch) for batch in batches) == len(records)
+    assert all(len(encode_batch(batch)) <= 60 for batch in batches[:-1])
+    assert len(batches[-1]) == 1
+    assert [
+        record for batch in batches for record in json.loads(encode_batch(batch))
+    ] == records
+
+
+def test_send_data_to_api_batches(mocker):
+    """
+    This test checks the batching mode of `send_data_to_api`.
+    Asserts:
+        One PUT request is sent per batch with a pre-serialized JSON body.
+        The aggregated report lists the status of every batch.
+        The overall status is the status of the first failed batch.
+    """
+    ok_response = mocker.Mock()
+    ok_response.status_code = 200
+    ok_response.json.return_value = {"message": "success"}
+    ko_response = mocker.Mock()
+    ko_response.status_code = 500
+    ko_response.raise_for_status.side_effect = requests.exceptions.HTTPError("boom")
+    mock_put = mocker.patch(
+        "requests.Session.put", side_effect=[ok_response, ko_response, ok_response]
+    )
+
+    data = [{"key": i} for i in range(5)]
+    status_code, report = send_data_to_api(
+        "https://httpbin.org/put",
+        data,
+        batch_size=2,
+        retry_policy=RetryPolicy(max_attempts=1),
+    )
+
+    assert mock_put.call_count == 3
+    assert json.loads(mock_put.call_args_list[0].kwargs["data"]) == data[:2]
+    assert status_code == 500
+    assert report["records"] == 5
+    assert report["sent"] == 2
+    assert report["failed"] == 1
+    assert [batch["status"] for batch in report["batches"]] == [200, 500, 200]
+    assert [batch["records"] for batch in report["batches"]] == [2, 2, 1]
+
+
+def test_api_session_pool_and_default_timeout(mocker):
+    """
+    This test checks that `ApiSession` mounts a pooled adapter and applies its
+    default timeout to every request that does not set one explicitly.
+    """
+    mock_request = mocker.patch("requests.Session.request")
+    session = ApiSession(pool_size=4, timeout=(1, 2))
+
+    adapter = session.get_adapter("https://httpbin.org/put")
+    assert adapter._pool_maxsize == 4
+    assert session.headers["Connection"] == "keep-alive"
+
+    session.put("https://httpbin.org/put", data=b"[]")
+    session.put("https://httpbin.org/put", data=b"[]", timeout=10)
+
+    assert mock_request.call_args_list[0].kwargs["timeout"] == (1, 2)
+    assert mock_request.call_args_list[1].kwargs["timeout"] == 10
+
+
+def test_send_data_to_api_reuses_shared_session(mocker):
+    """
+    This test checks that successive calls and batches go through the single
+    shared session, and that `configure_session` replaces it.
+    """
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"message": "success"}
+    mock_put = mocker.patch.object(
+        ApiSession, "put", autospec=True, return_value=mock_response
+    )
+
+    send_data_to_api("https://httpbin.org/put", [{"key": "value"}])
+    send_data_to_api("https://httpbin.org/put", [{"key": i} for i in range(4)], 2)
+
+    sessions = [call.args[0] for call in mock_put.call_args_list]
+    assert len(sessions) == 3
+    assert all(session is get_session() for session in sessions)
+
+    previous = get_session()
+    assert configure_session(pool_size=2) is get_session()
+    assert get_session() is not previous
+
+
+def test_send_data_to_api_concurrent_batches(mocker):
+    """
+    This test checks the concurrent upload engine.
+    Asserts:
+        No more than `concurrency` requests are in flight at the same time.
+        The producer never runs more than `concurrency` batches ahead of the uploads.
+        The report lists the batches in their original order even though they
+        complete out of order.
+    """
+    lock = threading.Lock()
+    state = {"in_flight": 0, "max_in_flight": 0, "produced": 0, "max_ahead": 0}
+    completed = []
+
+    def fake_put(api_url, data, headers):
+        with lock:
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        records = json.loads(data)
+        time.sleep(0.01 * (3 - records[0]["key"] % 3))
+        with lock:
+            state["in_flight"] -= 1
+            completed.append(records[0]["key"])
+        response = mocker.Mock()
+        response.status_code = 200
+        response.json.return_value = records
+        return response
+
+    mocker.patch("requests.Session.put", side_effect=fake_put)
+
+    def records():
+        for key in range(12):
+            with lock:
+                state["produced"] += 1
+                ahead = state["produced"] - len(completed)
+                state["max_ahead"] = max(state["max_ahead"], ahead)
+            yield {"key": key}
+
+    status_code, report = send_data_to_api(
+        "https://httpbin.org/put", records(), batch_size=1, concurrency=3
+    )
+
+    assert status_code == 200
+    assert state["max_in_flight"] <= 3
+    # In flight, plus the batch waiting for a slot, plus the record buffered by iter_batches.
+    assert state["max_ahead"] <= 3 + 2
+    assert completed != sorted(completed)
+    assert [batch["batch"] for batch in report["batches"]] == list(range(12))
+    assert [batch["response"] for batch in report["batches"]] == [
+        [{"key": key}] for key in range(12)
+    ]
+
+
+def _response(mocker, status_code, retry_after=None):
+    response = mocker.Mock()
+    response.status_code = status_code
+    response.headers = {"Retry-After": retry_after} if retry_after else {}
+    response.json.return_value = {"status": status_code}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            f"{status_code} error"
+        )
+    return response
+
+
+def test_send_batches_retries_only_the_failed_batch(mocker):
+    """
+    This test checks that a transient failure is retried for the failing batch
+    only, honouring the Retry-After header of the response.
+    Asserts:
+        The second batch is sent three times (503, 429, then 200).
+        The first delay is the Retry-After value, the next one a jittered backoff.
+        The report records the number of attempts per batch.
+    """
+    mock_put = mocker.patch(
+        "requests.Session.put",
+        side_effect=[
+            _response(mocker, 200),
+            _response(mocker, 503, retry_after="2"),
+            _response(mocker, 429),
+            _response(mocker, 200),
+        ],
+    )
+    mock_sleep = mocker.patch("app.utils.api_client.time.sleep")
+
+    status_code, report = send_data_to_api(
+        "https://httpbin.org/put",
+        [{"key": i} for i in range(4)],
+        batch_size=2,
+        retry_policy=RetryPolicy(max_attempts=3, backoff_factor=1, max_backoff=10),
+    )
+
+    assert status_code == 200
+    assert mock_put.call_count == 4
+    assert [call.kwargs["data"] for call in mock_put.call_args_list[1:]] == [
+        b'[{"key":2},{"key":3}]'
+    ] * 3
+    assert mock_sleep.call_args_list[0].args == (2.0,)
+    assert 0 <= mock_sleep.call_args_list[1].args[0] <= 2
+    assert [batch["attempts"] for batch in report["batches"]] == [1, 3]
+
+
+def test_send_data_to_api_gives_up_after_max_attempts(mocker):
+    """
+    This test checks that retries stop after `max_attempts` and that client
+    errors are not retried.
+    """
+    mocker.patch("app.utils.api_client.time.sleep")
+    mock_put = mocker.patch("requests.Session.put", return_value=_response(mocker, 502))
+
+    status_code, response = send_data_to_api(
+        "https://httpbin.org/put",
+        [{"key": 1}],
+        retry_policy=RetryPolicy(max_attempts=2),
+    )
+
+    assert (status_code, response) == (502, None)
+    assert mock_put.call_count == 2
+
+    mock_put.reset_mock()
+    mock_put.return_value = _response(mocker, 400)
+    status_code, _ = send_data_to_api("https://httpbin.org/put", [{"key": 1}])
+
+    assert status_code == 400
+    assert mock_put.call_count == 1
+
+
+def test_send_data_to_api_retries_connection_errors(mocker):
+    """
+    This test checks that connection errors are retried and then succeed.
+    """
+    mocker.patch("app.utils.api_client.time.sleep")
+    mocker.patch(
+        "requests.Session.put",
+        side_effect=[
+            requests.exceptions.ConnectionError("reset"),
+            requests.exceptions.ReadTimeout("slow"),
+            _response(mocker, 200),
+        ],
+    )
+
+    status_code, response = send_data_to_api("https://httpbin.org/put", [{"key": 1}])
+
+    assert status_code == 200
+    assert response == {"status": 200}
+
+
+def test_send_data_to_api_compresses_streamed_bodies(api_server):
+    """
+    This test streams records to the stand-in API with gzip compression.
+    Asserts:
+        The request carries a gzip Content-Encoding and its body decompresses
+        to the JSON array of the records.
+    """
+    records = ({"key": value} for value in range(1000))
+
+    status_code, _ = send_data_to_api(
+        api_server.url,
+        records,
+        session=requests.Session(),
+        payload=PayloadEncoder(compression="gzip"),
+    )
+
+    assert status_code == 200
+    (request,) = api_server.requests
+    assert request["headers"]["Content-Encoding"] == "gzip"
+    assert len(request["body"]) < len(json.dumps(list(range(1000))))
+    assert json.loads(gzip.decompress(request["body"])) == [
+        {"key": value} for value in range(1000)
+    ]
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import socket
+import pytest
+from app.utils.async_client import aiter_records, async_send_batches
+from app.utils.logger import logger
+from app.utils.payload import PayloadEncoder
+from app.utils.retry import RetryPolicy
+
+
+async def _records(count):
+    for key in range(count):
+        yield {"key": key}
+
+
+def test_async_send_batches_success(api_server):
+    """
+    This test sends batches to a local stand-in API from an async generator.
+    Asserts:
+        Every batch is received once, the report keeps the batches in order and
+        includes throughput figures.
+    """
+    logger.info("Call the function")
+    status_code, report = asyncio.run(
+        async_send_batches(api_server.url, _records(10), batch_size=3, concurrency=2)
+    )
+
+    logger.info("Check the results")
+    assert status_code == 200
+    assert [batch["records"] for batch in report["batches"]] == [3, 3, 3, 1]
+    assert [batch["batch"] for batch in report["batches"]] == [0, 1, 2, 3]
+    assert report["sent"] == 4
+    assert report["records_per_second"] > 0
+    received = sorted(
+        record["key"]
+        for request in api_server.requests
+        for record in json.loads(request["body"])
+    )
+    assert received == list(range(10))
+
+
+def test_async_send_batches_limits_concurrency(api_server):
+    """
+    This test checks that the semaphore bounds the number of requests in flight.
+    """
+    api_server.delay = 0.05
+
+    status_code, report = asyncio.run(
+        async_send_batches(
+            api_server.url,
+            aiter_records({"key": key} for key in range(8)),
+            batch_size=1,
+            concurrency=3,
+        )
+    )
+
+    assert status_code == 200
+    assert report["sent"] == 8
+    assert 1 < api_server.max_in_flight <= 3
+
+
+def test_async_send_batches_failures(api_server):
+    """
+    This test checks that an HTTP error on one batch is reported without
+    stopping the others.
+    """
+    api_server.statuses = [200, 500]
+
+    status_code, report = asyncio.run(
+        async_send_batches(
+            api_server.url,
+            _records(4),
+            batch_size=2,
+            concurrency=1,
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+    )
+
+    assert status_code == 500
+    assert [batch["status"] for batch in report["batches"]] == [200, 500]
+    assert report["batches"][1]["response"] is None
+
+
+def test_async_send_batches_connection_error():
+    """
+    This test checks that a refused connection is reported as a 503.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    status_code, report = asyncio.run(
+        async_send_batches(
+            f"http://127.0.0.1:{port}/",
+            [{"key": 1}],
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+    )
+
+    assert status_code == 503
+    assert report["failed"] == 1
+
+
+def test_async_send_batches_timeout(api_server):
+    """
+    This test checks that the read timeout applies to the default session and
+    that a request exceeding it is reported as a 504.
+    """
+    api_server.delay = 0.5
+
+    status_code, report = asyncio.run(
+        async_send_batches(
+            api_server.url,
+            [{"key": 1}],
+            retry_policy=RetryPolicy(max_attempts=1),
+            timeout=0.1,
+        )
+    )
+
+    assert status_code == 504
+    assert report["failed"] == 1
+
+
+def test_async_send_batches_retries_transient_failures(api_server):
+    """
+    This test checks that a batch answered with a 503 is sent again after the
+    delay requested by Retry-After, without resending the other batches.
+    """
+    api_server.statuses = [200, 503, 200]
+
+    status_code, report = asyncio.run(
+        async_send_batches(
+            api_server.url,
+            _records(4),
+            batch_size=2,
+            concurrency=1,
+            retry_policy=RetryPolicy(max_attempts=3, backoff_factor=0.01),
+        )
+    )
+
+    assert status_code == 200
+    assert [batch["attempts"] for batch in report["batches"]] == [1, 2]
+    assert len(api_server.requests) == 3
+    assert api_server.requests[1]["body"] == api_server.requests[2]["body"]
+
+
+def test_async_send_batches_ndjson(api_server):
+    """
+    This test sends NDJSON batches to the stand-in API.
+    Asserts:
+        Each body holds one record per line and is labelled as NDJSON.
+    """
+    status_code, report = asyncio.run(
+        async_send_batches(
+            api_server.url, _records(3), batch_size=2, payload=PayloadEncoder("ndjson")
+        )
+    )
+
+    assert status_code == 200
+    assert report["sent"] == 2
+    bodies = sorted(request["body"] for request in api_server.requests)
+    assert bodies == [b'{"key":0}\n{"key":1}\n', b'{"key":2}\n']
+    assert {request["headers"]["Content-Type"] for request in api_server.requests} == {
+        "application/x-ndjson"
+    }
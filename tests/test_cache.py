@@ -0,0 +1,61 @@
+import os
+import pytest
+from app.utils.cache import FileCache
+
+
+def test_file_cache_reuses_value_until_file_changes(mocker, tmp_path):
+    """
+    Tester que la valeur est réutilisée tant que le fichier n'est pas modifié.
+    """
+    path = tmp_path / "customers.csv"
+    path.write_text("a")
+    loader = mocker.Mock(side_effect=lambda p: open(p).read())
+    cache = FileCache()
+
+    assert cache.get(str(path), "content", loader) == "a"
+    assert cache.get(str(path), "content", loader) == "a"
+    assert loader.call_count == 1
+
+    path.write_text("bb")
+    assert cache.get(str(path), "content", loader) == "bb"
+    assert loader.call_count == 2
+
+
+def test_file_cache_detects_mtime_change_with_same_size(mocker, tmp_path):
+    """
+    Tester l'invalidation lorsque seule la date de modification change.
+    """
+    path = tmp_path / "customers.csv"
+    path.write_text("a")
+    loader = mocker.Mock(return_value="value")
+    cache = FileCache()
+
+    cache.get(str(path), "content", loader)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    cache.get(str(path), "content", loader)
+
+    assert loader.call_count == 2
+
+
+def test_file_cache_keys_on_name_and_clear(mocker, tmp_path):
+    """
+    Tester que plusieurs valeurs dérivées d'un même fichier sont distinctes et que clear vide le cache.
+    """
+    path = tmp_path / "customers.csv"
+    path.write_text("a")
+    cache = FileCache()
+
+    assert cache.get(str(path), "parsed", lambda p: 1) == 1
+    assert cache.get(str(path), "json", lambda p: 2) == 2
+
+    cache.clear()
+    assert cache.get(str(path), "parsed", lambda p: 3) == 3
+
+
+def test_file_cache_missing_file(tmp_path):
+    """
+    Tester qu'un fichier manquant lève FileNotFoundError.
+    """
+    with pytest.raises(FileNotFoundError):
+        FileCache().get(str(tmp_path / "missing.csv"), "parsed", lambda p: None)
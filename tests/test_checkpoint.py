@@ -0,0 +1,63 @@
+import json
+import pytest
+from app.utils.checkpoint import Checkpoint
+
+
+def test_checkpoint_records_and_resumes(tmp_path):
+    """
+    Tester qu'un lot acquitté est retrouvé lors d'une reprise.
+    """
+    path = str(tmp_path / "checkpoint.jsonl")
+    key = Checkpoint.batch_key(0, b'[{"key": 1}]')
+
+    with Checkpoint(path) as checkpoint:
+        assert key not in checkpoint
+        checkpoint.mark_done(key, 1)
+
+    with Checkpoint(path, resume=True) as checkpoint:
+        assert key in checkpoint
+        assert Checkpoint.batch_key(1, b'[{"key": 1}]') not in checkpoint
+        assert Checkpoint.batch_key(0, b'[{"key": 2}]') not in checkpoint
+
+
+def test_checkpoint_without_resume_starts_over(tmp_path):
+    """
+    Tester qu'un nouveau checkpoint sans reprise efface le précédent.
+    """
+    path = tmp_path / "checkpoint.jsonl"
+    path.write_text(json.dumps({"key": "0:abc", "records": 1}) + "\n")
+
+    with Checkpoint(str(path)) as checkpoint:
+        assert "0:abc" not in checkpoint
+
+    assert path.read_text() == ""
+
+
+def test_checkpoint_ignores_corrupt_lines(mocker, tmp_path):
+    """
+    Tester qu'une ligne tronquée (arrêt brutal pendant l'écriture) est ignorée.
+    """
+    path = tmp_path / "checkpoint.jsonl"
+    path.write_text(json.dumps({"key": "0:abc", "records": 1}) + '\n{"key": "1:de')
+    mock_logger = mocker.patch("app.utils.checkpoint.logger.warning")
+
+    with Checkpoint(str(path), resume=True) as checkpoint:
+        assert "0:abc" in checkpoint
+        assert len(checkpoint.acknowledged) == 1
+
+    mock_logger.assert_called_once()
+
+
+def test_checkpoint_resume_after_truncated_line(mocker, tmp_path):
+    """
+    Tester que les lots acquittés après une ligne tronquée sont retrouvés à la reprise suivante.
+    """
+    path = tmp_path / "checkpoint.jsonl"
+    path.write_text(json.dumps({"key": "0:abc", "records": 1}) + '\n{"key": "1:de')
+    mocker.patch("app.utils.checkpoint.logger.warning")
+
+    with Checkpoint(str(path), resume=True) as checkpoint:
+        checkpoint.mark_done("1:def", 2)
+
+    with Checkpoint(str(path), resume=True) as checkpoint:
+        assert checkpoint.acknowledged == {"0:abc", "1:def"}
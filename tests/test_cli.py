@@ -1,6 +1,8 @@
+import json
 import pytest
 from click.testing import CliRunner
 from cli import main
+from app.utils.records import json_default
 from app.utils.logger import logger
 
 
@@ -102,3 +104,695 @@ def test_cli_failure_on_send(mocker):
 
     assert result.exit_code == 0
     assert "Response: 500 - None" in result.output
+
+
+def test_cli_stream_mode(mocker):
+    """
+    Tests the CLI command in streaming mode.
+    This test checks that --stream uses the lazy customer iterator and hands a
+    generator of formatted customers to send_data_to_api instead of a list.
+    """
+    mock_parse_customers = mocker.patch("cli.parse_customers")
+    mock_iter_customers = mocker.patch(
+        "cli.iter_customers",
+        return_value=iter(
+            [
+                {
+                    "customer_id": "1",
+                    "title": "Male",
+                    "last_name": "Norris",
+                    "first_name": "Chuck",
+                    "email": "chuck@norris.com",
+                }
+            ]
+        ),
+    )
+    mocker.patch("cli.parse_purchases", return_value={"1": [{"product_id": "A1"}]})
+    sent = []
+
+    def fake_send(api_url, data):
+        sent.append(data)
+        return 200, {"message": "success"}
+
+    mocker.patch("cli.send_data_to_api", side_effect=fake_send)
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--stream", "--api-url", "https://httpbin.org/put"])
+
+    mock_parse_customers.assert_not_called()
+    mock_iter_customers.assert_called_once_with("static/customers.csv")
+    assert len(sent) == 1
+    assert not isinstance(sent[0], list)
+    assert result.exit_code == 0
+    assert "Response: 200 - {'message': 'success'}" in result.output
+
+
+def test_cli_external_join_mode(mocker):
+    """
+    Tests the CLI command with the disk-backed join.
+    This test checks that --join-mode external streams both CSV files through
+    iter_external_join with the requested memory budget.
+    """
+    mocker.patch("cli.iter_customers", return_value=iter([]))
+    mocker.patch("cli.iter_purchases", return_value=iter([]))
+    mock_join = mocker.patch("cli.iter_external_join", return_value=iter([]))
+    mock_send_data_to_api = mocker.patch(
+        "cli.send_data_to_api", return_value=(200, {"message": "success"})
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--join-mode", "external", "--memory-budget", "1024"])
+
+    assert mock_join.call_args.kwargs == {"memory_budget": 1024}
+    mock_send_data_to_api.assert_called_once()
+    assert result.exit_code == 0
+    assert "Response: 200 - {'message': 'success'}" in result.output
+
+
+def test_cli_batch_options(mocker):
+    """
+    Tests that --batch-size and --max-batch-bytes are forwarded to send_data_to_api.
+    """
+    mocker.patch("cli.parse_customers", return_value=[{"customer_id": "123"}])
+    mocker.patch("cli.parse_purchases", return_value={})
+    mocker.patch(
+        "cli.format_customers_for_api", return_value=[{"formatted_data": "example"}]
+    )
+    mock_send_data_to_api = mocker.patch(
+        "cli.send_data_to_api", return_value=(200, {"sent": 1, "failed": 0})
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "--api-url",
+            "https://httpbin.org/put",
+            "--batch-size",
+            "500",
+            "--max-batch-bytes",
+            "1048576",
+        ],
+    )
+
+    mock_send_data_to_api.assert_called_once_with(
+        "https://httpbin.org/put",
+        [{"formatted_data": "example"}],
+        batch_size=500,
+        max_batch_bytes=1048576,
+    )
+    assert result.exit_code == 0
+
+
+def test_cli_configures_shared_session(mocker):
+    """
+    Tests that --timeout and --pool-size reconfigure the shared API session.
+    """
+    mocker.patch("cli.parse_customers", return_value=[])
+    mocker.patch("cli.parse_purchases", return_value={})
+    mocker.patch("cli.format_customers_for_api", return_value=[])
+    mocker.patch("cli.send_data_to_api", return_value=(200, []))
+    mock_configure_session = mocker.patch("cli.configure_session")
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--timeout", "30", "--pool-size", "4"])
+
+    mock_configure_session.assert_called_once_with(pool_size=4, timeout=(5.0, 30.0))
+    assert result.exit_code == 0
+
+
+def test_cli_concurrency(mocker):
+    """
+    Tests that --concurrency is forwarded to send_data_to_api and sizes the connection pool.
+    """
+    mocker.patch("cli.parse_customers", return_value=[])
+    mocker.patch("cli.parse_purchases", return_value={})
+    mocker.patch("cli.format_customers_for_api", return_value=[])
+    mock_send_data_to_api = mocker.patch(
+        "cli.send_data_to_api", return_value=(200, {"sent": 0, "failed": 0})
+    )
+    mock_configure_session = mocker.patch("cli.configure_session")
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--batch-size", "100", "--concurrency", "16"])
+
+    assert mock_send_data_to_api.call_args.kwargs == {
+        "batch_size": 100,
+        "concurrency": 16,
+    }
+    mock_configure_session.assert_called_once_with(pool_size=16, timeout=None)
+    assert result.exit_code == 0
+
+
+def test_cli_concurrency_requires_batching(mocker):
+    """
+    Tests that --concurrency without a batching option is rejected.
+    """
+    mock_send_data_to_api = mocker.patch("cli.send_data_to_api")
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--concurrency", "4"])
+
+    mock_send_data_to_api.assert_not_called()
+    assert result.exit_code == 2
+    assert "--concurrency requires" in result.output
+
+
+def test_cli_async_engine(mocker):
+    """
+    Tests that --engine async runs async_send_batches and prints the throughput.
+    """
+    mocker.patch("cli.parse_customers", return_value=[])
+    mocker.patch("cli.parse_purchases", return_value={})
+    mocker.patch("cli.format_customers_for_api", return_value=[{"email": "a@b.c"}])
+    mock_send_data_to_api = mocker.patch("cli.send_data_to_api")
+
+    async def fake_async_send_batches(api_url, records, **kwargs):
+        sent = [record async for record in records]
+        return 200, {
+            "records": len(sent),
+            "kwargs": kwargs,
+            "records_per_second": 10.0,
+            "elapsed_seconds": 0.1,
+        }
+
+    mocker.patch("cli.async_send_batches", side_effect=fake_async_send_batches)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "--engine",
+            "async",
+            "--batch-size",
+            "10",
+            "--concurrency",
+            "8",
+            "--timeout",
+            "2.5",
+        ],
+    )
+
+    mock_send_data_to_api.assert_not_called()
+    assert result.exit_code == 0
+    assert "'records': 1" in result.output
+    assert "'concurrency': 8" in result.output
+    assert "'timeout': 2.5" in result.output
+    assert "Throughput: 10.0 records/s in 0.1s" in result.output
+
+
+def test_cli_max_retries(mocker):
+    """
+    Tests that --max-retries builds the retry policy passed to send_data_to_api.
+    """
+    mocker.patch("cli.parse_customers", return_value=[])
+    mocker.patch("cli.parse_purchases", return_value={})
+    mocker.patch("cli.format_customers_for_api", return_value=[])
+    mock_send_data_to_api = mocker.patch(
+        "cli.send_data_to_api", return_value=(200, {"sent": 0, "failed": 0})
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--batch-size", "100", "--max-retries", "5"])
+
+    retry_policy = mock_send_data_to_api.call_args.kwargs["retry_policy"]
+    assert retry_policy.max_attempts == 6
+    assert result.exit_code == 0
+
+
+def test_cli_resume_skips_acknowledged_batches(api_server, tmp_path):
+    """
+    Tests an interrupted upload resumed with --resume.
+    The first run fails on the second batch; the second run only sends the
+    batches that were not acknowledged by the stand-in API.
+    """
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        + "".join(f"{i};1;Doe;Jane;75000;Paris;jane{i}@example.com\n" for i in range(5))
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text("customer_id;product_id;quantity;price;currency;date\n")
+    checkpoint_file = tmp_path / "checkpoint.jsonl"
+    arguments = [
+        "--customers-file",
+        str(customers_file),
+        "--purchases-file",
+        str(purchases_file),
+        "--api-url",
+        api_server.url,
+        "--batch-size",
+        "2",
+        "--max-retries",
+        "0",
+        "--checkpoint-file",
+        str(checkpoint_file),
+    ]
+
+    api_server.statuses = [200, 500, 200]
+    runner = CliRunner()
+    first = runner.invoke(main, arguments)
+
+    assert "Response: 500" in first.output
+    assert len(api_server.requests) == 3
+
+    api_server.requests.clear()
+    second = runner.invoke(main, arguments + ["--resume"])
+
+    assert "Response: 200" in second.output
+    assert "Checkpoint: 2 batches skipped" in second.output
+    assert [
+        [customer["email"] for customer in json.loads(request["body"])]
+        for request in api_server.requests
+    ] == [["jane2@example.com", "jane3@example.com"]]
+
+
+def test_cli_resume_requires_checkpoint_file():
+    """
+    Tests that --resume without --checkpoint-file is rejected.
+    """
+    runner = CliRunner()
+    result = runner.invoke(main, ["--batch-size", "10", "--resume"])
+
+    assert result.exit_code == 2
+    assert "--resume requires --checkpoint-file" in result.output
+
+
+def test_cli_output_file_and_input_ndjson(mocker, tmp_path):
+    """
+    Tests that --output-file writes the formatted records as NDJSON without
+    sending them, and that --input-ndjson replays that file to the API.
+    """
+    mocker.patch("cli.parse_customers", return_value=[{"customer_id": "123"}])
+    mocker.patch("cli.parse_purchases", return_value={})
+    mocker.patch(
+        "cli.format_customers_for_api",
+        return_value=[{"customer_id": "123", "purchases": []}],
+    )
+    mock_send_data_to_api = mocker.patch(
+        "cli.send_data_to_api", return_value=(200, {"message": "success"})
+    )
+    output_file = tmp_path / "formatted.ndjson"
+
+    runner = CliRunner()
+    written = runner.invoke(main, ["--output-file", str(output_file)])
+
+    assert written.exit_code == 0
+    assert f"Wrote 1 records to {output_file}" in written.output
+    assert output_file.read_text() == '{"customer_id":"123","purchases":[]}\n'
+    mock_send_data_to_api.assert_not_called()
+
+    replayed = runner.invoke(
+        main, ["--input-ndjson", str(output_file), "--payload-format", "ndjson"]
+    )
+
+    assert replayed.exit_code == 0
+    (_, data), options = mock_send_data_to_api.call_args
+    assert list(data) == [{"customer_id": "123", "purchases": []}]
+    assert options["payload"].headers == {"Content-Type": "application/x-ndjson"}
+
+
+def test_cli_compress(mocker):
+    """
+    Tests that --compress and --compression-level configure the payload encoder.
+    """
+    mocker.patch("cli.parse_customers", return_value=[])
+    mocker.patch("cli.parse_purchases", return_value={})
+    mocker.patch("cli.format_customers_for_api", return_value=[])
+    mock_send_data_to_api = mocker.patch(
+        "cli.send_data_to_api", return_value=(200, {"message": "success"})
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--compress", "zstd", "--compression-level", "9"])
+
+    assert result.exit_code == 0
+    payload = mock_send_data_to_api.call_args.kwargs["payload"]
+    assert payload.headers == {
+        "Content-Type": "application/json",
+        "Content-Encoding": "zstd",
+    }
+    assert payload.compression_level == 9
+
+
+def test_cli_parser_engine(mocker, tmp_path):
+    """
+    Tests that --parser-engine pandas parses the files into frames and joins
+    them with the grouped columnar join, producing the same records as the csv engine.
+    """
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1;Doe;Jane;75000;Paris;jane@example.com\n"
+        "2;2;Smith;John;69000;Lyon;john@example.com\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        "2;P1;1;9.99;EUR;2023-01-01\n"
+        "1;P2;2;5;EUR;2023-01-02\n"
+        "2;P3;3;1.5;USD;2023-01-03\n"
+    )
+    mock_send_data_to_api = mocker.patch(
+        "cli.send_data_to_api", return_value=(200, {"message": "success"})
+    )
+    arguments = [
+        "--customers-file",
+        str(customers_file),
+        "--purchases-file",
+        str(purchases_file),
+    ]
+
+    runner = CliRunner()
+    runner.invoke(main, arguments)
+    expected = mock_send_data_to_api.call_args.args[1]
+    result = runner.invoke(main, arguments + ["--parser-engine", "pandas"])
+
+    assert result.exit_code == 0
+    formatted_data = mock_send_data_to_api.call_args.args[1]
+    assert json.dumps(formatted_data) == json.dumps(expected, default=json_default)
+    assert [purchase["product_id"] for purchase in formatted_data[1]["purchases"]] == [
+        "P1",
+        "P3",
+    ]
+
+
+def test_cli_workers(mocker):
+    """
+    Tests that --workers parses the purchases file with the parallel parser,
+    and that it is rejected with the external join.
+    """
+    mocker.patch("cli.parse_customers", return_value=[])
+    mock_parse_purchases = mocker.patch("cli.parse_purchases")
+    mock_parse_purchases_parallel = mocker.patch(
+        "cli.parse_purchases_parallel", return_value={}
+    )
+    mocker.patch("cli.format_customers_for_api", return_value=[])
+    mocker.patch("cli.send_data_to_api", return_value=(200, {"message": "success"}))
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--workers", "4"])
+    rejected = runner.invoke(main, ["--workers", "4", "--join-mode", "external"])
+
+    assert result.exit_code == 0
+    mock_parse_purchases_parallel.assert_called_once_with("static/purchases.csv", 4)
+    mock_parse_purchases.assert_not_called()
+    assert rejected.exit_code == 2
+    assert "--workers requires the csv parser engine" in rejected.output
+
+
+def test_cli_fragment_cache(mocker, tmp_path):
+    """
+    Tests that --fragment-cache sends the same bodies as without cache and
+    reuses the serialized customers on the next run.
+    """
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1;Doe;Jane;75000;Paris;jane@example.com\n"
+        "2;2;Smith;John;69000;Lyon;john@example.com\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        "2;P1;1;9.99;EUR;2023-01-01\n"
+    )
+    mock_put = mocker.patch(
+        "app.utils.api_client._put", return_value=(200, {"message": "success"}, 1)
+    )
+    arguments = [
+        "--customers-file",
+        str(customers_file),
+        "--purchases-file",
+        str(purchases_file),
+        "--batch-size",
+        "10",
+    ]
+    cache_arguments = arguments + ["--fragment-cache", str(tmp_path / "fragments")]
+
+    runner = CliRunner()
+    runner.invoke(main, arguments)
+    expected = mock_put.call_args.kwargs["data"]
+    first = runner.invoke(main, cache_arguments)
+    first_body = mock_put.call_args.kwargs["data"]
+    second = runner.invoke(main, cache_arguments + ["--stream"])
+
+    assert first.exit_code == 0
+    assert "Fragment cache: 0 customers reused, 2 serialized" in first.output
+    assert first_body == expected
+    assert second.exit_code == 0
+    assert "Fragment cache: 2 customers reused, 0 serialized" in second.output
+    assert mock_put.call_args.kwargs["data"] == expected
+
+    rejected = runner.invoke(main, cache_arguments + ["--join-mode", "external"])
+    assert rejected.exit_code == 2
+    assert "--fragment-cache requires the memory join" in rejected.output
+
+
+def test_cli_delta_state(mocker, tmp_path):
+    """
+    Tests that --delta-state only sends the changed customers once a run
+    succeeded, and that --tombstones-file lists the deleted customers.
+    """
+    customers_file = tmp_path / "customers.csv"
+    header = "customer_id;title;lastname;firstname;postal_code;city;email\n"
+    jane = "1;1;Doe;Jane;75000;Paris;jane@example.com\n"
+    john = "2;2;Smith;John;69000;Lyon;john@example.com\n"
+    customers_file.write_text(header + jane + john)
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        "2;P1;1;9.99;EUR;2023-01-01\n"
+    )
+    mock_send_data_to_api = mocker.patch(
+        "cli.send_data_to_api", return_value=(500, None)
+    )
+    tombstones_file = tmp_path / "tombstones.ndjson"
+    arguments = [
+        "--customers-file",
+        str(customers_file),
+        "--purchases-file",
+        str(purchases_file),
+        "--delta-state",
+        str(tmp_path / "state.json"),
+        "--tombstones-file",
+        str(tombstones_file),
+    ]
+
+    def sent_emails():
+        return [
+            customer["email"] for customer in mock_send_data_to_api.call_args.args[1]
+        ]
+
+    runner = CliRunner()
+    failed = runner.invoke(main, arguments)
+    assert "Delta state not updated" in failed.output
+
+    mock_send_data_to_api.return_value = (200, {"message": "success"})
+    first = runner.invoke(main, arguments)
+    assert sent_emails() == ["jane@example.com", "john@example.com"]
+    assert "Delta: 2 customers sent, 0 unchanged, 0 deleted" in first.output
+
+    customers_file.write_text(header + jane.replace("Paris", "Lyon"))
+    second = runner.invoke(main, arguments)
+    assert sent_emails() == ["jane@example.com"]
+    assert "Delta: 1 customers sent, 0 unchanged, 1 deleted" in second.output
+    assert tombstones_file.read_text() == '{"customer_id":"2"}\n'
+
+    third = runner.invoke(main, arguments)
+    assert sent_emails() == []
+    assert "Delta: 0 customers sent, 1 unchanged, 0 deleted" in third.output
+
+    rejected = runner.invoke(main, ["--tombstones-file", str(tombstones_file)])
+    assert rejected.exit_code == 2
+    assert "--tombstones-file requires --delta-state" in rejected.output
+
+
+def test_cli_staging_db(mocker, tmp_path):
+    """
+    Tests that --staging-db sends the same records as the csv parser, and
+    that it is rejected with another parser engine.
+    """
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1;Doe;Jane;75000;Paris;jane@example.com\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        "1;P1;1;9.99;EUR;2023-01-01\n"
+    )
+    mock_send_data_to_api = mocker.patch(
+        "cli.send_data_to_api", return_value=(200, {"message": "success"})
+    )
+    arguments = [
+        "--customers-file",
+        str(customers_file),
+        "--purchases-file",
+        str(purchases_file),
+    ]
+    staging_arguments = arguments + ["--staging-db", str(tmp_path / "staging.db")]
+
+    runner = CliRunner()
+    runner.invoke(main, arguments)
+    expected = mock_send_data_to_api.call_args.args[1]
+    staged = runner.invoke(main, staging_arguments)
+    assert staged.exit_code == 0
+    assert mock_send_data_to_api.call_args.args[1] == expected
+    streamed = runner.invoke(main, staging_arguments + ["--stream"])
+    assert streamed.exit_code == 0
+    assert list(mock_send_data_to_api.call_args.args[1]) == expected
+
+    rejected = runner.invoke(main, staging_arguments + ["--parser-engine", "mmap"])
+    assert rejected.exit_code == 2
+    assert "--staging-db requires the memory join" in rejected.output
+
+
+def test_cli_columnar_cache(mocker, tmp_path):
+    """
+    Tests that --columnar-cache writes the cache files and sends the same
+    records on the next run, and that it is rejected with --staging-db.
+    """
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1;Doe;Jane;75000;Paris;jane@example.com\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        "1;P1;1;9.99;EUR;2023-01-01\n"
+    )
+    mock_send_data_to_api = mocker.patch(
+        "cli.send_data_to_api", return_value=(200, {"message": "success"})
+    )
+    arguments = [
+        "--customers-file",
+        str(customers_file),
+        "--purchases-file",
+        str(purchases_file),
+    ]
+
+    runner = CliRunner()
+    runner.invoke(main, arguments)
+    expected = mock_send_data_to_api.call_args.args[1]
+    for _ in range(2):
+        result = runner.invoke(main, arguments + ["--columnar-cache"])
+        assert result.exit_code == 0
+        assert mock_send_data_to_api.call_args.args[1] == expected
+    assert (tmp_path / "customers.csv.feather").exists()
+    assert (tmp_path / "purchases.csv.feather").exists()
+
+    rejected = runner.invoke(
+        main,
+        arguments + ["--columnar-cache", "--staging-db", str(tmp_path / "staging.db")],
+    )
+    assert rejected.exit_code == 2
+    assert "--columnar-cache cannot be combined with --staging-db" in rejected.output
+
+
+def test_cli_no_columnar_cache_overrides_config(mocker, monkeypatch, tmp_path):
+    """
+    Tests that --no-columnar-cache disables the cache enabled by COLUMNAR_CACHE.
+    """
+    monkeypatch.setattr("cli.Config.COLUMNAR_CACHE", True)
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1;Doe;Jane;75000;Paris;jane@example.com\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        "1;P1;1;9.99;EUR;2023-01-01\n"
+    )
+    mocker.patch("cli.send_data_to_api", return_value=(200, {"message": "success"}))
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "--customers-file",
+            str(customers_file),
+            "--purchases-file",
+            str(purchases_file),
+            "--no-columnar-cache",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert not (tmp_path / "customers.csv.feather").exists()
+    assert not (tmp_path / "purchases.csv.feather").exists()
+
+
+def test_cli_staging_db_env_default(mocker, monkeypatch, tmp_path):
+    """
+    Tests that STAGING_DB set in the environment is used by the modes that
+    support it and ignored by the others, instead of being rejected like
+    an explicit --staging-db.
+    """
+    db_path = tmp_path / "staging.db"
+    monkeypatch.setattr("cli.Config.STAGING_DB", str(db_path))
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1;Doe;Jane;75000;Paris;jane@example.com\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        "1;P1;1;9.99;EUR;2023-01-01\n"
+    )
+    mocker.patch("cli.send_data_to_api", return_value=(200, {"message": "success"}))
+    arguments = [
+        "--customers-file",
+        str(customers_file),
+        "--purchases-file",
+        str(purchases_file),
+    ]
+    runner = CliRunner()
+
+    for extra in (["--join-mode", "external"], ["--parser-engine", "pandas"]):
+        result = runner.invoke(main, arguments + extra)
+        assert result.exit_code == 0, result.output
+    assert not db_path.exists()
+
+    assert runner.invoke(main, arguments).exit_code == 0
+    assert db_path.exists()
+
+
+def test_cli_columnar_cache_env_default(mocker, monkeypatch, tmp_path):
+    """
+    Tests that COLUMNAR_CACHE set in the environment is silently ignored by the
+    modes that cannot use it, and that the staging store wins when STAGING_DB
+    is set too, as for the Flask routes.
+    """
+    monkeypatch.setattr("cli.Config.STAGING_DB", str(tmp_path / "staging.db"))
+    monkeypatch.setattr("cli.Config.COLUMNAR_CACHE", True)
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1;Doe;Jane;75000;Paris;jane@example.com\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        "1;P1;1;9.99;EUR;2023-01-01\n"
+    )
+    mocker.patch("cli.send_data_to_api", return_value=(200, {"message": "success"}))
+    arguments = [
+        "--customers-file",
+        str(customers_file),
+        "--purchases-file",
+        str(purchases_file),
+    ]
+    runner = CliRunner()
+
+    for extra in ([], ["--join-mode", "external"], ["--parser-engine", "pandas"]):
+        result = runner.invoke(main, arguments + extra)
+        assert result.exit_code == 0, result.output
+    assert not (tmp_path / "customers.csv.feather").exists()
+
+    result = runner.invoke(main, arguments + ["--parser-engine", "mmap"])
+    assert result.exit_code == 0
+    assert (tmp_path / "customers.csv.feather").exists()
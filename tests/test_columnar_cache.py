@@ -0,0 +1,112 @@
+import os
+import pytest
+from app.utils.columnar_cache import cache_path
+from app.utils.csv_parser import parse_customers, parse_purchases
+from app.utils.records import Customer, Purchase
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    """
+    Créer des fichiers CSV temporaires, avec une ligne invalide dans chaque fichier.
+    """
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1;Doe;Jane;75009;Paris;jane.doe@example.com\n"
+        "2;2;Smith;John;69001;Lyon;\n"
+        "3;2;Martin;Paul;69001;Lyon;paul.martin@example.com\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        '1;P1;2;19.99;"EUR";2023-01-02\n'
+        "3;P2;1;9.99;USD;2023-01-01\n"
+        "1;P3;;5;EUR;2023-01-03\n"
+        "1;P4;3;5;EUR;2023-01-01\n"
+    )
+    return str(customers_file), str(purchases_file)
+
+
+def test_cached_records_match_the_csv_parser(mocker, csv_files):
+    """
+    Tester qu'une seconde analyse est chargée depuis le cache colonnaire, sans relire
+    le CSV, et restitue les mêmes enregistrements.
+    """
+    customers_file, purchases_file = csv_files
+    customers = parse_customers(customers_file, cache=True)
+    purchases = parse_purchases(purchases_file, cache=True)
+    assert os.path.exists(cache_path(customers_file))
+    assert os.path.exists(cache_path(purchases_file))
+
+    mock_iter_customers = mocker.patch("app.utils.csv_parser.iter_customers")
+    mock_iter_purchases = mocker.patch("app.utils.csv_parser.iter_purchases")
+    cached_customers = parse_customers(customers_file, cache=True)
+    cached_purchases = parse_purchases(purchases_file, cache=True)
+
+    mock_iter_customers.assert_not_called()
+    mock_iter_purchases.assert_not_called()
+    assert cached_customers == customers
+    assert all(isinstance(customer, Customer) for customer in cached_customers)
+    assert cached_purchases == purchases
+    assert list(cached_purchases) == ["1", "3"]
+    purchase = cached_purchases["1"][0]
+    assert isinstance(purchase, Purchase)
+    assert type(purchase["quantity"]) is int
+    assert type(purchase["price"]) is float
+
+
+def test_stale_cache_is_parsed_again(csv_files):
+    """
+    Tester qu'un fichier modifié depuis l'écriture du cache est analysé à nouveau.
+    """
+    customers_file, _ = csv_files
+    parse_customers(customers_file, cache=True)
+
+    with open(customers_file, mode="a") as file:
+        file.write("4;1;Durand;Marie;13001;Marseille;marie@example.com\n")
+    stat = os.stat(customers_file)
+    os.utime(customers_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    customers = parse_customers(customers_file, cache=True)
+    assert [customer["customer_id"] for customer in customers] == ["1", "3", "4"]
+    assert parse_customers(customers_file, cache=True) == customers
+
+
+def test_unreadable_cache_is_ignored(csv_files):
+    """
+    Tester qu'un fichier de cache corrompu est ignoré puis remplacé.
+    """
+    _, purchases_file = csv_files
+    with open(cache_path(purchases_file), mode="wb") as file:
+        file.write(b"not a feather file")
+
+    purchases = parse_purchases(purchases_file, cache=True)
+    assert purchases == parse_purchases(purchases_file)
+    assert parse_purchases(purchases_file, cache=True) == purchases
+
+
+def test_cache_of_empty_files(tmp_path):
+    """
+    Tester le cache de fichiers ne contenant que l'en-tête.
+    """
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text("customer_id;product_id;quantity;price;currency;date\n")
+
+    for _ in range(2):
+        assert parse_customers(str(customers_file), cache=True) == []
+        assert parse_purchases(str(purchases_file), cache=True) == {}
+
+
+def test_cache_is_disabled_by_default(csv_files):
+    """
+    Tester qu'aucun fichier de cache n'est écrit sans l'option.
+    """
+    customers_file, _ = csv_files
+    parse_customers(customers_file)
+
+    assert not os.path.exists(cache_path(customers_file))
@@ -0,0 +1,57 @@
+import gzip
+import pytest
+import zstandard
+from app.utils.compression import (
+    compress,
+    detect_compression,
+    iter_compressed,
+    open_text,
+)
+
+
+def test_iter_compressed_gzip_is_incremental():
+    """
+    Tester que la compression gzip d'un flux produit plusieurs morceaux décodables.
+    """
+    chunks = (f'{{"key": {key}}},'.encode("utf-8") * 1000 for key in range(50))
+
+    compressed = list(iter_compressed(chunks, "gzip", level=1))
+
+    assert len(compressed) > 1
+    assert gzip.decompress(b"".join(compressed)).startswith(b'{"key": 0},')
+
+
+def test_compress_zstd_round_trip():
+    """
+    Tester qu'un corps compressé en zstd se décompresse à l'identique.
+    """
+    body = b'[{"customer_id": "1"}]' * 100
+
+    compressed = compress(body, "zstd")
+
+    assert len(compressed) < len(body)
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(compressed) == body
+
+
+def test_compress_unknown_codec():
+    """
+    Tester qu'un algorithme de compression inconnu est refusé.
+    """
+    with pytest.raises(ValueError, match="Unsupported compression"):
+        compress(b"", "brotli")
+
+
+def test_detect_compression(tmp_path):
+    """
+    Tester la détection de la compression par l'extension puis par les octets magiques.
+    """
+    plain = tmp_path / "customers.csv"
+    plain.write_text("customer_id\n")
+    disguised = tmp_path / "purchases.csv"
+    disguised.write_bytes(gzip.compress(b"customer_id\n"))
+
+    assert detect_compression(str(tmp_path / "customers.csv.zst")) == "zstd"
+    assert detect_compression(str(plain)) is None
+    assert detect_compression(str(disguised)) == "gzip"
+    with open_text(str(disguised)) as file:
+        assert file.read() == "customer_id\n"
@@ -1,5 +1,14 @@
+import gzip
 import pytest
-from app.utils.csv_parser import parse_customers, parse_purchases, validate_purchase_row
+import types
+import zstandard
+from app.utils.csv_parser import (
+    iter_customers,
+    iter_purchases,
+    parse_customers,
+    parse_purchases,
+    validate_purchase_row,
+)
 
 
 @pytest.fixture
@@ -95,6 +104,86 @@ def test_parse_purchases_invalid_row(mocker, tmp_path):
     )
 
 
+def test_iter_customers_is_lazy(mock_valid_customers_file):
+    """
+    Tester que "iter_customers" renvoie un générateur produisant les mêmes clients que "parse_customers".
+    """
+    customers = iter_customers(mock_valid_customers_file)
+    assert isinstance(customers, types.GeneratorType)
+
+    first = next(customers)
+    assert first["customer_id"] == "1"
+    assert first["title"] == "Female"
+    assert [first, *customers] == parse_customers(mock_valid_customers_file)
+
+
+def test_iter_purchases_yields_customer_id_pairs(mock_valid_purchases_file):
+    """
+    Tester que "iter_purchases" produit des paires (customer_id, achat) une à une.
+    """
+    purchases = iter_purchases(mock_valid_purchases_file)
+    assert isinstance(purchases, types.GeneratorType)
+
+    pairs = list(purchases)
+    assert [customer_id for customer_id, _ in pairs] == ["1", "2"]
+    assert pairs[0][1] == {
+        "product_id": "P1",
+        "quantity": 2,
+        "price": 19.99,
+        "currency": "EUR",
+        "purchased_at": "2023-01-01",
+    }
+
+
+def test_iter_customers_missing_file(tmp_path):
+    """
+    Tester que l'erreur de fichier manquant est levée dès la première lecture.
+    """
+    customers = iter_customers(str(tmp_path / "missing.csv"))
+    with pytest.raises(FileNotFoundError):
+        next(customers)
+
+
+def test_parse_compressed_files(mock_valid_customers_file, mock_valid_purchases_file):
+    """
+    Tester la lecture de fichiers compressés : gzip reconnu par l'extension,
+    zstd reconnu par ses octets magiques malgré une extension .csv.
+    """
+    with open(mock_valid_customers_file, mode="rb") as file:
+        customers_gz = mock_valid_customers_file + ".gz"
+        with gzip.open(customers_gz, mode="wb") as compressed:
+            compressed.write(file.read())
+    with open(mock_valid_purchases_file, mode="rb") as file:
+        data = zstandard.ZstdCompressor().compress(file.read())
+    purchases_zst = mock_valid_purchases_file.replace(".csv", "_zstd.csv")
+    with open(purchases_zst, mode="wb") as compressed:
+        compressed.write(data)
+
+    assert parse_customers(customers_gz) == parse_customers(mock_valid_customers_file)
+    assert parse_purchases(purchases_zst) == parse_purchases(mock_valid_purchases_file)
+
+
+@pytest.mark.parametrize("engine", ["csv", "mmap"])
+def test_parse_purchases_shares_low_cardinality_values(tmp_path, engine):
+    """
+    Tester que les devises et dates répétées partagent une seule chaîne.
+    """
+    file_path = tmp_path / "purchases.csv"
+    file_path.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        + "".join(f'{i % 3};P{i};1;9.99;"EUR";2023-01-01\n' for i in range(6))
+    )
+
+    purchases = [
+        purchase
+        for customer_purchases in parse_purchases(str(file_path), engine).values()
+        for purchase in customer_purchases
+    ]
+
+    assert len({id(purchase["currency"]) for purchase in purchases}) == 1
+    assert len({id(purchase["purchased_at"]) for purchase in purchases}) == 1
+
+
 def test_validate_purchase_row_valid():
     """
     Tester une ligne d'achat valide.
@@ -0,0 +1,70 @@
+from app.utils.delta_sync import DeltaState, iter_changed_customers
+from app.utils.records import Customer, Purchase
+
+CUSTOMERS = [
+    Customer("1", "Female", "Doe", "Jane", "75000", "Paris", "jane@example.com"),
+    Customer("2", "Male", "Smith", "John", "69000", "Lyon", "john@example.com"),
+]
+PURCHASES = {"1": [Purchase("P1", 2, 10.0, "EUR", "2023-01-01")]}
+
+
+def test_delta_state_sends_only_changed_customers(tmp_path):
+    """
+    Tester que seuls les clients nouveaux ou modifiés depuis le dernier enregistrement sont formatés.
+    """
+    path = str(tmp_path / "state.json")
+    state = DeltaState(path)
+    first = list(iter_changed_customers(CUSTOMERS, PURCHASES, state))
+    state.save()
+
+    assert [customer["email"] for customer in first] == [
+        "jane@example.com",
+        "john@example.com",
+    ]
+
+    purchases = {"1": PURCHASES["1"] + [Purchase("P2", 1, 5.0, "EUR", "2023-01-02")]}
+    state = DeltaState(path)
+    second = list(iter_changed_customers(CUSTOMERS, purchases, state))
+
+    assert [customer["email"] for customer in second] == ["jane@example.com"]
+    assert (state.changed, state.unchanged) == (1, 1)
+
+
+def test_delta_state_reports_deleted_customers(tmp_path):
+    """
+    Tester que les clients absents des fichiers depuis le dernier enregistrement sont signalés.
+    """
+    path = str(tmp_path / "state.json")
+    state = DeltaState(path)
+    list(iter_changed_customers(CUSTOMERS, PURCHASES, state))
+    state.save()
+
+    state = DeltaState(path)
+    assert list(iter_changed_customers(CUSTOMERS[:1], PURCHASES, state)) == []
+    assert state.deleted() == ["2"]
+
+
+def test_delta_state_is_only_updated_by_save(tmp_path):
+    """
+    Tester qu'une exécution non enregistrée (envoi échoué) renvoie le même delta.
+    """
+    path = str(tmp_path / "state.json")
+    state = DeltaState(path)
+    list(iter_changed_customers(CUSTOMERS, PURCHASES, state))
+
+    state = DeltaState(path)
+    assert len(list(iter_changed_customers(CUSTOMERS, PURCHASES, state))) == 2
+
+
+def test_delta_state_ignores_unreadable_file(mocker, tmp_path):
+    """
+    Tester qu'un fichier d'état corrompu est ignoré : tous les clients sont envoyés.
+    """
+    path = tmp_path / "state.json"
+    path.write_text('{"1": "ab')
+    mock_logger = mocker.patch("app.utils.delta_sync.logger.warning")
+
+    state = DeltaState(str(path))
+
+    assert state.previous == {}
+    mock_logger.assert_called_once()
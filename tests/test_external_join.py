@@ -0,0 +1,109 @@
+import pytest
+from app.utils import external_join
+from app.utils.external_join import external_sort, iter_external_join, merge_join
+from app.utils.json_formatter import format_customers_for_api
+
+
+def _customer(customer_id):
+    return {
+        "customer_id": customer_id,
+        "title": "Female",
+        "last_name": "Doe",
+        "first_name": "Jane",
+        "email": f"jane{customer_id}@example.com",
+    }
+
+
+def test_external_sort_in_memory(tmp_path):
+    """
+    Tester le tri sans débordement sur disque lorsque les données tiennent dans le budget.
+    """
+    items = [["b", 1], ["a", 2], ["c", 3]]
+
+    result = list(external_sort(items, lambda item: item[0], tmp_dir=str(tmp_path)))
+
+    assert result == [["a", 2], ["b", 1], ["c", 3]]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_external_sort_spills_runs_and_is_stable(mocker, tmp_path):
+    """
+    Tester le tri externe avec plusieurs runs : l'ordre d'entrée est conservé à clé égale.
+    """
+    mock_write_run = mocker.spy(external_join, "_write_run")
+    items = [[str(i % 5), i] for i in range(40)]
+
+    result = list(
+        external_sort(
+            items, lambda item: item[0], memory_budget=50, tmp_dir=str(tmp_path)
+        )
+    )
+
+    assert mock_write_run.call_count > 1
+    assert result == sorted(items, key=lambda item: item[0])
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_external_sort_multi_pass_merge(mocker, tmp_path):
+    """
+    Tester la fusion en plusieurs passes lorsque le nombre de runs dépasse la limite.
+    """
+    mocker.patch.object(external_join, "MAX_MERGE_FAN_IN", 2)
+    items = [[f"{i % 7:02d}", i] for i in range(30)]
+
+    result = list(
+        external_sort(
+            items, lambda item: item[0], memory_budget=1, tmp_dir=str(tmp_path)
+        )
+    )
+
+    assert result == sorted(items, key=lambda item: item[0])
+
+
+def test_merge_join_drops_orphans_and_shares_duplicates():
+    """
+    Tester la jointure par fusion : achats orphelins ignorés, clients dupliqués servis.
+    """
+    customers = [_customer("1"), _customer("1"), _customer("3")]
+    purchases = [
+        ("0", {"product_id": "P0"}),
+        ("1", {"product_id": "P1"}),
+        ("2", {"product_id": "P2"}),
+    ]
+
+    result = [
+        (customer["customer_id"], items)
+        for customer, items in merge_join(customers, purchases)
+    ]
+
+    assert result == [
+        ("1", [{"product_id": "P1"}]),
+        ("1", [{"product_id": "P1"}]),
+        ("3", []),
+    ]
+
+
+def test_iter_external_join_matches_in_memory_join(tmp_path):
+    """
+    Tester que la jointure externe produit le même résultat que la jointure en mémoire.
+    """
+    customers = [_customer(customer_id) for customer_id in ("3", "1", "2")]
+    pairs = [
+        ("2", {"product_id": "P1", "quantity": 1, "price": 9.99}),
+        ("1", {"product_id": "P2", "quantity": 2, "price": 19.99}),
+        ("2", {"product_id": "P3", "quantity": 3, "price": 1.5}),
+    ]
+    purchases = {}
+    for customer_id, purchase in pairs:
+        purchases.setdefault(customer_id, []).append(purchase)
+
+    result = list(
+        iter_external_join(
+            iter(customers), iter(pairs), memory_budget=64, tmp_dir=str(tmp_path)
+        )
+    )
+
+    expected = format_customers_for_api(
+        sorted(customers, key=lambda customer: customer["customer_id"]), purchases
+    )
+    assert result == expected
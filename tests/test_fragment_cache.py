@@ -0,0 +1,118 @@
+import pytest
+from app.utils.api_client import iter_batches
+from app.utils.fragment_cache import (
+    FragmentCache,
+    fragment_key,
+    iter_cached_customers,
+)
+from app.utils.json_formatter import format_customer, iter_json_array
+from app.utils.records import Customer, Purchase
+from app.utils.serializer import Fragment, dumps
+
+CUSTOMERS = [
+    Customer("1", "Female", "Doe", "Jane", "75000", "Paris", "jane@example.com"),
+    Customer("2", "Male", "Smith", "John", "69000", "Lyon", "john@example.com"),
+]
+
+
+@pytest.fixture
+def purchases():
+    return {
+        "1": [Purchase("P1", 2, 10.0, "EUR", "2023-01-01")],
+        "2": [
+            {
+                "product_id": "P2",
+                "quantity": 1,
+                "price": 5.5,
+                "currency": "USD",
+                "purchased_at": "2023-01-02",
+            }
+        ],
+    }
+
+
+def test_fragment_cache_reuses_unchanged_customers(tmp_path, purchases):
+    """
+    Tester qu'un client inchangé est réutilisé au lancement suivant et qu'un client modifié est réencodé.
+    """
+    path = str(tmp_path / "fragments")
+    cache = FragmentCache(path)
+    fragments = list(iter_cached_customers(CUSTOMERS, purchases, cache))
+    cache.save()
+
+    assert fragments == [
+        dumps(format_customer(customer, purchases[customer["customer_id"]]))
+        for customer in CUSTOMERS
+    ]
+    assert all(isinstance(fragment, Fragment) for fragment in fragments)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    purchases["2"] = [Purchase("P3", 1, 5.5, "USD", "2023-01-02")]
+    cache = FragmentCache(path)
+    fragments = list(iter_cached_customers(CUSTOMERS, purchases, cache))
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert fragments[1] == dumps(format_customer(CUSTOMERS[1], purchases["2"]))
+
+
+def test_fragment_cache_save_drops_unused_fragments(tmp_path, purchases):
+    """
+    Tester que l'enregistrement ne conserve que les fragments utilisés par le dernier lancement.
+    """
+    path = str(tmp_path / "fragments")
+    cache = FragmentCache(path)
+    list(iter_cached_customers(CUSTOMERS, purchases, cache))
+    cache.save()
+
+    cache = FragmentCache(path)
+    list(iter_cached_customers(CUSTOMERS[:1], purchases, cache))
+    cache.save()
+
+    assert len(FragmentCache(path).fragments) == 1
+
+
+def test_fragment_cache_ignores_unreadable_file(mocker, tmp_path):
+    """
+    Tester qu'un fichier de cache corrompu est ignoré avec un avertissement.
+    """
+    path = tmp_path / "fragments"
+    path.write_bytes(b"not a pickle")
+    mock_logger = mocker.patch("app.utils.fragment_cache.logger.warning")
+
+    assert FragmentCache(str(path)).fragments == {}
+    mock_logger.assert_called_once()
+
+
+def test_fragments_are_spliced_in_payloads(purchases):
+    """
+    Tester que les fragments sont insérés tels quels dans les tableaux JSON et les lots.
+    """
+    formatted = [
+        format_customer(customer, purchases[customer["customer_id"]])
+        for customer in CUSTOMERS
+    ]
+    fragments = list(iter_cached_customers(CUSTOMERS, purchases, FragmentCache()))
+
+    assert b"".join(iter_json_array(fragments)) == b"".join(iter_json_array(formatted))
+    assert list(iter_batches(fragments, batch_size=1)) == list(
+        iter_batches(formatted, batch_size=1)
+    )
+
+
+def test_fragment_key_ignores_shared_strings():
+    """
+    Tester que la clé ne dépend que des valeurs, et non des chaînes partagées
+    (comme celles dédupliquées par le moteur pandas).
+    """
+    product_id = "P1"
+    shared = [
+        Purchase(product_id, 1, 9.99, "EUR", "2023-01-01"),
+        Purchase(product_id, 2, 9.99, "EUR", "2023-01-02"),
+    ]
+    distinct = [
+        Purchase("".join(["P", "1"]), 1, 9.99, "EUR", "2023-01-01"),
+        Purchase("".join(["P", "1"]), 2, 9.99, "EUR", "2023-01-02"),
+    ]
+
+    assert fragment_key(CUSTOMERS[0], shared) == fragment_key(CUSTOMERS[0], distinct)
+    assert fragment_key(CUSTOMERS[0], shared) != fragment_key(CUSTOMERS[1], shared)
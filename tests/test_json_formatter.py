@@ -1,5 +1,14 @@
+import json
+import types
 import pytest
-from app.utils.json_formatter import format_customers_for_api
+from app.utils.json_formatter import (
+    format_customers_for_api,
+    iter_formatted_customers,
+    iter_json_array,
+    iter_ndjson,
+    read_ndjson,
+    write_ndjson,
+)
 from app.utils.logger import logger
 
 
@@ -133,3 +142,87 @@ def test_format_customers_for_api_invalid_purchase_key():
     assert len(result) == 1
     assert result[0]["salutation"] == "Female"
     assert result[0]["purchases"] == []
+
+
+def test_iter_formatted_customers_consumes_generator():
+    """
+    Tester que "iter_formatted_customers" consomme un générateur de clients au fil de l'eau.
+    """
+    consumed = []
+
+    def customers():
+        for customer_id in ("1", "2"):
+            consumed.append(customer_id)
+            yield {
+                "customer_id": customer_id,
+                "title": "Female",
+                "last_name": "Doe",
+                "first_name": "Jane",
+                "email": f"jane{customer_id}@example.com",
+            }
+
+    result = iter_formatted_customers(customers(), {"2": [{"product_id": "P2"}]})
+    assert isinstance(result, types.GeneratorType)
+    assert consumed == []
+
+    first = next(result)
+    assert consumed == ["1"]
+    assert first["purchases"] == []
+    assert next(result)["purchases"] == [{"product_id": "P2"}]
+
+
+def test_iter_json_array_produces_valid_json():
+    """
+    Tester que "iter_json_array" produit un tableau JSON valide découpé en morceaux.
+    """
+    records = [{"email": f"user{i}@example.com", "purchases": []} for i in range(50)]
+
+    chunks = list(iter_json_array(iter(records), chunk_size=128))
+
+    assert len(chunks) > 1
+    assert json.loads(b"".join(chunks)) == records
+
+
+def test_iter_json_array_empty():
+    """
+    Tester l'encodage d'un flux vide.
+    """
+    assert b"".join(iter_json_array(iter([]))) == b"[]"
+
+
+def test_iter_ndjson_one_record_per_line():
+    """
+    Tester que "iter_ndjson" produit un enregistrement JSON par ligne.
+    """
+    records = [{"email": f"user{i}@example.com"} for i in range(20)]
+
+    chunks = list(iter_ndjson(iter(records), chunk_size=64))
+
+    assert len(chunks) > 1
+    lines = b"".join(chunks).splitlines()
+    assert [json.loads(line) for line in lines] == records
+    assert list(iter_ndjson(iter([]))) == []
+
+
+def test_write_and_read_ndjson(tmp_path):
+    """
+    Tester qu'un fichier NDJSON écrit par write_ndjson est relu à l'identique.
+    """
+    file_path = tmp_path / "customers.ndjson"
+    records = [{"customer_id": "1", "purchases": []}, {"customer_id": "2"}]
+
+    assert write_ndjson(iter(records), str(file_path)) == 2
+    file_path.write_text(file_path.read_text() + "\n")
+
+    assert list(read_ndjson(str(file_path))) == records
+
+
+def test_read_ndjson_invalid_line(tmp_path):
+    """
+    Tester qu'une ligne invalide est signalée avec son numéro.
+    """
+    file_path = tmp_path / "customers.ndjson"
+    file_path.write_text('{"customer_id": "1"}\n{"customer_id":\n')
+
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_ndjson(str(file_path)))
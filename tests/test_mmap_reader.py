@@ -0,0 +1,92 @@
+import gzip
+import pytest
+from app.utils.csv_parser import parse_customers, parse_purchases
+from app.utils.mmap_reader import iter_mmap_rows
+
+
+@pytest.fixture
+def purchases_file(tmp_path):
+    """
+    Créer un fichier d'achats avec des champs entre guillemets, des fins de ligne CRLF,
+    des lignes vides et des lignes invalides.
+    """
+    file_path = tmp_path / "purchases.csv"
+    file_path.write_bytes(
+        b"customer_id;product_id;quantity;price;currency;date\r\n"
+        b'1;P1;2;19.99;"EUR";2023-01-01\r\n'
+        b"\r\n"
+        b'2;"P;2";1;9.99;"US""D";2023-01-02\n'
+        b'1;"P\n3";3;1.5;EUR;2023-01-03\n'
+        b"2;P4;;5;EUR;2023-01-04\n"
+        b"2;P5;1\n"
+        b"3;P6;4;2.5;EUR;2023-01-05"
+    )
+    return str(file_path)
+
+
+def test_iter_mmap_rows_splits_raw_fields(purchases_file):
+    """
+    Tester le découpage des lignes en champs bruts, guillemets compris.
+    """
+    header, rows = iter_mmap_rows(purchases_file)
+    rows = list(rows)
+
+    assert header[0] == "customer_id"
+    assert rows[0] == [b"1", b"P1", b"2", b"19.99", b"EUR", b"2023-01-01"]
+    assert rows[1][1:5] == [b"P;2", b"1", b"9.99", b'US"D']
+    assert rows[2][1] == b"P\n3"
+    assert len(rows) == 6
+
+
+def test_mmap_engine_matches_csv_engine(mocker, purchases_file):
+    """
+    Tester que le moteur mmap produit les mêmes achats que le moteur csv
+    et signale les mêmes lignes invalides.
+    """
+    mock_warning = mocker.patch("app.utils.mmap_reader.logger.warning")
+
+    purchases = parse_purchases(purchases_file, engine="mmap")
+    warnings = [call.args[0] for call in mock_warning.call_args_list]
+
+    mock_warning.reset_mock()
+    assert purchases == parse_purchases(purchases_file)
+    assert warnings == [call.args[0] for call in mock_warning.call_args_list]
+    assert len(warnings) == 2
+
+
+def test_mmap_engine_customers_and_compressed_fallback(tmp_path):
+    """
+    Tester le moteur mmap sur les clients, y compris un fichier compressé lu en flux.
+    """
+    content = (
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1; Doe ;Jane;75000;Paris;jane@example.com \n"
+        "2;2;Smith;John;69000;Lyon;\n"
+        "3;2;Martin\n"
+    )
+    file_path = tmp_path / "customers.csv"
+    file_path.write_text(content)
+    compressed_file = tmp_path / "customers.csv.gz"
+    compressed_file.write_bytes(gzip.compress(content.encode("utf-8")))
+
+    customers = parse_customers(str(file_path), engine="mmap")
+
+    assert customers == parse_customers(str(file_path))
+    assert customers[0]["last_name"] == "Doe"
+    assert parse_customers(str(compressed_file), engine="mmap") == customers
+
+
+def test_mmap_engine_without_title_column(tmp_path):
+    """
+    Tester qu'un fichier clients sans colonne title est lu comme par le moteur csv.
+    """
+    file_path = tmp_path / "customers.csv"
+    file_path.write_text(
+        "customer_id;lastname;firstname;postal_code;city;email\n"
+        "1;Doe;Jane;75000;Paris;jane@example.com\n"
+    )
+
+    customers = parse_customers(str(file_path), engine="mmap")
+
+    assert customers == parse_customers(str(file_path))
+    assert customers[0]["title"] == "Male"
@@ -0,0 +1,144 @@
+import gzip
+import pytest
+import json
+from app.utils.csv_parser import parse_customers, parse_purchases
+from app.utils.json_formatter import format_customers_for_api
+from app.utils.pandas_parser import (
+    customers_frame,
+    format_customers_columnar,
+    purchases_frame,
+)
+from app.utils.records import json_default
+
+
+@pytest.fixture
+def customers_file(tmp_path):
+    """
+    Créer un fichier clients avec des espaces superflus et une ligne invalide.
+    """
+    file_path = tmp_path / "customers.csv"
+    file_path.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1; Doe ;Jane;75000; Paris;jane.doe@example.com \n"
+        "2;2;Smith;John;69000;Lyon;\n"
+        "3;2;Martin; Paul ;;Nice;paul@example.com\n"
+    )
+    return str(file_path)
+
+
+@pytest.fixture
+def purchases_file(tmp_path):
+    """
+    Créer un fichier achats avec une devise entre guillemets et une ligne incomplète.
+    """
+    file_path = tmp_path / "purchases.csv"
+    file_path.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        '1;P1;2;19.99;"EUR";2023-01-01\n'
+        "3;P2;1;9.99;USD;2023-01-02\n"
+        "1;P3;;5;EUR;2023-01-03\n"
+        "1;P4;3;1.5;EUR;2023-01-04\n"
+    )
+    return str(file_path)
+
+
+def test_pandas_engine_matches_csv_engine(mocker, customers_file, purchases_file):
+    """
+    Tester que le moteur pandas produit les mêmes enregistrements que le moteur csv
+    et signale les mêmes lignes invalides.
+    """
+    mock_warning = mocker.patch("app.utils.pandas_parser.logger.warning")
+
+    customers = parse_customers(customers_file, engine="pandas")
+    purchases = parse_purchases(purchases_file, engine="pandas")
+    assert mock_warning.call_count == 2
+
+    assert customers == parse_customers(customers_file)
+    assert purchases == parse_purchases(purchases_file)
+    assert [customer["customer_id"] for customer in customers] == ["1", "3"]
+    assert purchases["1"][0]["currency"] == "EUR"
+    assert type(purchases["1"][0]["quantity"]) is int
+
+
+def test_pandas_engine_reads_compressed_files(tmp_path, customers_file):
+    """
+    Tester que le moteur pandas lit aussi les fichiers compressés.
+    """
+    compressed_file = tmp_path / "customers.csv.gz"
+    with open(customers_file, mode="rb") as file:
+        compressed_file.write_bytes(gzip.compress(file.read()))
+
+    assert parse_customers(str(compressed_file), engine="pandas") == parse_customers(
+        customers_file
+    )
+
+
+def test_pandas_engine_ignores_extra_fields(tmp_path):
+    """
+    Tester que les champs au-delà de l'en-tête sont ignorés, comme avec le moteur csv.
+    """
+    file_path = tmp_path / "purchases.csv"
+    file_path.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        "1;P1;2;19.99;EUR;2023-01-01;\n"
+        "1;P2;1;9.99;EUR;2023-01-02\n"
+        "2;P3;1;5;USD;2023-01-03;extra;fields\n"
+    )
+
+    purchases = parse_purchases(str(file_path), engine="pandas")
+    assert purchases == parse_purchases(str(file_path))
+    assert [purchase["product_id"] for purchase in purchases["1"]] == ["P1", "P2"]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "title;lastname;firstname;postal_code;city;email\n1;Doe;Jane;75000;Paris;j@e.com\n",
+        "product_id;quantity;price;currency;date\nP1;1;9.99;EUR;2023-01-01\n",
+    ],
+    ids=["empty", "customers-without-customer_id", "purchases-without-customer_id"],
+)
+def test_pandas_engine_missing_header_or_columns(mocker, tmp_path, content):
+    """
+    Tester qu'un fichier vide ou sans colonne customer_id donne, comme avec le
+    moteur csv, aucun enregistrement au lieu d'une erreur.
+    """
+    mocker.patch("app.utils.pandas_parser.logger.warning")
+    file_path = tmp_path / "data.csv"
+    file_path.write_text(content)
+
+    for engine in ("csv", "mmap", "pandas"):
+        assert parse_customers(str(file_path), engine=engine) == []
+        assert parse_purchases(str(file_path), engine=engine) == {}
+
+
+def test_pandas_engine_invalid_number(tmp_path):
+    """
+    Tester qu'une quantité non numérique fait échouer l'analyse, comme avec le moteur csv.
+    """
+    file_path = tmp_path / "purchases.csv"
+    file_path.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        "1;P1;two;19.99;EUR;2023-01-01\n"
+    )
+
+    with pytest.raises(ValueError):
+        parse_purchases(str(file_path), engine="pandas")
+
+
+def test_columnar_join_matches_format_customers_for_api(customers_file, purchases_file):
+    """
+    Tester que la jointure groupée produit exactement le JSON de format_customers_for_api,
+    y compris pour un client sans achat et dans l'ordre du fichier.
+    """
+    expected = format_customers_for_api(
+        parse_customers(customers_file), parse_purchases(purchases_file)
+    )
+
+    formatted = format_customers_columnar(
+        customers_frame(customers_file), purchases_frame(purchases_file)
+    )
+
+    assert json.dumps(formatted) == json.dumps(expected, default=json_default)
+    assert [len(customer["purchases"]) for customer in formatted] == [2, 1]
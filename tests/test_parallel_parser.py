@@ -0,0 +1,69 @@
+import gzip
+import pytest
+from app.utils import parallel_parser
+from app.utils.csv_parser import parse_purchases
+from app.utils.parallel_parser import parse_purchases_parallel, split_byte_ranges
+
+HEADER = "customer_id;product_id;quantity;price;currency;date\n"
+
+
+@pytest.fixture
+def purchases_file(tmp_path):
+    """
+    Créer un fichier d'achats dont certains champs entre guillemets contiennent des retours à la ligne.
+    """
+    file_path = tmp_path / "purchases.csv"
+    rows = []
+    for index in range(2000):
+        currency = '"EU\nR"' if index % 7 == 0 else '"EUR"'
+        rows.append(
+            f"{index % 37};P{index};{index % 5 + 1};{index}.5;{currency};2023-01-01\n"
+        )
+    rows.insert(500, "1;P;;;EUR;2023-01-01\n")
+    file_path.write_text(HEADER + "".join(rows))
+    return str(file_path)
+
+
+def test_split_byte_ranges_respects_quoted_newlines(purchases_file):
+    """
+    Tester que les plages couvrent tout le fichier et ne coupent jamais un champ entre guillemets.
+    """
+    ranges = split_byte_ranges(purchases_file, 8, start=len(HEADER))
+
+    assert len(ranges) == 8
+    assert ranges[0][0] == len(HEADER)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    with open(purchases_file, mode="rb") as file:
+        data = file.read()
+    assert ranges[-1][1] == len(data)
+    for start, _ in ranges[1:]:
+        assert data[start - 1 : start] == b"\n"
+        assert data[len(HEADER) : start].count(b'"') % 2 == 0
+
+
+def test_parse_purchases_parallel_matches_sequential(monkeypatch, purchases_file):
+    """
+    Tester que l'analyse en plusieurs processus donne le même résultat, dans le même ordre.
+    """
+    monkeypatch.setattr(parallel_parser, "MIN_SHARD_BYTES", 1024)
+
+    purchases = parse_purchases_parallel(purchases_file, workers=4)
+
+    expected = parse_purchases(purchases_file)
+    assert purchases == expected
+    assert list(purchases) == list(expected)
+
+
+def test_parse_purchases_parallel_compressed_file(mocker, tmp_path, purchases_file):
+    """
+    Tester qu'un fichier compressé est analysé séquentiellement.
+    """
+    compressed_file = tmp_path / "purchases.csv.gz"
+    with open(purchases_file, mode="rb") as file:
+        compressed_file.write_bytes(gzip.compress(file.read()))
+    spy = mocker.spy(parallel_parser, "split_byte_ranges")
+
+    purchases = parse_purchases_parallel(str(compressed_file), workers=4)
+
+    assert purchases == parse_purchases(purchases_file)
+    spy.assert_not_called()
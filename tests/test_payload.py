@@ -0,0 +1,53 @@
+import gzip
+import json
+import pytest
+from app.utils.payload import PayloadEncoder, encode_batch
+
+
+def test_json_payload_encoder():
+    """
+    Tester que le format JSON produit un tableau JSON avec l'en-tête adéquat.
+    """
+    encoder = PayloadEncoder()
+
+    assert encoder.headers == {"Content-Type": "application/json"}
+    assert encoder.encode_batch([b'{"a":1}', b'{"a":2}']) == b'[{"a":1},{"a":2}]'
+    assert b"".join(encoder.stream([{"a": 1}, {"a": 2}])) == b'[{"a":1},{"a":2}]'
+
+
+def test_ndjson_payload_encoder():
+    """
+    Tester que le format NDJSON produit une ligne par enregistrement, plus courte que le tableau JSON.
+    """
+    encoder = PayloadEncoder("ndjson")
+    batch = [b'{"a":1}', b'{"a":2}']
+
+    assert encoder.headers == {"Content-Type": "application/x-ndjson"}
+    assert encoder.encode_batch(batch) == b'{"a":1}\n{"a":2}\n'
+    assert len(encoder.encode_batch(batch)) == len(encode_batch(batch)) - 1
+    assert b"".join(encoder.stream([{"a": 1}, {"a": 2}])) == b'{"a":1}\n{"a":2}\n'
+
+
+def test_unknown_payload_format():
+    """
+    Tester qu'un format inconnu est refusé.
+    """
+    with pytest.raises(ValueError, match="Unsupported payload format"):
+        PayloadEncoder("xml")
+
+
+def test_compressed_payload_encoder():
+    """
+    Tester que les corps compressés portent l'en-tête Content-Encoding et restent décodables.
+    """
+    encoder = PayloadEncoder("ndjson", compression="gzip")
+
+    assert encoder.headers == {
+        "Content-Type": "application/x-ndjson",
+        "Content-Encoding": "gzip",
+    }
+    assert gzip.decompress(encoder.encode_batch([b'{"a":1}'])) == b'{"a":1}\n'
+    assert gzip.decompress(b"".join(encoder.stream([{"a": 1}]))) == b'{"a":1}\n'
+    assert json.loads(
+        gzip.decompress(PayloadEncoder(compression="gzip").encode({"a": 1}))
+    ) == {"a": 1}
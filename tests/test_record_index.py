@@ -0,0 +1,87 @@
+import pytest
+from app.utils.record_index import RecordIndex
+
+
+@pytest.fixture
+def index():
+    """
+    Créer un index d'achats de test.
+    """
+    rows = [
+        {"customer_id": "1", "currency": "EUR", "purchased_at": "2023-03-01"},
+        {"customer_id": "2", "currency": "USD", "purchased_at": "2023-01-01"},
+        {"customer_id": "1", "currency": "USD", "purchased_at": "2023-02-01"},
+        {"customer_id": "3", "currency": "EUR", "purchased_at": "2023-01-15"},
+        {"customer_id": "1", "currency": "EUR", "purchased_at": "2023-01-10"},
+    ]
+    return RecordIndex(rows, ("customer_id", "currency"), range_field="purchased_at")
+
+
+def test_query_without_filters_paginates(index):
+    """
+    Tester la pagination sans filtre, dans l'ordre d'origine.
+    """
+    page, total = index.query(offset=1, limit=2)
+
+    assert total == 5
+    assert page == index.records[1:3]
+
+
+def test_query_single_filter(index):
+    """
+    Tester un filtre d'égalité servi directement par l'index inversé.
+    """
+    page, total = index.query({"customer_id": "1"}, limit=2)
+
+    assert total == 3
+    assert [row["purchased_at"] for row in page] == ["2023-03-01", "2023-02-01"]
+
+
+def test_query_date_range_is_ordered_by_date(index):
+    """
+    Tester un filtre par plage de dates (bornes incluses), trié par date.
+    """
+    page, total = index.query(lower="2023-01-10", upper="2023-02-01")
+
+    assert total == 3
+    assert [row["purchased_at"] for row in page] == [
+        "2023-01-10",
+        "2023-01-15",
+        "2023-02-01",
+    ]
+
+
+def test_query_combined_filters(index):
+    """
+    Tester la combinaison de filtres d'égalité et de plage de dates.
+    """
+    page, total = index.query(
+        {"customer_id": "1", "currency": "EUR"}, lower="2023-01-01"
+    )
+
+    assert total == 2
+    assert [row["purchased_at"] for row in page] == ["2023-01-10", "2023-03-01"]
+
+    page, total = index.query({"currency": "EUR"}, upper="2023-01-12")
+    assert [row["customer_id"] for row in page] == ["1"]
+
+
+def test_query_unknown_value_and_field(index):
+    """
+    Tester une valeur absente et un champ non indexé.
+    """
+    assert index.query({"customer_id": "42"}) == ([], 0)
+    with pytest.raises(ValueError, match="Cannot filter on city"):
+        index.query({"city": "Paris"})
+    with pytest.raises(ValueError):
+        RecordIndex([], ("city",)).query(lower="2023-01-01")
+
+
+def test_query_reversed_range_is_empty():
+    """
+    Tester qu'une plage inversée ne renvoie aucun enregistrement.
+    """
+    records = [{"date": f"2020-01-0{day}"} for day in range(1, 8)]
+    index = RecordIndex(records, range_field="date")
+
+    assert index.query({}, "2020-01-06", "2020-01-02", 0, 100) == ([], 0)
@@ -0,0 +1,66 @@
+import json
+import pickle
+import sys
+import pytest
+from app.utils.records import Customer, Purchase, StringPool, json_default
+
+
+def test_record_behaves_like_a_read_only_dict():
+    """
+    Tester qu'un enregistrement s'utilise comme un dictionnaire en lecture seule.
+    """
+    purchase = Purchase("P1", 2, 19.99, "EUR", "2023-01-01")
+    expected = {
+        "product_id": "P1",
+        "quantity": 2,
+        "price": 19.99,
+        "currency": "EUR",
+        "purchased_at": "2023-01-01",
+    }
+
+    assert purchase == expected
+    assert expected == purchase
+    assert purchase["quantity"] == 2
+    assert purchase.get("missing") is None
+    assert list(purchase) == list(expected)
+    assert {"customer_id": "1", **purchase} == {"customer_id": "1", **expected}
+    assert repr(purchase) == repr(expected)
+    assert purchase.astuple() == tuple(expected.values())
+    with pytest.raises(KeyError):
+        purchase["__class__"]
+    with pytest.raises(AttributeError):
+        purchase.discount = 0.1
+
+
+def test_record_serialization():
+    """
+    Tester la sérialisation JSON et pickle des enregistrements.
+    """
+    customer = Customer("1", "Female", "Doe", "Jane", "75000", "Paris", "j@d.com")
+
+    assert json.loads(json.dumps([customer], default=json_default)) == [customer]
+    assert pickle.loads(pickle.dumps(customer)) == customer
+    with pytest.raises(TypeError):
+        json.dumps(object(), default=json_default)
+
+
+def test_record_is_smaller_than_a_dict():
+    """
+    Tester qu'un enregistrement occupe moins de mémoire que le dictionnaire équivalent.
+    """
+    purchase = Purchase("P1", 2, 19.99, "EUR", "2023-01-01")
+
+    assert sys.getsizeof(purchase) < sys.getsizeof(purchase.to_dict()) / 2
+    assert not hasattr(purchase, "__dict__")
+
+
+def test_string_pool_shares_equal_values():
+    """
+    Tester que le pool renvoie toujours la première instance d'une valeur.
+    """
+    pool = StringPool()
+    first = pool("".join(["E", "UR"]))
+
+    assert pool("".join(["EU", "R"])) is first
+    assert pool("USD") == "USD"
+    assert len(pool) == 2
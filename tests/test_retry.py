@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+from app.utils.retry import RetryPolicy, parse_retry_after
+
+
+def test_should_retry_statuses_and_attempts():
+    """
+    Tester que seules les erreurs transitoires sont réessayées, dans la limite des tentatives.
+    """
+    policy = RetryPolicy(max_attempts=3)
+
+    assert policy.should_retry(1, 503)
+    assert policy.should_retry(2, 429)
+    assert not policy.should_retry(3, 503)
+    assert not policy.should_retry(1, 400)
+    assert not policy.should_retry(1, 200)
+
+
+def test_get_delay_exponential_backoff_with_jitter(mocker):
+    """
+    Tester que le délai est tiré entre 0 et un plafond exponentiel borné par max_backoff.
+    """
+    mock_uniform = mocker.patch("app.utils.retry.random.uniform", return_value=0.3)
+    policy = RetryPolicy(max_attempts=10, backoff_factor=0.5, max_backoff=3)
+
+    assert policy.get_delay(1) == 0.3
+    assert [call.args for call in mock_uniform.call_args_list] == [(0, 0.5)]
+    policy.get_delay(3)
+    policy.get_delay(8)
+    assert [call.args[1] for call in mock_uniform.call_args_list] == [0.5, 2, 3]
+
+
+def test_get_delay_honours_retry_after():
+    """
+    Tester que l'en-tête Retry-After l'emporte sur le backoff calculé.
+    """
+    policy = RetryPolicy(max_attempts=3, max_backoff=1)
+
+    assert policy.get_delay(1, "7") == 7.0
+
+
+def test_get_delay_caps_retry_after(mocker):
+    """
+    Tester que Retry-After est plafonné, et que les valeurs non finies sont
+    remplacées par le backoff calculé.
+    """
+    mocker.patch("app.utils.retry.random.uniform", return_value=0.25)
+    policy = RetryPolicy(max_attempts=3, max_backoff=1, max_retry_after=60)
+
+    assert policy.get_delay(1, "86400") == 60
+    assert policy.get_delay(1, "nan") == 0.25
+    assert policy.get_delay(1, "inf") == 0.25
+
+
+def test_parse_retry_after_formats():
+    """
+    Tester l'analyse de Retry-After en secondes et en date HTTP.
+    """
+    in_ten_seconds = datetime.now(timezone.utc) + timedelta(seconds=10)
+
+    assert parse_retry_after("3") == 3.0
+    assert 8 < parse_retry_after(format_datetime(in_ten_seconds, usegmt=True)) <= 10
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("nan") is None
+    assert parse_retry_after("-inf") is None
+    assert parse_retry_after(None) is None
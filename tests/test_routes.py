@@ -0,0 +1,271 @@
+import json
+import pytest
+from app import create_app
+from app import routes
+from app.utils.cache import file_cache
+
+
+@pytest.fixture
+def client():
+    """
+    Créer un client de test Flask.
+    """
+    file_cache.clear()
+    app = create_app()
+    app.config["TESTING"] = True
+    yield app.test_client()
+    file_cache.clear()
+
+
+@pytest.fixture
+def csv_files(monkeypatch, tmp_path):
+    """
+    Créer des fichiers CSV temporaires utilisés par les routes.
+    """
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1;Doe;Jane;75009;Paris;jane.doe@example.com\n"
+        "2;2;Smith;John;69001;Lyon;john.smith@example.com\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        '1;P1;2;19.99;"EUR";2023-01-01\n'
+        '2;P2;1;9.99;"USD";2023-01-02\n'
+    )
+    monkeypatch.setattr(routes, "CUSTOMERS_FILE", str(customers_file))
+    monkeypatch.setattr(routes, "PURCHASES_FILE", str(purchases_file))
+    return customers_file, purchases_file
+
+
+def test_send_data_forwards_batch_parameters(mocker, client):
+    """
+    Tester que la route /api/send transmet les paramètres de découpage en lots.
+    """
+    mock_send_data_to_api = mocker.patch.object(
+        routes, "send_data_to_api", return_value=(200, {"sent": 1, "failed": 0})
+    )
+
+    response = client.post("/api/send?batch_size=10&max_batch_bytes=2048&concurrency=4")
+
+    assert response.status_code == 200
+    assert response.get_json() == {"status": 200, "response": {"sent": 1, "failed": 0}}
+    assert mock_send_data_to_api.call_args.kwargs == {
+        "batch_size": 10,
+        "max_batch_bytes": 2048,
+        "concurrency": 4,
+    }
+
+
+def test_send_data_limits_concurrency(mocker, monkeypatch, client):
+    """
+    Tester que la route /api/send plafonne `concurrency`, refuse les valeurs
+    inférieures à 1 et agrandit le pool de connexions en conséquence.
+    """
+    monkeypatch.setattr(routes.Config, "API_MAX_CONCURRENCY", 24)
+    mock_send_data_to_api = mocker.patch.object(
+        routes, "send_data_to_api", return_value=(200, {"sent": 1, "failed": 0})
+    )
+    mock_configure_session = mocker.patch.object(routes, "configure_session")
+
+    response = client.post("/api/send?batch_size=10&concurrency=100000")
+
+    assert response.status_code == 200
+    assert mock_send_data_to_api.call_args.kwargs["concurrency"] == 24
+    mock_configure_session.assert_called_once_with(pool_size=24)
+    assert client.post("/api/send?concurrency=0").status_code == 400
+    assert client.post("/api/send?concurrency=-3").status_code == 400
+    assert mock_send_data_to_api.call_count == 1
+
+
+def test_send_data_rejects_unknown_format(mocker, client):
+    """
+    Tester que la route /api/send refuse un format d'envoi inconnu.
+    """
+    mock_send_data_to_api = mocker.patch.object(routes, "send_data_to_api")
+
+    response = client.post("/api/send?format=xml")
+
+    assert response.status_code == 400
+    mock_send_data_to_api.assert_not_called()
+
+
+def test_get_customers_is_cached_until_file_changes(mocker, client, csv_files):
+    """
+    Tester que /api/customers ne relit le CSV que lorsque le fichier change.
+    """
+    customers_file, _ = csv_files
+    spy = mocker.spy(routes, "parse_customers")
+
+    first = client.get("/api/customers")
+    second = client.get("/api/customers")
+
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert [customer["customer_id"] for customer in first.get_json()] == ["1", "2"]
+    assert spy.call_count == 1
+
+    with open(customers_file, "a") as file:
+        file.write("3;1;Martin;Anne;;;anne@example.com\n")
+    third = client.get("/api/customers")
+
+    assert spy.call_count == 2
+    assert len(third.get_json()) == 3
+
+
+def test_get_purchases_is_cached(mocker, client, csv_files):
+    """
+    Tester que /api/purchases sert le résultat en cache sans relire le CSV.
+    """
+    spy = mocker.spy(routes, "parse_purchases")
+
+    first = client.get("/api/purchases")
+    second = client.get("/api/purchases")
+
+    assert first.get_json()["1"][0]["currency"] == "EUR"
+    assert first.data == second.data
+    assert spy.call_count == 1
+
+
+def test_get_customers_missing_file(client, monkeypatch, tmp_path):
+    """
+    Tester qu'un fichier manquant renvoie une erreur 500.
+    """
+    monkeypatch.setattr(routes, "CUSTOMERS_FILE", str(tmp_path / "missing.csv"))
+
+    response = client.get("/api/customers")
+
+    assert response.status_code == 500
+    assert "error" in response.get_json()
+
+
+def test_get_customers_page_and_filters(client, csv_files):
+    """
+    Tester la pagination et le filtrage de /api/customers.
+    """
+    first_page = client.get("/api/customers?limit=1").get_json()
+    second_page = client.get("/api/customers?limit=1&offset=1").get_json()
+    by_city = client.get("/api/customers?city=Lyon").get_json()
+
+    assert first_page["total"] == 2
+    assert [customer["customer_id"] for customer in first_page["items"]] == ["1"]
+    assert first_page["next_offset"] == 1
+    assert [customer["customer_id"] for customer in second_page["items"]] == ["2"]
+    assert second_page["next_offset"] is None
+    assert [customer["email"] for customer in by_city["items"]] == [
+        "john.smith@example.com"
+    ]
+
+
+def test_get_without_pagination_does_not_build_indexes(mocker, client, csv_files):
+    """
+    Tester que les réponses complètes ne construisent pas les index de pagination.
+    """
+    mock_customer_index = mocker.patch.object(routes, "load_customer_index")
+    mock_purchase_index = mocker.patch.object(routes, "load_purchase_index")
+
+    assert client.get("/api/customers").status_code == 200
+    assert client.get("/api/purchases").status_code == 200
+
+    mock_customer_index.assert_not_called()
+    mock_purchase_index.assert_not_called()
+
+
+def test_get_purchases_filters(client, csv_files):
+    """
+    Tester le filtrage de /api/purchases par devise et par plage de dates.
+    """
+    by_currency = client.get("/api/purchases?currency=USD").get_json()
+    by_date = client.get("/api/purchases?date_from=2023-01-02").get_json()
+
+    assert by_currency["total"] == 1
+    assert by_currency["items"][0]["customer_id"] == "2"
+    assert [purchase["product_id"] for purchase in by_date["items"]] == ["P2"]
+
+
+def test_get_purchases_reversed_range_and_empty_page(client, csv_files):
+    """
+    Tester qu'une plage de dates inversée renvoie une page vide, et qu'une page
+    vide n'indique pas de page suivante.
+    """
+    reversed_range = client.get(
+        "/api/purchases?date_from=2050-12-31&date_to=2017-12-31"
+    )
+    empty_page = client.get("/api/customers?limit=0").get_json()
+
+    assert reversed_range.status_code == 200
+    assert reversed_range.get_json()["items"] == []
+    assert reversed_range.get_json()["total"] == 0
+    assert empty_page["total"] == 2
+    assert empty_page["next_offset"] is None
+
+
+def test_routes_read_the_staging_store(monkeypatch, client, csv_files, tmp_path):
+    """
+    Tester que les routes renvoient les mêmes réponses en lisant la base de staging.
+    """
+    urls = [
+        "/api/customers",
+        "/api/purchases",
+        "/api/customers?city=Lyon",
+        "/api/purchases?date_from=2023-01-02",
+    ]
+    expected = [client.get(url).get_json() for url in urls]
+    file_cache.clear()
+    monkeypatch.setattr(routes.Config, "STAGING_DB", str(tmp_path / "staging.db"))
+
+    assert [client.get(url).get_json() for url in urls] == expected
+    assert isinstance(routes.load_customer_index(), routes.StagedIndex)
+
+
+def test_get_pages_reject_invalid_parameters(client, csv_files):
+    """
+    Tester que les paramètres invalides renvoient une erreur 400.
+    """
+    assert client.get("/api/customers?limit=-1").status_code == 400
+    assert client.get("/api/purchases?date_from=yesterday").status_code == 400
+    assert client.get("/api/customers?date_from=2023-01-01").status_code == 400
+
+
+def test_get_customers_streamed_json(mocker, client, csv_files):
+    """
+    Tester la réponse en flux de /api/customers sans passer par le cache.
+    """
+    mock_parse_customers = mocker.patch.object(routes, "parse_customers")
+
+    response = client.get("/api/customers?stream=1")
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/json"
+    assert [customer["customer_id"] for customer in json.loads(response.data)] == [
+        "1",
+        "2",
+    ]
+    mock_parse_customers.assert_not_called()
+
+
+def test_get_purchases_streamed_ndjson(client, csv_files):
+    """
+    Tester la réponse NDJSON en flux de /api/purchases.
+    """
+    response = client.get("/api/purchases?format=ndjson")
+
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.data.splitlines()]
+    assert [(row["customer_id"], row["currency"]) for row in rows] == [
+        ("1", "EUR"),
+        ("2", "USD"),
+    ]
+
+
+def test_get_customers_streamed_missing_file(client, monkeypatch, tmp_path):
+    """
+    Tester qu'un fichier manquant renvoie toujours une erreur 500 en mode flux.
+    """
+    monkeypatch.setattr(routes, "CUSTOMERS_FILE", str(tmp_path / "missing.csv"))
+
+    response = client.get("/api/customers?stream=1")
+
+    assert response.status_code == 500
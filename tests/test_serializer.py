@@ -0,0 +1,44 @@
+import json
+import pytest
+from app.utils import serializer
+from app.utils.records import Purchase
+from app.utils.serializer import configure_serializer, dumps, resolve_backend
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    """
+    Rétablir le sérialiseur par défaut après chaque test.
+    """
+    yield
+    configure_serializer()
+
+
+@pytest.mark.parametrize("backend", sorted(serializer.BACKENDS))
+def test_backends_produce_the_same_bytes(backend):
+    """
+    Tester que chaque moteur produit le même JSON compact, enregistrements compris.
+    """
+    value = {
+        "city": "Orléans",
+        "purchases": [Purchase("P1", 2, 10.0, "EUR", "2023-01-01")],
+    }
+
+    encoded = resolve_backend(backend)(value)
+
+    assert encoded == (
+        '{"city":"Orléans","purchases":[{"product_id":"P1","quantity":2,'
+        '"price":10.0,"currency":"EUR","purchased_at":"2023-01-01"}]}'
+    ).encode("utf-8")
+
+
+def test_configure_serializer():
+    """
+    Tester le choix du moteur pour tout le processus et le refus d'un moteur inconnu.
+    """
+    configure_serializer("json")
+
+    assert json.loads(dumps([1, "a"])) == [1, "a"]
+    assert serializer._dumps is serializer.BACKENDS["json"]
+    with pytest.raises(ValueError, match="Unavailable JSON backend"):
+        configure_serializer("simdjson")
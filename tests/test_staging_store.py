@@ -0,0 +1,110 @@
+import os
+import pytest
+from app.utils.csv_parser import parse_customers, parse_purchases
+from app.utils.record_index import RecordIndex
+from app.utils.staging_store import (
+    StagedIndex,
+    StagingStore,
+    parse_customers_staged,
+    parse_purchases_staged,
+)
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    """
+    Créer des fichiers CSV temporaires, avec une ligne invalide dans chaque fichier.
+    """
+    customers_file = tmp_path / "customers.csv"
+    customers_file.write_text(
+        "customer_id;title;lastname;firstname;postal_code;city;email\n"
+        "1;1;Doe;Jane;75009;Paris;jane.doe@example.com\n"
+        "2;2;Smith;John;69001;Lyon;\n"
+        "3;2;Martin;Paul;69001;Lyon;paul.martin@example.com\n"
+    )
+    purchases_file = tmp_path / "purchases.csv"
+    purchases_file.write_text(
+        "customer_id;product_id;quantity;price;currency;date\n"
+        '1;P1;2;19.99;"EUR";2023-01-02\n'
+        "3;P2;1;9.99;USD;2023-01-01\n"
+        "1;P3;;5;EUR;2023-01-03\n"
+        "1;P4;3;5;EUR;2023-01-01\n"
+    )
+    return str(customers_file), str(purchases_file)
+
+
+def test_staged_rows_match_the_csv_parser(tmp_path, csv_files):
+    """
+    Tester que la base de staging restitue les mêmes enregistrements que l'analyse du CSV.
+    """
+    customers_file, purchases_file = csv_files
+    db_path = str(tmp_path / "staging.db")
+
+    assert parse_customers_staged(customers_file, db_path) == parse_customers(
+        customers_file
+    )
+    assert parse_purchases_staged(purchases_file, db_path) == parse_purchases(
+        purchases_file
+    )
+
+
+def test_refresh_reimports_only_changed_files(mocker, tmp_path, csv_files):
+    """
+    Tester qu'un fichier n'est réimporté que lorsqu'il a été modifié.
+    """
+    customers_file, _ = csv_files
+    store = StagingStore(str(tmp_path / "staging.db"))
+
+    assert store.refresh("customers", customers_file) is True
+    assert store.refresh("customers", customers_file) is False
+
+    with open(customers_file, mode="a") as file:
+        file.write("4;1;Durand;Marie;13001;Marseille;marie@example.com\n")
+    stat = os.stat(customers_file)
+    os.utime(customers_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert store.refresh("customers", customers_file) is True
+    assert [customer["customer_id"] for customer in store.iter_customers()] == [
+        "1",
+        "3",
+        "4",
+    ]
+
+
+def test_staged_index_matches_record_index(tmp_path, csv_files):
+    """
+    Tester que les pages servies par SQL sont identiques à celles de RecordIndex.
+    """
+    _, purchases_file = csv_files
+    store = StagingStore(str(tmp_path / "staging.db"))
+    store.refresh("purchases", purchases_file)
+    rows = [
+        {"customer_id": customer_id, **purchase}
+        for customer_id, purchases in parse_purchases(purchases_file).items()
+        for purchase in purchases
+    ]
+    expected = RecordIndex(rows, ("customer_id", "currency"), "purchased_at")
+    staged = StagedIndex(
+        store, "purchases", ("customer_id", "currency"), "purchased_at"
+    )
+
+    for arguments in [
+        {},
+        {"offset": 1, "limit": 1},
+        {"filters": {"customer_id": "1"}},
+        {"filters": {"currency": "EUR"}, "lower": "2023-01-01", "upper": "2023-01-01"},
+        {"lower": "2023-01-01"},
+    ]:
+        assert staged.query(**arguments) == expected.query(**arguments)
+    with pytest.raises(ValueError, match="Cannot filter on email"):
+        staged.query({"email": "jane.doe@example.com"})
+
+
+def test_staging_store_requires_a_database(monkeypatch):
+    """
+    Tester qu'une base de staging doit être indiquée ou configurée.
+    """
+    monkeypatch.setattr("app.utils.staging_store.Config.STAGING_DB", None)
+
+    with pytest.raises(ValueError, match="No staging database configured"):
+        StagingStore()